@@ -0,0 +1,265 @@
+"""
+Local analytical queries over the feedback columns of reddit_posts.csv.
+
+FeedbackTable loads the pipeline output once, normalizes the free-form
+build/version strings, dictionary-encodes the categorical columns into integer
+code arrays and builds a keyword index over post_content and resolution_text.
+Filters and group-bys then run as numpy operations over those arrays, so
+questions like "high-severity unresolved complaints per build this week" are
+answered locally instead of after an ingest into Kusto (toRTI.py).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns that are dictionary-encoded; build_major, release and edition are derived while normalizing.
+CATEGORICAL_COLUMNS = ['post_type', 'build', 'build_major', 'release', 'version', 'edition', 'sentiment',
+                       'severity', 'resolved', 'topic_cluster', 'feedback_source', 'subreddit']
+KEYWORD_COLUMNS = ['post_content', 'resolution_text']
+EDITIONS = ['Home', 'Pro', 'Enterprise', 'Education', 'LTSC', 'IoT']
+# Builds from 22000 on are Windows 11, older five-digit builds Windows 10.
+WINDOWS_11_FIRST_BUILD = 22000
+
+_TOKEN = re.compile(r'\w+')
+_BUILD = r'\b(\d{5})(?:\.(\d{1,5}))?\b'
+_RELEASE = r'(?i)\b(\d{2})\s*h\s*([12])\b'
+_WINDOWS = r'(?i)\bwin(?:dows)?\s*(10|11)\b'
+_EDITION = r'(?i)\b(' + '|'.join(EDITIONS) + r')\b'
+
+
+def _text(values):
+    return pd.Series(values).fillna('').astype(str)
+
+
+def normalize_builds(builds, versions=None):
+    """
+    Normalizes the LLM's build and version strings (vectorized over whole columns).
+
+    Returns a DataFrame with:
+        build: 'NNNNN' or 'NNNNN.NNNN' (e.g. '26100.4652'), '' if no build number was given
+        build_major: the five-digit build ('26100'), '' if unknown
+        release: feature update such as '24H2', taken from either column
+        version: 'Windows 10' / 'Windows 11', inferred from the build when missing
+        edition: one of EDITIONS, '' if not mentioned
+    Placeholder text the model sometimes echoes back ('optional build number if
+    applicable ...') normalizes to ''.
+    """
+    builds = _text(builds)
+    versions = _text(versions if versions is not None else [''] * len(builds))
+    versions.index = builds.index
+    parts = builds.str.extract(_BUILD)
+    major = parts[0].fillna('')
+    out = pd.DataFrame(index=builds.index)
+    out['build'] = major + ('.' + parts[1]).fillna('')
+    out['build_major'] = major
+    release = builds.str.extract(_RELEASE)
+    release_from_version = versions.str.extract(_RELEASE)
+    release = release.where(release[0].notna(), release_from_version)
+    out['release'] = (release[0] + 'H' + release[1]).fillna('')
+    version = versions.str.extract(_WINDOWS)[0]
+    numeric_major = pd.to_numeric(major.replace('', np.nan))
+    inferred = np.where(numeric_major >= WINDOWS_11_FIRST_BUILD, '11', '10')
+    version = version.where(version.notna(), pd.Series(inferred, index=builds.index).where(major != ''))
+    out['version'] = ('Windows ' + version).fillna('')
+    edition = versions.str.extract(_EDITION)[0].fillna('')
+    canonical = {name.lower(): name for name in EDITIONS}
+    out['edition'] = edition.str.lower().map(canonical).fillna('')
+    return out
+
+
+def parse_resolved(values):
+    """True/False from bools or 'true'/'yes'/'1' style strings; anything else is False."""
+    return _text(values).str.strip().str.lower().isin(['true', 'yes', '1']).to_numpy()
+
+
+class DictionaryColumn:
+    """
+    A categorical column stored as int32 codes into a sorted dictionary of labels.
+
+    Equality and membership filters compare codes, so each filter is one
+    vectorized comparison however long the label strings are.
+    """
+    def __init__(self, values):
+        self.labels, codes = np.unique(_text(values).to_numpy(dtype=str), return_inverse=True)
+        self.codes = codes.astype(np.int32)
+        self._lookup = {label: code for code, label in enumerate(self.labels)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def mask(self, values):
+        """Rows whose label is `values` (a string) or any of `values` (a list)."""
+        if isinstance(values, str):
+            values = [values]
+        codes = [self._lookup[value] for value in values if value in self._lookup]
+        if not codes:
+            return np.zeros(len(self.codes), dtype=bool)
+        if len(codes) == 1:
+            return self.codes == codes[0]
+        return np.isin(self.codes, codes)
+
+
+class KeywordIndex:
+    """Inverted index from lower-cased word to the sorted row numbers containing it, per text column."""
+    def __init__(self, frame, columns=KEYWORD_COLUMNS):
+        self.size = len(frame)
+        self.postings = {}
+        for column in columns:
+            if column not in frame.columns:
+                continue
+            postings = {}
+            for row, text in enumerate(_text(frame[column])):
+                for token in set(_TOKEN.findall(text.lower())):
+                    postings.setdefault(token, []).append(row)
+            self.postings[column] = {token: np.array(rows, dtype=np.int32) for token, rows in postings.items()}
+
+    def rows(self, keywords, columns=None, match='all'):
+        """
+        Row numbers containing every keyword (match='all') or any of them
+        (match='any') in at least one of `columns` (default: all indexed columns).
+        """
+        if match not in ('all', 'any'):
+            raise ValueError(f"match must be 'all' or 'any', not {match!r}.")
+        tokens = _TOKEN.findall(keywords.lower()) if isinstance(keywords, str) else \
+            [token for keyword in keywords for token in _TOKEN.findall(keyword.lower())]
+        columns = self.postings.keys() if columns is None else columns
+        result = None
+        for token in dict.fromkeys(tokens):
+            rows = np.empty(0, dtype=np.int32)
+            for column in columns:
+                found = self.postings.get(column, {}).get(token)
+                if found is not None:
+                    rows = np.union1d(rows, found)
+            if result is None:
+                result = rows
+            else:
+                result = np.intersect1d(result, rows, assume_unique=True) if match == 'all' else np.union1d(result, rows)
+        return result if result is not None else np.arange(self.size, dtype=np.int32)
+
+    def mask(self, keywords, columns=None, match='all'):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.rows(keywords, columns=columns, match=match)] = True
+        return mask
+
+
+class FeedbackTable:
+    """
+    Columnar, dictionary-encoded view of the parsed feedback for fast local queries.
+
+    Example - high-severity unresolved complaints per build in the last week:
+
+        table = FeedbackTable.from_csv('reddit_posts.csv')
+        table.query(group_by=['build'], severity='high', resolved=False, post_type='complaint',
+                    since=pd.Timestamp.now() - pd.Timedelta(days=7))
+    """
+    def __init__(self, df):
+        self.frame = df.reset_index(drop=True)
+        frame = self.frame
+        normalized = normalize_builds(frame.get('build'), frame.get('version')) if len(frame) else \
+            pd.DataFrame(columns=['build', 'build_major', 'release', 'version', 'edition'])
+        self.columns = {}
+        for column in CATEGORICAL_COLUMNS:
+            if column in normalized.columns:
+                values = normalized[column]
+            elif column == 'resolved':
+                values = pd.Series(parse_resolved(frame.get('resolved', pd.Series([''] * len(frame)))).astype(str))
+            elif column in frame.columns:
+                values = frame[column]
+                if column == 'topic_cluster':
+                    values = pd.to_numeric(values, errors='coerce').astype('Int64').astype(str).replace('<NA>', '')
+                else:
+                    values = _text(values).str.strip().str.lower()
+            else:
+                continue
+            self.columns[column] = DictionaryColumn(values)
+        created = frame['created_utc'] if 'created_utc' in frame.columns else pd.Series([None] * len(frame))
+        self.created = pd.to_datetime(created, errors='coerce', format='mixed').to_numpy(dtype='datetime64[ns]')
+        upvotes = frame['upvotes'] if 'upvotes' in frame.columns else pd.Series([0] * len(frame))
+        self.upvotes = pd.to_numeric(upvotes, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        self.keywords = KeywordIndex(frame)
+
+    @classmethod
+    def from_csv(cls, csv_path='reddit_posts.csv'):
+        return cls(pd.read_csv(csv_path))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def labels(self, column):
+        """The distinct non-empty (normalized) values of a categorical column."""
+        return [str(label) for label in self._column(column).labels if label != '']
+
+    def _column(self, column):
+        try:
+            return self.columns[column]
+        except KeyError:
+            raise ValueError(f"'{column}' is not a categorical column of this table "
+                             f"(available: {sorted(self.columns)}).") from None
+
+    def where(self, since=None, until=None, keywords=None, keyword_columns=None, match='all', **equals):
+        """
+        Boolean row mask for the given filters, all of which must hold.
+
+        Parameters:
+            since, until: Inclusive bounds on created_utc (anything pd.Timestamp accepts).
+            keywords (str): Words to find in post_content/resolution_text (or keyword_columns).
+            match (str): 'all' keywords or 'any' of them.
+            **equals: categorical column = label or list of labels, e.g. severity='high',
+                build=['26100.4652', '22631'], resolved=False. None skips the filter.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in equals.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = str(value)
+            mask &= self._column(column).mask(value)
+        if since is not None:
+            mask &= self.created >= np.datetime64(pd.Timestamp(since).tz_localize(None), 'ns')
+        if until is not None:
+            mask &= self.created <= np.datetime64(pd.Timestamp(until).tz_localize(None), 'ns')
+        if keywords:
+            mask &= self.keywords.mask(keywords, columns=keyword_columns, match=match)
+        return mask
+
+    def group_by(self, columns, mask=None):
+        """
+        Posts and upvotes per combination of the given categorical columns.
+
+        The codes of the grouping columns are combined into one integer key per
+        row, so grouping is a single np.unique plus bincount over the filtered rows.
+        Returns a DataFrame sorted by post count.
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        encoded = [self._column(column) for column in columns]
+        selected = np.ones(len(self), dtype=bool) if mask is None else mask
+        key = np.zeros(int(selected.sum()), dtype=np.int64)
+        for column in encoded:
+            key = key * len(column.labels) + column.codes[selected]
+        keys, inverse = np.unique(key, return_inverse=True)
+        result = {}
+        remainder = keys
+        for name, column in reversed(list(zip(columns, encoded))):
+            remainder, codes = np.divmod(remainder, len(column.labels))
+            result[name] = column.labels[codes]
+        out = pd.DataFrame({name: result[name] for name in columns})
+        out['posts'] = np.bincount(inverse, minlength=len(keys))
+        out['upvotes'] = np.bincount(inverse, weights=self.upvotes[selected], minlength=len(keys))
+        return out.sort_values(['posts'] + list(columns), ascending=[False] + [True] * len(columns),
+                               ignore_index=True)
+
+    def rows(self, mask=None):
+        """The original CSV rows selected by `mask`, with the normalized build/version columns."""
+        frame = self.frame if mask is None else self.frame[mask]
+        normalized = {column: self.columns[column].labels[self.columns[column].codes]
+                      for column in ('build', 'release', 'version', 'edition') if column in self.columns}
+        if mask is not None:
+            normalized = {column: values[mask] for column, values in normalized.items()}
+        return frame.assign(**normalized)
+
+    def query(self, group_by=None, **filters):
+        """where(**filters), then either group_by(group_by) or the matching rows."""
+        mask = self.where(**filters)
+        return self.group_by(group_by, mask) if group_by else self.rows(mask)
@@ -0,0 +1,195 @@
+# action_items.py
+# Action-item detection for the Nodwins Meets v2 AI Agent.
+# Trigger phrases are compiled once, up front, into either a single regex
+# alternation (small vocabularies) or an Aho-Corasick keyword automaton (large
+# vocabularies). Either way a message is scanned once and every action item in
+# it is returned.
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_TRIGGERS = ("action item", "todo", "task for", "assign to")
+# For these triggers the word that follows names the assignee ("assign to @bob ...").
+DEFAULT_ASSIGNEE_TRIGGERS = ("task for", "assign to")
+# Vocabularies larger than this use the automaton when engine="auto" (the
+# regex alternation slows roughly linearly with vocabulary size; see benchmarks.py).
+AUTOMATON_THRESHOLD = 64
+
+_MENTION_PATTERN = re.compile(r"@([\w.-]+)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_LEADING_SEPARATORS = ":- \t"
+_TRAILING_SEPARATORS = ";, \t"
+
+
+class ActionItem(NamedTuple):
+    """A single action item found in a message."""
+    trigger: str
+    detail: str
+    assignee: Optional[str]
+    author: str
+    # The detail without the leading assignee name, if the trigger names one.
+    task: str
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        """Identity used for de-duplication: normalised task plus assignee."""
+        return _WHITESPACE_PATTERN.sub(" ", self.task.casefold()).strip(), self.assignee
+
+    def describe(self) -> str:
+        return f"'{self.detail}' assigned based on message from {self.author}."
+
+
+def normalize_assignee(name: str) -> Optional[str]:
+    """'@Bob,' -> 'bob'. Returns None for an empty name."""
+    name = name.strip().lstrip("@").rstrip(".,;:!?").casefold()
+    return name or None
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lower-cased trigger phrases.
+
+    find() returns leftmost-longest, non-overlapping matches that sit on word
+    boundaries, in one pass over the text regardless of vocabulary size.
+    """
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Length of the longest phrase ending at each state (0 = none), and the
+        # nearest state along the fail chain that ends a phrase.
+        self._out: List[int] = [0]
+        self._dict_link: List[int] = [0]
+        for phrase in phrases:
+            self._add(phrase.lower())
+        self._build()
+
+    def _add(self, phrase: str):
+        if not phrase:
+            return
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+                self._dict_link.append(0)
+            state = nxt
+        self._out[state] = len(phrase)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fail_state = self._fail[nxt]
+                self._dict_link[nxt] = fail_state if self._out[fail_state] else self._dict_link[fail_state]
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """Returns (start, end) spans of phrase matches in lower-cased `text`."""
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        candidates = []
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            s = state if out[state] else dict_link[state]
+            while s:
+                start = i + 1 - out[s]
+                if (start == 0 or not _is_word_char(text[start - 1])) and (i + 1 == n or not _is_word_char(text[i + 1])):
+                    candidates.append((start, i + 1))
+                s = dict_link[s]
+        if not candidates:
+            return candidates
+        # Leftmost-longest, non-overlapping selection.
+        candidates.sort(key=lambda span: (span[0], -span[1]))
+        spans = []
+        last_end = -1
+        for start, end in candidates:
+            if start >= last_end:
+                spans.append((start, end))
+                last_end = end
+        return spans
+
+
+class _RegexMatcher:
+    """Single precompiled alternation; longest phrases first so they win ties."""
+    def __init__(self, phrases: Iterable[str]):
+        ordered = sorted({p.lower() for p in phrases if p}, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, ordered)) + r")\b") if ordered else None
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        if self._pattern is None:
+            return []
+        return [m.span() for m in self._pattern.finditer(text)]
+
+
+class ActionItemDetector:
+    """
+    Finds every action item in a message in one scan.
+
+    Each trigger phrase starts an item whose detail runs to the next trigger (or
+    the end of the message). engine is "regex", "automaton", or "auto", which
+    picks the automaton once the vocabulary exceeds AUTOMATON_THRESHOLD phrases.
+    """
+    def __init__(self, triggers: Sequence[str] = DEFAULT_TRIGGERS,
+                 assignee_triggers: Sequence[str] = DEFAULT_ASSIGNEE_TRIGGERS, engine: str = "auto"):
+        triggers = [t.lower() for t in triggers]
+        if engine == "auto":
+            engine = "automaton" if len(triggers) > AUTOMATON_THRESHOLD else "regex"
+        if engine == "automaton":
+            self._matcher = KeywordAutomaton(triggers)
+        elif engine == "regex":
+            self._matcher = _RegexMatcher(triggers)
+        else:
+            raise ValueError(f"Unknown engine '{engine}'. Expected 'regex', 'automaton' or 'auto'.")
+        self.engine = engine
+        self.assignee_triggers = frozenset(t.lower() for t in assignee_triggers)
+
+    def detect(self, message: str, author: str) -> List[ActionItem]:
+        lowered = message.lower()
+        if len(lowered) != len(message):
+            # Some characters change length when lower-cased; fall back to lower-cased details.
+            message = lowered
+        spans = self._matcher.find(lowered)
+        items = []
+        for index, (start, end) in enumerate(spans):
+            stop = spans[index + 1][0] if index + 1 < len(spans) else len(message)
+            detail = message[end:stop].lstrip(_LEADING_SEPARATORS).rstrip(_TRAILING_SEPARATORS)
+            if not detail:
+                continue
+            trigger = lowered[start:end]
+            if trigger in self.assignee_triggers:
+                name, _, task = detail.partition(" ")
+                assignee = normalize_assignee(name)
+                task = task.lstrip(_LEADING_SEPARATORS)
+            else:
+                mention = _MENTION_PATTERN.search(detail)
+                assignee = normalize_assignee(mention.group(1)) if mention else None
+                task = detail
+            items.append(ActionItem(trigger, detail, assignee, author, task))
+        return items
+
+    def detect_batch(self, messages: Iterable[Tuple[str, str]]) -> List[List[ActionItem]]:
+        """Runs detect() over (message, author) pairs, e.g. for transcript replays."""
+        detect = self.detect
+        return [detect(message, author) for message, author in messages]
+
+
+# Shared, precompiled detector for the default trigger vocabulary.
+DEFAULT_DETECTOR = ActionItemDetector()
@@ -0,0 +1,140 @@
+# admission.py
+# CPU and memory admission control for Nodwins Meets v1 and v2.
+# Before a meeting is created the server asks the AdmissionController whether
+# the host has headroom. CPU utilisation comes from /proc/stat deltas (load
+# average elsewhere), memory from /proc/meminfo; samples are cached briefly so
+# the check stays cheap on the meeting-creation path.
+
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_CPU = 0.95            # fraction of all cores busy
+DEFAULT_MAX_MEMORY = 0.90         # fraction of physical memory in use
+DEFAULT_AI_LOAD_FACTOR = 1.1      # AI meetings count as this much more CPU (cutoff ~86% with the defaults)
+DEFAULT_SAMPLE_TTL = 0.5          # seconds a resource sample is reused
+
+
+class ResourceSnapshot(NamedTuple):
+    """Host resource usage; None means the platform could not report it."""
+    cpu: Optional[float]
+    memory: Optional[float]
+
+
+class AdmissionDecision(NamedTuple):
+    admitted: bool
+    reason: str
+    snapshot: ResourceSnapshot
+
+
+def _read_cpu_times() -> Optional[Tuple[int, int]]:
+    """(busy, total) jiffies from the aggregate line of /proc/stat."""
+    try:
+        with open("/proc/stat") as f:
+            fields = [int(x) for x in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    total = sum(fields[:8])  # guest time is already counted in user/nice
+    return total - idle, total
+
+
+def _read_memory_fraction() -> Optional[float]:
+    try:
+        info = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0])
+        return 1.0 - info["MemAvailable"] / info["MemTotal"]
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+class SystemSampler:
+    """Samples host CPU and memory usage. CPU is utilisation since the previous sample."""
+    def __init__(self):
+        self._last_cpu = _read_cpu_times()
+
+    def __call__(self) -> ResourceSnapshot:
+        cpu = None
+        current = _read_cpu_times()
+        if current is not None and self._last_cpu is not None and current[1] > self._last_cpu[1]:
+            busy = current[0] - self._last_cpu[0]
+            cpu = busy / (current[1] - self._last_cpu[1])
+        elif hasattr(os, "getloadavg"):
+            cpu = min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+        if current is not None:
+            self._last_cpu = current
+        return ResourceSnapshot(cpu, _read_memory_fraction())
+
+
+def fixed_sampler(cpu: Optional[float] = None, memory: Optional[float] = None) -> Callable[[], ResourceSnapshot]:
+    """A sampler that always reports the given usage (None = unknown, never rejects)."""
+    snapshot = ResourceSnapshot(cpu, memory)
+    return lambda: snapshot
+
+
+class AdmissionController:
+    """
+    Decides whether the server may take on another meeting.
+
+    A meeting is rejected when CPU use (scaled by ai_load_factor for AI-enabled
+    meetings) exceeds max_cpu, or memory use exceeds max_memory. Metrics the
+    platform cannot report are not checked. Pass a custom `sampler` to simulate
+    load, e.g. in the performance regression suite.
+
+    The effective CPU cutoff is max_cpu for plain meetings and
+    max_cpu / ai_load_factor for AI meetings (see cpu_cutoff): with the defaults
+    0.95 and 1.1, AI meetings are turned away once the host is ~86% busy. v2
+    creates AI meetings by default, so a large factor rejects most new meetings
+    on a moderately loaded host.
+    """
+    def __init__(self, max_cpu: float = DEFAULT_MAX_CPU, max_memory: float = DEFAULT_MAX_MEMORY,
+                 ai_load_factor: float = DEFAULT_AI_LOAD_FACTOR, sample_ttl: float = DEFAULT_SAMPLE_TTL,
+                 sampler: Optional[Callable[[], ResourceSnapshot]] = None):
+        if not 0 < max_cpu <= 1 or not 0 < max_memory <= 1:
+            raise ValueError("max_cpu and max_memory are fractions in (0, 1].")
+        if ai_load_factor < 1:
+            raise ValueError("ai_load_factor must be at least 1.")
+        self.max_cpu = max_cpu
+        self.max_memory = max_memory
+        self.ai_load_factor = ai_load_factor
+        self.sample_ttl = sample_ttl
+        self.sampler = sampler or SystemSampler()
+        self.admitted = 0
+        self.rejected = 0
+        self._snapshot: Optional[ResourceSnapshot] = None
+        self._sampled_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> ResourceSnapshot:
+        """The latest resource sample (re-sampled at most every sample_ttl seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is None or now - self._sampled_at >= self.sample_ttl:
+                self._snapshot = self.sampler()
+                self._sampled_at = now
+            return self._snapshot
+
+    def cpu_cutoff(self, ai_enabled: bool = False) -> float:
+        """CPU utilisation above which a new (AI) meeting is rejected."""
+        return self.max_cpu / self.ai_load_factor if ai_enabled else self.max_cpu
+
+    def admit(self, ai_enabled: bool = False) -> AdmissionDecision:
+        snapshot = self.snapshot()
+        cutoff = self.cpu_cutoff(ai_enabled)
+        reason = "OK"
+        if snapshot.cpu is not None and snapshot.cpu > cutoff:
+            reason = f"CPU at {snapshot.cpu:.0%} exceeds the {cutoff:.0%} cutoff" + \
+                (f" for AI meetings (max {self.max_cpu:.0%} / x{self.ai_load_factor} load factor)" if ai_enabled else "")
+        elif snapshot.memory is not None and snapshot.memory > self.max_memory:
+            reason = f"memory at {snapshot.memory:.0%} exceeds {self.max_memory:.0%}"
+        admitted = reason == "OK"
+        with self._lock:
+            if admitted:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return AdmissionDecision(admitted, reason, snapshot)
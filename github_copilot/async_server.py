@@ -0,0 +1,522 @@
+# async_server.py
+# asyncio TCP front end for Nodwins Meets (v1 or v2).
+# Clients speak newline-delimited JSON: each request is one object with an "op"
+# field and gets exactly one response ({"ok": true, ...} or {"ok": false,
+# "error": ...}). Chat messages, meeting-ended and summary notifications are
+# pushed to every subscribed participant as {"event": ...} lines.
+#
+# Run a server:  python async_server.py --port 8765 --version v2 --log-level INFO
+
+import argparse
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from admission import DEFAULT_AI_LOAD_FACTOR, DEFAULT_MAX_CPU, DEFAULT_MAX_MEMORY, AdmissionController
+from structured_logging import FORMATS, configure_logging, get_logger
+
+logger = get_logger("async")
+
+VERSIONS = {"v1": wins_systems_v1, "v2": wins_systems_ai_agents_v2}
+DEFAULT_QUEUE_SIZE = 256          # outbound batches buffered per connection
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce")
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """A malformed or unknown request."""
+    pass
+
+
+def _encode(obj: Dict[str, Any]) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class ClientConnection:
+    """
+    One TCP client. Responses and events go through an outbound queue that a
+    dedicated writer task drains, so a slow socket never blocks the code that
+    produces messages for it.
+
+    The connection counts as backed up once the writer is stuck waiting for the
+    socket to drain and `queue_size` payloads are waiting behind it. A backed-up
+    connection stops having its requests read (backpressure) and, for
+    broadcasts, triggers the server's slow-consumer policy.
+    """
+    def __init__(self, server: "AsyncMeetingServer", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, queue_size: int):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        # Items are (payload, number of events in it); None asks the writer to finish.
+        self.queue: "asyncio.Queue[Optional[Tuple[bytes, int]]]" = asyncio.Queue()
+        self.queue_size = queue_size
+        self.user = None
+        self.meeting_ids: Set[str] = set()
+        self.closed = False
+        self.missed_events = 0
+        self.write_task: Optional[asyncio.Task] = None
+        self._draining = False
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def start_writer(self) -> asyncio.Task:
+        self.write_task = asyncio.create_task(self._write_loop())
+        return self.write_task
+
+    @property
+    def backed_up(self) -> bool:
+        return self._draining and self.queue.qsize() >= self.queue_size
+
+    def send(self, payload: bytes, events: int = 0) -> bool:
+        """Queues a payload without waiting. Returns False if the connection is backed up."""
+        if self.closed:
+            return True
+        if self.backed_up:
+            return False
+        self.queue.put_nowait((payload, events))
+        return True
+
+    async def send_response(self, payload: bytes):
+        """Queues a response, first waiting while the connection is backed up."""
+        while self.backed_up and not self.closed:
+            await self._writable.wait()
+        if not self.closed:
+            self.queue.put_nowait((payload, 0))
+
+    def coalesce(self, payload: bytes, events: int):
+        """Replaces everything still queued with a gap notice plus the newest payload."""
+        missed = 0
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None:
+                missed += item[1]
+        self.missed_events += missed
+        self.queue.put_nowait((_encode({"event": "gap", "missed": missed}), 0))
+        self.queue.put_nowait((payload, events))
+
+    def finish(self):
+        """Closes the connection once everything queued so far has been written."""
+        self.queue.put_nowait(None)
+
+    async def _write_loop(self):
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is None:
+                    break
+                # Write everything already queued in one go, then wait for the
+                # transport to drain (this is where backpressure builds up).
+                parts = [item[0]]
+                while not self.queue.empty():
+                    item = self.queue.get_nowait()
+                    if item is None:
+                        break
+                    parts.append(item[0])
+                self.writer.write(b"".join(parts))
+                self._draining = True
+                self._writable.clear()
+                try:
+                    await self.writer.drain()
+                finally:
+                    self._draining = False
+                    self._writable.set()
+                if item is None:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            self.abort()
+        finally:
+            if not self.closed:
+                self.closed = True
+                self.writer.close()
+
+    def abort(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.transport.abort()
+            self._writable.set()
+            if self.write_task is not None and self.write_task is not asyncio.current_task():
+                self.write_task.cancel()
+
+
+class MeetingChannel:
+    """Subscribers of one meeting plus the events waiting for the next flush."""
+    __slots__ = ("meeting_id", "subscribers", "pending", "flush_scheduled")
+
+    def __init__(self, meeting_id: str):
+        self.meeting_id = meeting_id
+        self.subscribers: Dict[str, ClientConnection] = {}
+        self.pending: List[bytes] = []
+        self.flush_scheduled = False
+
+
+class AsyncMeetingServer:
+    """
+    Serves a NodwinsServer over TCP.
+
+    Broadcasts are batched per event-loop tick: publishing only appends to the
+    meeting's pending list, and one flush per tick encodes the batch once and
+    hands the same bytes to every subscriber. When a subscriber's outbound queue
+    is full, slow_consumer="drop" disconnects it and "coalesce" discards its
+    backlog in favour of a {"event": "gap"} notice and the newest batch.
+    """
+    def __init__(self, module=wins_systems_ai_agents_v2, host: str = "127.0.0.1", port: int = 0,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, slow_consumer: str = "drop",
+                 admission: Optional[AdmissionController] = None):
+        if queue_size < 2:
+            raise ValueError("queue_size must be at least 2.")
+        if slow_consumer not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow_consumer policy '{slow_consumer}'. Expected one of {SLOW_CONSUMER_POLICIES}.")
+        self.module = module
+        self.backend = module.NodwinsServer()
+        if admission is not None:
+            self.backend.admission = admission
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.slow_consumer = slow_consumer
+        self.channels: Dict[str, MeetingChannel] = {}
+        self.connections: Set[ClientConnection] = set()
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self.dropped_consumers = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_errors = tuple(
+            getattr(module, name) for name in
+            ("AuthenticationError", "MeetingNotFoundException", "UserNotAuthorizedError",
+             "ResourcesExhaustedError", "AIServiceError")
+            if hasattr(module, name)
+        ) + (ProtocolError,)
+        self._handlers = {
+            "login": self._op_login, "logout": self._op_logout, "create": self._op_create,
+            "join": self._op_join, "leave": self._op_leave, "chat": self._op_chat, "end": self._op_end,
+        }
+
+    # --- Server lifecycle ---
+    async def start(self) -> Tuple[str, int]:
+        """Starts listening and returns the bound (host, port)."""
+        self._loop = asyncio.get_running_loop()
+        # A reset backend (see _reset_state) has its lifecycle sweeper stopped.
+        self.backend.lifecycle.start()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                  limit=MAX_LINE_BYTES, backlog=1024)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for conn in list(self.connections):
+            conn.abort()
+        # Let the handlers end their sessions before the loop goes away.
+        if self._handler_tasks:
+            await asyncio.wait(list(self._handler_tasks))
+
+    # --- Connections ---
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = ClientConnection(self, reader, writer, self.queue_size)
+        self.connections.add(conn)
+        task = asyncio.current_task()
+        self._handler_tasks.add(task)
+        write_task = conn.start_writer()
+        try:
+            while not conn.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Waiting here stops us reading further requests from this client.
+                await conn.send_response(_encode(await self._dispatch(conn, line)))
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._disconnect(conn)
+            conn.finish()
+            await asyncio.wait([write_task])
+            self.connections.discard(conn)
+            self._handler_tasks.discard(task)
+
+    def _disconnect(self, conn: ClientConnection):
+        """A closed connection leaves its meetings and ends its session."""
+        for meeting_id in list(conn.meeting_ids):
+            self._unsubscribe(conn, meeting_id, leave=True)
+        if conn.user is not None:
+            self.backend.logout_user(conn.user.user_id)
+            conn.user = None
+
+    async def _dispatch(self, conn: ClientConnection, line: bytes) -> Dict[str, Any]:
+        """Runs one request. Every failure becomes an {"ok": false} response, never a dropped connection."""
+        op = None
+        try:
+            try:
+                request = json.loads(line)
+                op = request["op"]
+                handler = self._handlers[op]
+            except (ValueError, TypeError, KeyError):
+                raise ProtocolError(f"Malformed request or unknown op: {line[:80]!r}")
+            if op != "login" and conn.user is None:
+                raise ProtocolError("Log in first.")
+            result = handler(conn, request)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return {"ok": True, "op": op, **result}
+        except self._client_errors as e:
+            return {"ok": False, "op": op, "error": type(e).__name__, "message": str(e)}
+        except Exception as e:
+            logger.exception("Request %r failed", op, extra={"user": conn.user.username if conn.user else None})
+            return {"ok": False, "op": op, "error": "InternalError", "message": str(e)}
+
+    # --- Fan-out ---
+    def publish(self, meeting_id: str, event: Dict[str, Any]):
+        """Queues an event for every subscriber of the meeting; flushed once per loop tick."""
+        channel = self.channels.get(meeting_id)
+        if channel is None:
+            return
+        channel.pending.append(_encode(event))
+        if not channel.flush_scheduled:
+            channel.flush_scheduled = True
+            self._loop.call_soon(self._flush, channel)
+
+    def _flush(self, channel: MeetingChannel):
+        channel.flush_scheduled = False
+        if not channel.pending:
+            return
+        payload = b"".join(channel.pending)
+        events = len(channel.pending)
+        channel.pending.clear()
+        for conn in list(channel.subscribers.values()):
+            if not conn.send(payload, events):
+                self._on_slow_consumer(conn, payload, events)
+
+    def _on_slow_consumer(self, conn: ClientConnection, payload: bytes, events: int):
+        if self.slow_consumer == "coalesce":
+            conn.coalesce(payload, events)
+        else:
+            self.dropped_consumers += 1
+            logger.warning("Dropping slow consumer '%s'", conn.user.username if conn.user else None,
+                           extra={"queued": conn.queue.qsize()})
+            self._disconnect(conn)
+            conn.abort()
+
+    def _subscribe(self, conn: ClientConnection, meeting_id: str):
+        channel = self.channels.get(meeting_id)
+        if channel is None:
+            channel = self.channels[meeting_id] = MeetingChannel(meeting_id)
+        channel.subscribers[conn.user.user_id] = conn
+        conn.meeting_ids.add(meeting_id)
+
+    def _unsubscribe(self, conn: ClientConnection, meeting_id: str, leave: bool = False):
+        conn.meeting_ids.discard(meeting_id)
+        channel = self.channels.get(meeting_id)
+        if channel is not None:
+            channel.subscribers.pop(conn.user.user_id, None)
+            if not channel.subscribers and not channel.pending:
+                del self.channels[meeting_id]
+        if leave:
+            meeting = self.backend.meetings.get(meeting_id)
+            if meeting is not None:
+                meeting.remove_participant(conn.user)
+
+    def _close_channel(self, meeting_id: str):
+        channel = self.channels.pop(meeting_id, None)
+        if channel is not None:
+            for conn in channel.subscribers.values():
+                conn.meeting_ids.discard(meeting_id)
+
+    # --- Operations ---
+    @staticmethod
+    def _field(request: Dict[str, Any], name: str, kind: type = str) -> Any:
+        if name not in request:
+            raise ProtocolError(f"Missing field '{name}'.")
+        value = request[name]
+        if not isinstance(value, kind):
+            raise ProtocolError(f"Field '{name}' must be of type {kind.__name__}.")
+        return value
+
+    def _meeting_for(self, conn: ClientConnection, request: Dict[str, Any]):
+        meeting_id = self._field(request, "meeting_id")
+        if meeting_id not in conn.meeting_ids:
+            raise ProtocolError(f"Join meeting '{meeting_id}' first.")
+        return self.backend.get_meeting(meeting_id)
+
+    def _op_login(self, conn, request):
+        if conn.user is not None:
+            raise ProtocolError("Already logged in.")
+        conn.user = self.backend.login_user(self._field(request, "username"), self._field(request, "password"))
+        return {"user_id": conn.user.user_id}
+
+    def _op_logout(self, conn, request):
+        self._disconnect(conn)
+        return {}
+
+    def _op_create(self, conn, request):
+        options = {}
+        if self.module is wins_systems_ai_agents_v2:
+            options = {"enable_ai": bool(request.get("enable_ai", True)),
+                       "incremental_summary": bool(request.get("incremental_summary", False))}
+        meeting = self.backend.create_meeting(conn.user, **options)
+        self._subscribe(conn, meeting.meeting_id)
+        return {"meeting_id": meeting.meeting_id}
+
+    def _op_join(self, conn, request):
+        meeting = self.backend.get_meeting(self._field(request, "meeting_id"))
+        meeting.add_participant(conn.user)
+        self._subscribe(conn, meeting.meeting_id)
+        return {"meeting_id": meeting.meeting_id}
+
+    def _op_leave(self, conn, request):
+        meeting_id = self._field(request, "meeting_id")
+        self._unsubscribe(conn, meeting_id, leave=True)
+        return {"meeting_id": meeting_id}
+
+    def _op_chat(self, conn, request):
+        meeting = self._meeting_for(conn, request)
+        message = self._field(request, "message")
+        seq = meeting.post_chat_message(conn.user, message)
+        if seq is None:
+            raise ProtocolError("Message was blocked.")
+        self.publish(meeting.meeting_id, {
+            "event": "chat", "meeting_id": meeting.meeting_id, "seq": seq,
+            "user": conn.user.username, "message": message,
+        })
+        return {"seq": seq}
+
+    async def _op_end(self, conn, request):
+        meeting = self._meeting_for(conn, request)
+        meeting_id = meeting.meeting_id
+        # end_meeting can block (inline v2 summaries, waiting for a summary slot),
+        # so it runs off the event loop.
+        handle = await self._loop.run_in_executor(None, meeting.end_meeting, conn.user)
+        self.publish(meeting_id, {"event": "ended", "meeting_id": meeting_id})
+        if hasattr(handle, "add_done_callback"):
+            # The summary finishes on a worker thread; hop back onto the loop to publish it.
+            handle.add_done_callback(
+                lambda future: self._loop.call_soon_threadsafe(self._publish_summary, meeting_id, future))
+        else:
+            self._loop.call_soon(self._close_channel, meeting_id)
+        return {"meeting_id": meeting_id}
+
+    def _publish_summary(self, meeting_id: str, future):
+        error = future.exception()
+        event = {"event": "summary", "meeting_id": meeting_id}
+        if error is None:
+            event["summary"] = future.result()
+        else:
+            event["error"] = str(error)
+        self.publish(meeting_id, event)
+        self._loop.call_soon(self._close_channel, meeting_id)
+
+
+class NodwinsClient:
+    """
+    Minimal asyncio client. request() returns the matching response (responses
+    arrive in request order); pushed events are delivered to on_event or, if
+    none is given, collected in `events`.
+    """
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.events: List[Dict[str, Any]] = []
+        self._pending: Deque[asyncio.Future] = deque()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self.closed = asyncio.Event()
+
+    async def connect(self, host: str, port: int):
+        self._reader, self._writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line.endswith(b"\n"):
+                    break  # EOF, possibly mid-line if the server dropped us
+                message = json.loads(line)
+                if "event" in message:
+                    if self.on_event is not None:
+                        self.on_event(message)
+                    else:
+                        self.events.append(message)
+                elif self._pending:
+                    self._pending.popleft().set_result(message)
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed.set()
+            # Requests still waiting for a response will never get one.
+            while self._pending:
+                self._pending.popleft().cancel()
+
+    def send(self, op: str, **fields) -> asyncio.Future:
+        """Sends a request without waiting; returns a Future for its response."""
+        future = asyncio.get_running_loop().create_future()
+        if self.closed.is_set():
+            future.set_exception(ConnectionError("Connection closed."))
+            return future
+        self._pending.append(future)
+        self._writer.write(_encode({"op": op, **fields}))
+        return future
+
+    async def request(self, op: str, **fields) -> Dict[str, Any]:
+        return await self.send(op, **fields)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._read_task is not None:
+            await self._read_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodwins Meets asyncio TCP server")
+    parser.add_argument("--version", choices=VERSIONS, default="v2")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--slow-consumer", choices=SLOW_CONSUMER_POLICIES, default="drop")
+    parser.add_argument("--log-level", default="INFO", help="DEBUG, INFO, WARNING, ... or OFF")
+    parser.add_argument("--log-format", choices=FORMATS, default="text")
+    parser.add_argument("--max-cpu", type=float, default=DEFAULT_MAX_CPU,
+                        help="busy CPU fraction above which new meetings are refused")
+    parser.add_argument("--max-memory", type=float, default=DEFAULT_MAX_MEMORY,
+                        help="used memory fraction above which new meetings are refused")
+    parser.add_argument("--ai-load-factor", type=float, default=DEFAULT_AI_LOAD_FACTOR,
+                        help="AI meetings are refused above max-cpu / ai-load-factor")
+    args = parser.parse_args()
+    configure_logging(args.log_level, fmt=args.log_format)
+
+    try:
+        admission = AdmissionController(max_cpu=args.max_cpu, max_memory=args.max_memory,
+                                        ai_load_factor=args.ai_load_factor)
+    except ValueError as e:
+        parser.error(str(e))
+    server = AsyncMeetingServer(VERSIONS[args.version], args.host, args.port, queue_size=args.queue_size,
+                                slow_consumer=args.slow_consumer, admission=admission)
+
+    async def run():
+        host, port = await server.start()
+        logger.info("Nodwins Meets %s listening on %s:%d", args.version, host, port)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
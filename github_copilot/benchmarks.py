@@ -0,0 +1,524 @@
+# benchmarks.py
+# Micro-benchmarks for the Nodwins Meets servers (v1 and v2).
+# Run from this directory, e.g.:  python benchmarks.py participants --version v2
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from action_items import DEFAULT_TRIGGERS, ActionItemDetector
+from admission import AdmissionController, fixed_sampler
+from async_server import DEFAULT_QUEUE_SIZE, SLOW_CONSUMER_POLICIES, AsyncMeetingServer, NodwinsClient
+from lifecycle import LifecycleManager, MeetingArchive
+from search_index import SearchIndex
+from structured_logging import DEFAULT_QUEUE_SIZE as DEFAULT_LOG_QUEUE_SIZE, configure_logging, shutdown_logging
+
+VERSIONS = {"v1": wins_systems_v1, "v2": wins_systems_ai_agents_v2}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Swallows the servers' console chatter so it does not dominate timings."""
+    # Discard rather than buffer it, so long runs do not accumulate output in memory.
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+def _unthrottled(server):
+    """Disables admission control so a benchmark that saturates the CPU is not turned away."""
+    server.admission = AdmissionController(sampler=fixed_sampler())
+    return server
+
+
+def _make_meeting(module, participant_count: int, **meeting_kwargs):
+    """Builds a meeting with `participant_count` users (host included)."""
+    host = module.User("host", "user-host")
+    meeting = module.Meeting("meet-bench", host, **meeting_kwargs)
+    users = [host]
+    for i in range(1, participant_count):
+        user = module.User(f"user{i}", f"user-{i}")
+        meeting.add_participant(user)
+        users.append(user)
+    return meeting, users
+
+
+# --- Scenario: participant scaling ---
+def bench_participant_scaling(module, sizes=(10, 1_000, 10_000), messages: int = 100_000):
+    """Posts `messages` chat messages into meetings of each size; returns msgs/sec per size."""
+    meeting_kwargs = {"enable_ai": False} if module is wins_systems_ai_agents_v2 else {}
+    results = {}
+    for size in sizes:
+        with _quiet():
+            meeting, users = _make_meeting(module, size, **meeting_kwargs)
+            # Round-robin speakers so later joiners are exercised as well as the host.
+            speakers = [users[i % size] for i in range(min(size, 1_000))]
+            start = time.perf_counter()
+            for i in range(messages):
+                meeting.post_chat_message(speakers[i % len(speakers)], "status update")
+            elapsed = time.perf_counter() - start
+        results[size] = messages / elapsed
+    return results
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# --- Scenario: concurrent end-meeting with AI summaries (v2 only) ---
+def bench_concurrent_end_meetings(meetings: int = 1_000, summary_workers: int = 32, caller_threads: int = 64):
+    """
+    Ends `meetings` AI-enabled meetings at once from `caller_threads` threads.
+    Returns end_meeting latency stats (ms) and the time until every summary is ready (s).
+    """
+    module = wins_systems_ai_agents_v2
+    pool = module.SummaryWorkerPool(max_workers=summary_workers, max_in_flight=meetings)
+    with _quiet():
+        batch = []
+        for i in range(meetings):
+            host = module.User(f"host{i}", f"user-host-{i}")
+            meeting = module.Meeting(f"meet-{i}", host, enable_ai=True, summary_pool=pool)
+            meeting.post_chat_message(host, "todo: write the summary")
+            batch.append((meeting, host))
+
+        def end(item):
+            meeting, host = item
+            start = time.perf_counter()
+            handle = meeting.end_meeting(host)
+            return time.perf_counter() - start, handle
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=caller_threads) as callers:
+            outcomes = list(callers.map(end, batch))
+        wait([handle for _, handle in outcomes])
+        total = time.perf_counter() - start
+    pool.shutdown()
+
+    latencies_ms = [latency * 1000 for latency, _ in outcomes]
+    return {
+        "end_meeting_p50_ms": _percentile(latencies_ms, 50),
+        "end_meeting_p99_ms": _percentile(latencies_ms, 99),
+        "end_meeting_mean_ms": statistics.fmean(latencies_ms),
+        "all_summaries_ready_s": total,
+    }
+
+
+# --- Scenario: action-item detection throughput ---
+_FILLER_WORDS = ("the", "build", "is", "green", "we", "should", "ship", "after", "review", "of", "logs", "today")
+
+
+def _synthetic_vocabulary(size: int):
+    extra = [f"follow up item{i}" for i in range(max(0, size - len(DEFAULT_TRIGGERS)))]
+    return list(DEFAULT_TRIGGERS)[:size] + extra
+
+
+def _synthetic_messages(vocabulary, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(_FILLER_WORDS) for _ in range(rng.randint(6, 20))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(vocabulary) + ":")
+        messages.append((" ".join(words), "alice"))
+    return messages
+
+
+def bench_action_item_detection(vocab_sizes=(10, 1_000, 10_000), messages: int = 20_000,
+                                engines=("regex", "automaton")):
+    """Returns {(engine, vocab_size): msgs/sec} for ActionItemDetector.detect_batch."""
+    results = {}
+    for size in vocab_sizes:
+        vocabulary = _synthetic_vocabulary(size)
+        batch = _synthetic_messages(vocabulary, messages)
+        for engine in engines:
+            detector = ActionItemDetector(triggers=vocabulary, engine=engine)
+            start = time.perf_counter()
+            detector.detect_batch(batch)
+            results[(engine, size)] = messages / (time.perf_counter() - start)
+    return results
+
+
+# --- Scenario: multi-threaded server operations ---
+def bench_thread_scaling(module, thread_counts=(1, 2, 4, 8, 16), ops_per_thread: int = 2_000):
+    """
+    Each thread logs in, creates a meeting, posts into a shared meeting and logs out
+    in a loop. Returns {threads: ops/sec}, counting every server call as one op.
+    """
+    meeting_kwargs = {"enable_ai": False} if module is wins_systems_ai_agents_v2 else {}
+    server = _unthrottled(module.NodwinsServer())
+    results = {}
+    with _quiet():
+        for count in thread_counts:
+            server._reset_state()
+            host = server.login_user("admin", "password123")
+            shared = server.create_meeting(host, **meeting_kwargs)
+            barrier = threading.Barrier(count + 1)
+            rounds = max(1, ops_per_thread // 4)
+
+            def work():
+                barrier.wait()
+                for _ in range(rounds):
+                    user = server.login_user("user1", "pass")
+                    server.create_meeting(user, **meeting_kwargs)
+                    shared.add_participant(user)
+                    shared.post_chat_message(user, "hello")
+                    server.logout_user(user.user_id)
+
+            threads = [threading.Thread(target=work) for _ in range(count)]
+            for t in threads:
+                t.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            results[count] = count * rounds * 5 / elapsed
+        server._reset_state()
+    return results
+
+
+# --- Scenario: soak test of meeting lifecycles ---
+def _rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc; falls back to peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_soak(module, lifecycles: int = 100_000, messages_per_meeting: int = 20,
+               sweep_every: int = 1_000, sample_every: int = 10_000, archive: bool = True):
+    """
+    Runs `lifecycles` login -> create -> chat -> end -> logout cycles against one
+    server and samples RSS every `sample_every` cycles. The guest of each meeting
+    never logs out, so its session is only reclaimed by TTL expiry. With
+    archive=False no sweeps run, which shows the unbounded growth for comparison.
+    Returns [(cycles completed, rss_mb, meetings in memory, sessions in memory)].
+    """
+    ai = module is wins_systems_ai_agents_v2
+    # Incremental summaries skip the simulated 0.5s summarization pause.
+    meeting_kwargs = {"enable_ai": True, "incremental_summary": True} if ai else {}
+    server = _unthrottled(module.NodwinsServer())
+    samples = []
+    with tempfile.TemporaryDirectory(prefix="nodwins-soak-") as archive_dir, _quiet():
+        server._reset_state()
+        server.lifecycle = LifecycleManager(server, archive=MeetingArchive(archive_dir),
+                                            grace_period=0, session_ttl=0)
+        samples.append((0, _rss_mb(), len(server.meetings), len(server.users)))
+        for cycle in range(1, lifecycles + 1):
+            host = server.login_user("admin", "password123")
+            guest = server.login_user("user1", "pass")
+            meeting = server.create_meeting(host, **meeting_kwargs)
+            meeting.add_participant(guest)
+            for i in range(messages_per_meeting):
+                speaker = host if i % 2 else guest
+                meeting.post_chat_message(speaker, f"status update {i}: todo review build {cycle}")
+            handle = meeting.end_meeting(host)
+            if ai and handle is not None:
+                handle.result()
+            server.logout_user(host.user_id)
+            if archive and cycle % sweep_every == 0:
+                server.lifecycle.sweep()
+            if cycle % sample_every == 0:
+                samples.append((cycle, _rss_mb(), len(server.meetings), len(server.users)))
+        server._reset_state()
+    return samples
+
+
+# --- Scenario: asyncio front end fan-out under many clients ---
+async def _drive_fanout(host: str, port: int, clients: int, meeting_size: int,
+                        messages_per_client: int, interval: float, timeout: float):
+    latencies = []
+    counters = {"delivered": 0}
+
+    def on_event(event):
+        if event["event"] == "chat":
+            # Messages carry their send time; client and server share one clock.
+            latencies.append(time.perf_counter() - float(event["message"]))
+            counters["delivered"] += 1
+
+    conns = [NodwinsClient(on_event=on_event) for _ in range(clients)]
+    for i in range(0, clients, 100):
+        await asyncio.gather(*(c.connect(host, port) for c in conns[i:i + 100]))
+    await asyncio.gather(*(c.request("login", username="user1", password="pass") for c in conns))
+
+    groups = [conns[i:i + meeting_size] for i in range(0, clients, meeting_size)]
+    seats = []  # (client, meeting_id)
+    for group in groups:
+        meeting_id = (await group[0].request("create", enable_ai=True, incremental_summary=True))["meeting_id"]
+        await asyncio.gather(*(c.request("join", meeting_id=meeting_id) for c in group[1:]))
+        seats.extend((c, meeting_id) for c in group)
+    expected = sum(len(group) ** 2 for group in groups) * messages_per_client
+
+    rng = random.Random(11)
+
+    async def chatter(client, meeting_id, offset):
+        await asyncio.sleep(offset)
+        for _ in range(messages_per_client):
+            client.send("chat", meeting_id=meeting_id, message=f"{time.perf_counter():.6f}")
+            await asyncio.sleep(interval)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chatter(c, meeting_id, rng.uniform(0, interval)) for c, meeting_id in seats))
+    deadline = time.perf_counter() + timeout
+    while counters["delivered"] < expected and time.perf_counter() < deadline:
+        if all(c.closed.is_set() for c in conns):
+            break
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*(c.close() for c in conns))
+    return latencies, expected, elapsed
+
+
+def bench_fanout(clients: int = 1_000, meeting_size: int = 25, messages_per_client: int = 10,
+                 interval: float = 1.0, queue_size: int = DEFAULT_QUEUE_SIZE, slow_consumer: str = "drop",
+                 timeout: float = 60.0):
+    """
+    Runs the asyncio front end on a background thread and `clients` TCP clients
+    on the main thread, in meetings of `meeting_size`. Each client sends
+    `messages_per_client` chats, one every `interval` seconds. Returns the
+    delivery latency percentiles (ms) from send to receipt at every participant.
+    """
+    module = wins_systems_ai_agents_v2
+    server_loop = asyncio.new_event_loop()
+    server_thread = threading.Thread(target=server_loop.run_forever, name="nodwins-async-server", daemon=True)
+    server_thread.start()
+    with _quiet():
+        _unthrottled(module.NodwinsServer())._reset_state()
+        server = AsyncMeetingServer(module, queue_size=queue_size, slow_consumer=slow_consumer)
+        host, port = asyncio.run_coroutine_threadsafe(server.start(), server_loop).result()
+        try:
+            latencies, expected, elapsed = asyncio.run(
+                _drive_fanout(host, port, clients, meeting_size, messages_per_client, interval, timeout))
+        finally:
+            asyncio.run_coroutine_threadsafe(server.close(), server_loop).result()
+            server_loop.call_soon_threadsafe(server_loop.stop)
+            server_thread.join()
+            server_loop.close()
+            server.backend._reset_state()
+
+    latencies_ms = [latency * 1000 for latency in latencies] or [float("nan")]
+    return {
+        "delivered": len(latencies),
+        "expected": expected,
+        "dropped_consumers": server.dropped_consumers,
+        "deliveries_per_sec": len(latencies) / elapsed,
+        "latency_p50_ms": _percentile(latencies_ms, 50),
+        "latency_p90_ms": _percentile(latencies_ms, 90),
+        "latency_p99_ms": _percentile(latencies_ms, 99),
+        "latency_max_ms": max(latencies_ms),
+    }
+
+
+# --- Scenario: logging overhead on the chat path ---
+LOGGING_MODES = {
+    # name: (level, background)
+    "off": ("OFF", True),
+    "info": ("INFO", True),
+    "debug": ("DEBUG", True),
+    "debug-sync": ("DEBUG", False),
+}
+
+
+def bench_logging_overhead(module, messages: int = 100_000, modes=tuple(LOGGING_MODES),
+                           queue_size: int = DEFAULT_LOG_QUEUE_SIZE):
+    """
+    Posts `messages` chat messages (every tenth one an action item) with logging
+    configured per mode and writing to /dev/null. Returns {mode: stats} where
+    caller_us is the per-message cost seen by the poster, total_us includes
+    draining the log queue, and dropped counts records the full queue discarded.
+    """
+    meeting_kwargs = {"enable_ai": True} if module is wins_systems_ai_agents_v2 else {}
+    texts = ["status update", "todo: review the release notes", "looks good to me", "agreed",
+             "let's move on", "any blockers?", "none from me", "shipping today", "thanks all", "great"]
+    results = {}
+    with open(os.devnull, "w") as sink:
+        for mode in modes:
+            level, background = LOGGING_MODES[mode]
+            handler = configure_logging(level, stream=sink, queue_size=queue_size, background=background)
+            try:
+                meeting, users = _make_meeting(module, 10, **meeting_kwargs)
+                start = time.perf_counter()
+                for i in range(messages):
+                    meeting.post_chat_message(users[i % len(users)], texts[i % len(texts)])
+                posted = time.perf_counter() - start
+            finally:
+                shutdown_logging()
+            drained = time.perf_counter() - start
+            results[mode] = {
+                "caller_us": posted / messages * 1e6,
+                "total_us": drained / messages * 1e6,
+                "dropped": getattr(handler, "dropped", 0),
+            }
+    return results
+
+
+# --- Scenario: full-text search over many messages ---
+def _zipf_corpus(messages: int, vocabulary: int, seed: int = 11):
+    """Messages of 4-16 words drawn from a Zipf-distributed vocabulary ('w0' is the most common)."""
+    rng = random.Random(seed)
+    words = [f"w{rank}" for rank in range(vocabulary)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+    cumulative = list(itertools.accumulate(weights))
+    return [" ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(4, 16))) for _ in range(messages)]
+
+
+def bench_search(messages: int = 1_000_000, vocabulary: int = 50_000, meetings: int = 10_000, authors: int = 1_000,
+                 repeats: int = 20):
+    """
+    Indexes `messages` synthetic chat messages (100 per second of simulated time),
+    flushes them to disk segments and times a mix of queries. Returns indexing
+    stats and the median latency (ms) of each query.
+    """
+    corpus = _zipf_corpus(messages, vocabulary)
+    start_ts = 1_700_000_000
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nodwins-search-bench-") as index_dir:
+        index = SearchIndex(index_dir)
+        start = time.perf_counter()
+        for i, text in enumerate(corpus):
+            index.add(f"meet-{i % meetings}", i // meetings, start_ts + i // 100, f"user{i % authors}", text)
+        results["add_msgs_per_sec"] = messages / (time.perf_counter() - start)
+        index.flush()
+        results["index_msgs_per_sec"] = messages / (time.perf_counter() - start)
+        results["segments"] = index.segment_count
+        results["disk_mb"] = sum(os.path.getsize(os.path.join(index_dir, name))
+                                 for name in os.listdir(index_dir)) / 1e6
+        sample = corpus[messages // 2].split()
+        end_ts = start_ts + messages // 100
+        queries = {
+            "rare term": dict(query=f"w{vocabulary // 10}"),
+            "common term, recent": dict(query="w0", order="recent"),
+            "mid term, relevance": dict(query="w500"),
+            "two terms, relevance": dict(query="w50 w2000"),
+            "phrase": dict(query=f'"{sample[0]} {sample[1]}"', order="recent"),
+            "author + term": dict(query="w100", author="user7"),
+            "meeting + term": dict(query="w10", meeting_id="meet-42"),
+            "last hour, no terms": dict(since=end_ts - 3_600, until=end_ts),
+        }
+        for name, kwargs in queries.items():
+            timings = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                index.search(k=10, **kwargs)
+                timings.append((time.perf_counter() - t0) * 1e3)
+            results[f"{name} ms"] = statistics.median(timings)
+        index.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodwins Meets benchmarks")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    p = sub.add_parser("participants", help="chat throughput vs. meeting size")
+    p.add_argument("--version", choices=VERSIONS, default="v1")
+    p.add_argument("--messages", type=int, default=100_000)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 10_000])
+
+    p = sub.add_parser("end-meetings", help="end many AI-enabled meetings at once (v2)")
+    p.add_argument("--meetings", type=int, default=1_000)
+    p.add_argument("--summary-workers", type=int, default=32)
+
+    p = sub.add_parser("action-items", help="action-item detection throughput vs. vocabulary size")
+    p.add_argument("--messages", type=int, default=20_000)
+    p.add_argument("--vocab-sizes", type=int, nargs="+", default=[10, 1_000, 10_000])
+
+    p = sub.add_parser("threads", help="server ops/sec vs. number of client threads")
+    p.add_argument("--version", choices=VERSIONS, default="v2")
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    p.add_argument("--ops-per-thread", type=int, default=2_000)
+
+    p = sub.add_parser("soak", help="resident memory over many meeting lifecycles")
+    p.add_argument("--version", choices=VERSIONS, default="v2")
+    p.add_argument("--lifecycles", type=int, default=100_000)
+    p.add_argument("--sample-every", type=int, default=10_000)
+    p.add_argument("--no-archive", action="store_true", help="never sweep, for a baseline")
+
+    p = sub.add_parser("fanout", help="chat delivery latency through the asyncio front end")
+    p.add_argument("--clients", type=int, default=1_000)
+    p.add_argument("--meeting-size", type=int, default=25)
+    p.add_argument("--messages-per-client", type=int, default=10)
+    p.add_argument("--interval", type=float, default=1.0, help="seconds between a client's messages")
+    p.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    p.add_argument("--slow-consumer", choices=SLOW_CONSUMER_POLICIES, default="drop")
+
+    p = sub.add_parser("logging", help="per-message chat cost with logging off, at INFO and at DEBUG")
+    p.add_argument("--version", choices=VERSIONS, default="v1")
+    p.add_argument("--messages", type=int, default=100_000)
+    p.add_argument("--modes", choices=LOGGING_MODES, nargs="+", default=list(LOGGING_MODES))
+    p.add_argument("--log-queue-size", type=int, default=DEFAULT_LOG_QUEUE_SIZE)
+
+    p = sub.add_parser("search", help="indexing rate and query latency of the full-text search index")
+    p.add_argument("--messages", type=int, default=1_000_000)
+    p.add_argument("--vocabulary", type=int, default=50_000)
+    p.add_argument("--repeats", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.scenario == "participants":
+        module = VERSIONS[args.version]
+        results = bench_participant_scaling(module, sizes=args.sizes, messages=args.messages)
+        print(f"Participant scaling ({args.version}, {args.messages} messages):")
+        for size, rate in results.items():
+            print(f"  {size:>6} participants: {rate:>12,.0f} msgs/sec")
+    elif args.scenario == "end-meetings":
+        results = bench_concurrent_end_meetings(args.meetings, summary_workers=args.summary_workers)
+        print(f"Concurrent end-meeting ({args.meetings} AI meetings, {args.summary_workers} summary workers):")
+        for name, value in results.items():
+            print(f"  {name}: {value:,.3f}")
+    elif args.scenario == "action-items":
+        results = bench_action_item_detection(args.vocab_sizes, messages=args.messages)
+        print(f"Action-item detection ({args.messages} messages):")
+        for (engine, size), rate in results.items():
+            print(f"  {engine:>9} engine, {size:>6} triggers: {rate:>12,.0f} msgs/sec")
+    elif args.scenario == "threads":
+        results = bench_thread_scaling(VERSIONS[args.version], args.threads, args.ops_per_thread)
+        print(f"Thread scaling ({args.version}, {args.ops_per_thread} ops per thread):")
+        for count, rate in results.items():
+            print(f"  {count:>3} threads: {rate:>12,.0f} ops/sec")
+    elif args.scenario == "soak":
+        samples = bench_soak(VERSIONS[args.version], args.lifecycles, sample_every=args.sample_every,
+                             archive=not args.no_archive)
+        print(f"Soak ({args.version}, {args.lifecycles} meeting lifecycles, "
+              f"archival {'off' if args.no_archive else 'on'}):")
+        for cycles, rss, meetings, sessions in samples:
+            print(f"  {cycles:>8} cycles: {rss:>8.1f} MB RSS, {meetings:>7} meetings, {sessions:>7} sessions in memory")
+    elif args.scenario == "fanout":
+        results = bench_fanout(args.clients, args.meeting_size, args.messages_per_client, args.interval,
+                               queue_size=args.queue_size, slow_consumer=args.slow_consumer)
+        print(f"Fan-out ({args.clients} clients, meetings of {args.meeting_size}, "
+              f"{args.messages_per_client} messages each every {args.interval}s):")
+        for name, value in results.items():
+            print(f"  {name}: {value:,.3f}")
+    elif args.scenario == "logging":
+        results = bench_logging_overhead(VERSIONS[args.version], args.messages, modes=args.modes,
+                                         queue_size=args.log_queue_size)
+        print(f"Logging overhead ({args.version}, {args.messages} chat messages):")
+        for mode, stats in results.items():
+            print(f"  {mode:>10}: {stats['caller_us']:>7.2f} us/msg to post, {stats['total_us']:>7.2f} us/msg "
+                  f"incl. drain, {stats['dropped']:>7} dropped")
+    elif args.scenario == "search":
+        results = bench_search(args.messages, args.vocabulary, repeats=args.repeats)
+        print(f"Search ({args.messages} messages, {args.vocabulary} word vocabulary):")
+        for name, value in results.items():
+            print(f"  {name}: {value:,.3f}")
+
+
+if __name__ == "__main__":
+    main()
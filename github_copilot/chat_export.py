@@ -0,0 +1,85 @@
+# chat_export.py
+# Streaming chat-log export for Nodwins Meets.
+# Records are read from a ChatLogStore and written out in buffered chunks, so
+# exporting never materialises the whole log (or the whole report) in memory.
+
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from chat_store import ChatLogStore, ChatRecord
+
+EXPORT_FORMATS = ("text", "jsonl")
+_FILE_EXTENSIONS = {"text": ".txt", "jsonl": ".jsonl"}
+DEFAULT_CHUNK_SIZE = 1_000
+_WRITE_BUFFER_BYTES = 1 << 16
+
+
+def export_file_name(meeting_id: str, fmt: str = "text", compress: bool = False, suffix: str = "") -> str:
+    """Builds the export file name, e.g. 'meet-1234_chat_log.jsonl.gz'."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Expected one of {EXPORT_FORMATS}.")
+    return f"{meeting_id}_chat_log{suffix}{_FILE_EXTENSIONS[fmt]}{'.gz' if compress else ''}"
+
+
+def select_records(store: ChatLogStore, since: Optional[int] = None, until: Optional[int] = None,
+                   after_cursor: Optional[int] = None) -> Iterator[ChatRecord]:
+    """
+    Yields the records in [since, until] (unix seconds, inclusive) that were
+    appended after `after_cursor` was read from ChatLogStore.cursor, i.e. whose
+    sequence number is at least `after_cursor`.
+    """
+    start = 0 if after_cursor is None else after_cursor
+    for record in store.records(start):
+        if since is not None and record.timestamp < since:
+            continue
+        if until is not None and record.timestamp > until:
+            # Records are appended in time order, so nothing later can match.
+            break
+        yield record
+
+
+def _format_jsonl(record: ChatRecord) -> str:
+    return json.dumps(record._asdict(), ensure_ascii=False) + "\n"
+
+
+def _format_text(record: ChatRecord) -> str:
+    return ChatLogStore.render_log_line(record) + "\n"
+
+
+def write_records(records: Iterable[ChatRecord], file_path: str, fmt: str = "text", compress: bool = False,
+                  header: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Streams records to `file_path` in chunks of `chunk_size` lines. Returns the number written."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Expected one of {EXPORT_FORMATS}.")
+    formatter: Callable[[ChatRecord], str] = _format_jsonl if fmt == "jsonl" else _format_text
+    if compress:
+        f = gzip.open(file_path, "wt", encoding="utf-8")
+    else:
+        f = open(file_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_BYTES)
+
+    written = 0
+    with f:
+        if header:
+            f.write(header)
+        chunk = []
+        for record in records:
+            chunk.append(formatter(record))
+            if len(chunk) >= chunk_size:
+                f.write("".join(chunk))
+                written += len(chunk)
+                chunk.clear()
+        if chunk:
+            f.write("".join(chunk))
+            written += len(chunk)
+    return written
+
+
+def export_in_parallel(export_one: Callable[[str], str], meeting_ids: Iterable[str],
+                       max_workers: int = 4) -> Dict[str, str]:
+    """Runs `export_one(meeting_id)` on a thread pool; returns {meeting_id: file_path}."""
+    meeting_ids = list(meeting_ids)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-export") as pool:
+        futures = {meeting_id: pool.submit(export_one, meeting_id) for meeting_id in meeting_ids}
+        return {meeting_id: future.result() for meeting_id, future in futures.items()}
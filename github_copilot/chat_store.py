@@ -0,0 +1,183 @@
+# chat_store.py
+# Compact, bounded chat-log storage shared by Nodwins Meets v1 and v2.
+# Messages are kept as small records (timestamp, user, text) and only rendered
+# to text when they are read or exported. The newest `ring_size` records live in
+# memory; older ones spill into an append-only segment file on disk.
+
+import os
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_RING_SIZE = 10_000
+
+# Segment record header: timestamp (int64), user index (uint32), message length (uint32).
+_HEADER = struct.Struct("<qII")
+
+
+class ChatRecord(NamedTuple):
+    """A single chat message as handed out to readers."""
+    seq: int
+    timestamp: int
+    user_id: str
+    username: str
+    message: str
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ChatLogStore:
+    """
+    Append-only chat log with a fixed-size in-memory ring and a spill segment.
+
+    Every message gets a sequence number (its position in the log), which can be
+    used as a cursor by readers. Records older than the ring are still readable;
+    they are streamed back from the segment file.
+    """
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE, spill_dir: Optional[str] = None):
+        if ring_size < 1:
+            raise ValueError("ring_size must be at least 1.")
+        self.ring_size = ring_size
+        self._spill_dir = spill_dir
+        # In-memory records are (timestamp, user index, message) tuples.
+        self._ring: Deque[Tuple[int, int, str]] = deque()
+        self._spilled = 0
+        self._segment_path: Optional[str] = None
+        self._segment = None
+        self._closed = False
+        # Makes append atomic and lets readers take a consistent snapshot.
+        self._lock = threading.Lock()
+        # Users are interned so each record only carries a small int.
+        self._user_index: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        self._usernames: List[str] = []
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._ring)
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number the next appended message will get."""
+        return len(self)
+
+    @property
+    def spilled_count(self) -> int:
+        return self._spilled
+
+    @property
+    def segment_path(self) -> Optional[str]:
+        return self._segment_path
+
+    def _intern_user(self, user_id: str, username: str) -> int:
+        idx = self._user_index.get(user_id)
+        if idx is None:
+            idx = len(self._user_ids)
+            self._user_index[user_id] = idx
+            self._user_ids.append(user_id)
+            self._usernames.append(username)
+        return idx
+
+    def append(self, user_id: str, username: str, message: str, timestamp: Optional[int] = None) -> int:
+        """Stores a message and returns its sequence number."""
+        ts = int(time.time()) if timestamp is None else int(timestamp)
+        with self._lock:
+            if len(self._ring) >= self.ring_size:
+                self._spill(self._ring.popleft())
+            self._ring.append((ts, self._intern_user(user_id, username), message))
+            return len(self) - 1
+
+    def _spill(self, entry: Tuple[int, int, str]):
+        self._spilled += 1
+        if self._closed:
+            return
+        if self._segment is None:
+            fd, self._segment_path = tempfile.mkstemp(prefix="nodwins-chat-", suffix=".seg", dir=self._spill_dir)
+            self._segment = os.fdopen(fd, "ab")
+            # Remove the segment file when the store is garbage collected.
+            self._finalizer = weakref.finalize(self, _remove_file, self._segment_path)
+        ts, user_idx, message = entry
+        data = message.encode("utf-8")
+        self._segment.write(_HEADER.pack(ts, user_idx, len(data)))
+        self._segment.write(data)
+
+    def _make_record(self, seq: int, entry: Tuple[int, int, str]) -> ChatRecord:
+        ts, user_idx, message = entry
+        return ChatRecord(seq, ts, self._user_ids[user_idx], self._usernames[user_idx], message)
+
+    def _iter_segment(self, f, start: int, count: int) -> Iterator[ChatRecord]:
+        with f:
+            for seq in range(count):
+                header = f.read(_HEADER.size)
+                ts, user_idx, length = _HEADER.unpack(header)
+                if seq < start:
+                    f.seek(length, os.SEEK_CUR)
+                    continue
+                yield self._make_record(seq, (ts, user_idx, f.read(length).decode("utf-8")))
+
+    def records(self, start: int = 0) -> Iterator[ChatRecord]:
+        """Yields records in order, starting at sequence number `start`."""
+        start = max(start, 0)
+        # Snapshot under the lock so concurrent appends (and spills) cannot
+        # cause records to be skipped or repeated. The segment is opened here
+        # too: an iteration that has started keeps its handle, so a concurrent
+        # close() cannot pull the file out from under it.
+        with self._lock:
+            base = self._spilled
+            ring = list(self._ring)
+            segment = None
+            if start < base and self._segment is not None:
+                self._segment.flush()
+                segment = open(self._segment_path, "rb")
+        if segment is not None:
+            yield from self._iter_segment(segment, start, base)
+        for offset in range(max(start - base, 0), len(ring)):
+            yield self._make_record(base + offset, ring[offset])
+
+    def first(self) -> Optional[ChatRecord]:
+        return next(self.records(), None)
+
+    def last(self) -> Optional[ChatRecord]:
+        with self._lock:
+            if not self._ring:
+                return None
+            return self._make_record(len(self) - 1, self._ring[-1])
+
+    # --- Rendering (only done on read/export) ---
+    @staticmethod
+    def render_log_line(record: ChatRecord) -> str:
+        return f"[{time.ctime(record.timestamp)}] {record.username}: {record.message}"
+
+    @staticmethod
+    def render_transcript_line(record: ChatRecord) -> str:
+        return f"{record.username}: {record.message}"
+
+    def log_lines(self, start: int = 0) -> Iterator[str]:
+        for record in self.records(start):
+            yield self.render_log_line(record)
+
+    def transcript_lines(self, start: int = 0) -> Iterator[str]:
+        for record in self.records(start):
+            yield self.render_transcript_line(record)
+
+    def close(self):
+        """
+        Deletes the spill segment. Spilled records (and any that overflow the
+        ring afterwards) are discarded; the in-memory ring stays readable.
+        Iterations over records() that already started finish unaffected.
+        """
+        with self._lock:
+            self._closed = True
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+                self._finalizer()
+                self._segment_path = None
@@ -0,0 +1,259 @@
+# lifecycle.py
+# Lifecycle management for Nodwins Meets servers (v1 and v2).
+# Ended meetings are archived to a compact on-disk record after a grace period
+# and dropped from memory; their summary and action items can still be loaded
+# lazily by id. Idle sessions are logged out once they exceed a TTL.
+# Archived meetings are dropped from the server's search index (if enabled)
+# once they have been archived for `search_retention` seconds.
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from chat_export import write_records
+
+DEFAULT_GRACE_PERIOD = 300.0      # seconds an ended meeting stays in memory
+DEFAULT_SESSION_TTL = 3600.0      # seconds of inactivity before a session expires
+DEFAULT_SEARCH_RETENTION = 7 * 24 * 3600.0  # seconds an archived meeting stays searchable
+_ARCHIVE_CACHE_SIZE = 128
+
+
+class ArchivedMeeting(NamedTuple):
+    """What is kept of a meeting once it has been archived."""
+    meeting_id: str
+    host_id: str
+    host_name: str
+    ended_at: float
+    message_count: int
+    participant_ids: Tuple[str, ...]
+    summary: Optional[str]
+    action_items: Tuple[str, ...]
+    summary_error: Optional[str] = None   # why the AI summary could not be generated
+
+
+class MeetingArchive:
+    """
+    Append-only archive of ended meetings.
+
+    Records are JSON lines in a single data file; only a {meeting_id: offset}
+    index stays in memory. load() seeks to the record on demand and keeps a
+    small LRU cache of recently loaded records.
+
+    Without an `archive_dir` a temporary directory is used; it is removed by
+    close() or when the archive is garbage collected.
+    """
+    def __init__(self, archive_dir: Optional[str] = None):
+        self._archive_dir = archive_dir
+        self._remove_temp_dir: Optional[weakref.finalize] = None
+        self._index: Dict[str, int] = {}
+        self._cache: "OrderedDict[str, ArchivedMeeting]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._data_path: Optional[str] = None
+        if archive_dir is not None:
+            self._open(archive_dir)
+
+    def _open(self, archive_dir: str):
+        os.makedirs(archive_dir, exist_ok=True)
+        self._archive_dir = archive_dir
+        self._data_path = os.path.join(archive_dir, "meetings.jsonl")
+        # Rebuild the id index from an existing archive.
+        if os.path.exists(self._data_path):
+            with open(self._data_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    self._index[json.loads(line)["meeting_id"]] = offset
+                    offset += len(line)
+
+    @property
+    def archive_dir(self) -> str:
+        """The archive directory (a temporary one is created on first use if none was given)."""
+        with self._lock:
+            if self._archive_dir is None:
+                temp_dir = tempfile.mkdtemp(prefix="nodwins-archive-")
+                self._remove_temp_dir = weakref.finalize(self, shutil.rmtree, temp_dir, True)
+                self._open(temp_dir)
+            return self._archive_dir
+
+    def __contains__(self, meeting_id: str) -> bool:
+        return meeting_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, record: ArchivedMeeting):
+        line = (json.dumps(record._asdict(), ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        if self._data_path is None:
+            self.archive_dir  # creates the temporary archive directory on first use
+        with self._lock:
+            with open(self._data_path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._index[record.meeting_id] = offset
+
+    def load(self, meeting_id: str) -> Optional[ArchivedMeeting]:
+        with self._lock:
+            cached = self._cache.get(meeting_id)
+            if cached is not None:
+                self._cache.move_to_end(meeting_id)
+                return cached
+            offset = self._index.get(meeting_id)
+            if offset is None:
+                return None
+            with open(self._data_path, "rb") as f:
+                f.seek(offset)
+                data = json.loads(f.readline())
+            record = ArchivedMeeting(
+                **{**data, "participant_ids": tuple(data["participant_ids"]), "action_items": tuple(data["action_items"])}
+            )
+            self._cache[meeting_id] = record
+            if len(self._cache) > _ARCHIVE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return record
+
+    def close(self):
+        """
+        Deletes a temporary archive directory and forgets its records. An
+        explicitly given archive_dir is left on disk.
+        """
+        with self._lock:
+            if self._remove_temp_dir is None:
+                return
+            self._remove_temp_dir()
+            self._remove_temp_dir = None
+            self._archive_dir = None
+            self._data_path = None
+            self._index.clear()
+            self._cache.clear()
+
+
+class LifecycleManager:
+    """
+    Archives ended meetings and expires idle sessions for a NodwinsServer.
+
+    sweep() does one pass; start() runs sweeps on a background thread every
+    `interval` seconds. With keep_chat_logs=True the chat log of each archived
+    meeting is also written to '<archive_dir>/<meeting_id>.jsonl.gz'.
+
+    When the server has a search index, an archived meeting stays searchable
+    for `search_retention` seconds (a week by default) and is then dropped
+    from it, so the index only grows with the meetings still searchable.
+    """
+    def __init__(self, server, archive: Optional[MeetingArchive] = None,
+                 grace_period: float = DEFAULT_GRACE_PERIOD, session_ttl: float = DEFAULT_SESSION_TTL,
+                 keep_chat_logs: bool = False, search_retention: float = DEFAULT_SEARCH_RETENTION,
+                 clock: Callable[[], float] = time.time):
+        self.server = server
+        self.archive = archive if archive is not None else MeetingArchive()
+        self.grace_period = grace_period
+        self.session_ttl = session_ttl
+        self.keep_chat_logs = keep_chat_logs
+        self.search_retention = search_retention
+        self.clock = clock
+        # (archived at, meeting id) of archived meetings still in the search index, oldest first.
+        self._searchable: Deque[Tuple[float, str]] = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_meeting_id_taken(self, meeting_id: str) -> bool:
+        return meeting_id in self.server.meetings or meeting_id in self.archive
+
+    def _archivable(self, meeting, now: float) -> bool:
+        ended_at = getattr(meeting, "ended_at", None)
+        if meeting.is_active or ended_at is None or now - ended_at < self.grace_period:
+            return False
+        # Wait for a pending AI summary so it can be archived with the meeting.
+        handle = getattr(meeting, "summary_handle", None)
+        return handle is None or handle.done()
+
+    def _archive_meeting(self, meeting, now: float):
+        agent = getattr(meeting, "ai_agent", None)
+        summary = agent.summary if agent is not None else None
+        action_items = tuple(sorted(agent.action_items)) if agent is not None else ()
+        handle = getattr(meeting, "summary_handle", None)
+        error = handle.exception() if handle is not None else None
+        record = ArchivedMeeting(
+            meeting_id=meeting.meeting_id,
+            host_id=meeting.host.user_id,
+            host_name=meeting.host.username,
+            ended_at=meeting.ended_at,
+            message_count=len(meeting.chat_store),
+            participant_ids=tuple(user.user_id for user in meeting.participants),
+            summary=summary,
+            action_items=action_items,
+            summary_error=str(error) if error is not None else None,
+        )
+        if self.keep_chat_logs:
+            path = os.path.join(self.archive.archive_dir, f"{meeting.meeting_id}.jsonl.gz")
+            write_records(meeting.chat_store.records(), path, fmt="jsonl", compress=True)
+        # Archive first, then drop from memory, so the id is never free in between.
+        self.archive.add(record)
+        self.server.meetings.pop(meeting.meeting_id, None)
+        meeting.chat_store.close()
+        if getattr(meeting, "search_index", None) is not None:
+            self._searchable.append((now, meeting.meeting_id))
+
+    def archive_ended_meetings(self, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        archived = 0
+        for meeting in self.server.meetings.values():
+            if self._archivable(meeting, now):
+                self._archive_meeting(meeting, now)
+                archived += 1
+        self._expire_search(now)
+        return archived
+
+    def _expire_search(self, now: float):
+        """Drops meetings archived more than search_retention ago from the search index."""
+        index = getattr(self.server, "search_index", None)
+        while self._searchable and now - self._searchable[0][0] >= self.search_retention:
+            _, meeting_id = self._searchable.popleft()
+            if index is not None:
+                index.drop_meeting(meeting_id)
+
+    def expire_idle_sessions(self, now: Optional[float] = None) -> int:
+        """Logs out idle users and removes them from the meetings they were still in."""
+        now = self.clock() if now is None else now
+        expired = set()
+        for user_id, user in self.server.users.items():
+            if now - user.last_active >= self.session_ttl and self.server.logout_user(user_id):
+                expired.add(user_id)
+        if expired:
+            for meeting in self.server.meetings.values():
+                for user in meeting.participants:
+                    if user.user_id in expired:
+                        meeting.remove_participant(user)
+        return len(expired)
+
+    def sweep(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """Runs one lifecycle pass. Returns (meetings archived, sessions expired)."""
+        now = self.clock() if now is None else now
+        return self.archive_ended_meetings(now), self.expire_idle_sessions(now)
+
+    def start(self, interval: float = 30.0):
+        """Runs sweep() every `interval` seconds on a daemon thread."""
+        if self.is_running:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.sweep()
+
+        self._thread = threading.Thread(target=loop, name="nodwins-lifecycle", daemon=True)
+        self._thread.start()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
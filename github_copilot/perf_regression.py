@@ -0,0 +1,377 @@
+# perf_regression.py
+# Performance regression suite for Nodwins Meets: runs the same scenarios
+# against v1 and v2, records throughput, latency percentiles and peak memory to
+# a JSON baseline, and fails when a metric regresses beyond its threshold.
+#
+#   python perf_regression.py --update          # record perf_baseline.json
+#   python perf_regression.py                   # compare against it (exit 1 on regression)
+#   python perf_regression.py --scale 0.1 --threshold ops_per_sec=0.4
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from admission import AdmissionController, fixed_sampler
+from benchmarks import VERSIONS, _percentile, _quiet, _unthrottled
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+# Allowed relative change before a metric counts as a regression. Throughput
+# varies by up to ~25% between processes on a shared single-core VM.
+DEFAULT_THRESHOLDS = {
+    "ops_per_sec": 0.35,   # may drop by 35%
+    "p50_ms": 0.50,        # may rise by 50%
+    "p95_ms": 0.75,
+    "p99_ms": 1.00,
+    "peak_mem_mb": 0.25,
+}
+HIGHER_IS_BETTER = {"ops_per_sec"}
+# Absolute changes below these are treated as timer/allocator noise.
+NOISE_FLOORS = {"p50_ms": 0.05, "p95_ms": 0.1, "p99_ms": 0.2, "peak_mem_mb": 0.5}
+# Fewest runs per scenario the command line accepts; a median of fewer is one noisy sample.
+MIN_REPEATS = 3
+
+
+class ScenarioRun(NamedTuple):
+    """Raw outcome of one scenario run: per-operation latencies and wall time."""
+    latencies: List[float]
+    elapsed: float
+
+
+class Regression(NamedTuple):
+    version: str
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    limit: float
+
+    def describe(self) -> str:
+        return (f"{self.version} {self.scenario} {self.metric}: {self.baseline:,.3f} -> {self.current:,.3f} "
+                f"({self.change:+.0%}, limit {self.limit:.0%})")
+
+
+def _timed(operation: Callable[[], object], latencies: List[float]):
+    start = time.perf_counter()
+    operation()
+    latencies.append(time.perf_counter() - start)
+
+
+def _run_threads(worker: Callable[[int], None], threads: int):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(worker, i) for i in range(threads)]:
+            future.result()
+
+
+def _fresh_server(module):
+    server = _unthrottled(module.NodwinsServer())
+    server._reset_state()
+    return server
+
+
+def _create_kwargs(module, **v2_options) -> Dict[str, object]:
+    return v2_options if module is VERSIONS["v2"] else {}
+
+
+# --- Scenarios: each takes (module, scale) and returns a ScenarioRun ---
+def scenario_login_storm(module, scale: float = 1.0, threads: int = 8) -> ScenarioRun:
+    """Many clients log in at once, then log out."""
+    server = _fresh_server(module)
+    per_thread = max(1, int(500 * scale))
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(_):
+        local: List[float] = []
+        users = []
+        for _ in range(per_thread):
+            _timed(lambda: users.append(server.login_user("user1", "pass")), local)
+        for user in users:
+            server.logout_user(user.user_id)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    _run_threads(worker, threads)
+    return ScenarioRun(latencies, time.perf_counter() - start)
+
+
+def scenario_meeting_creation(module, scale: float = 1.0) -> ScenarioRun:
+    """One host creates meetings back to back (v2 with its default AI agent)."""
+    server = _fresh_server(module)
+    host = server.login_user("admin", "password123")
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(max(1, int(2_000 * scale))):
+        _timed(lambda: server.create_meeting(host), latencies)
+    return ScenarioRun(latencies, time.perf_counter() - start)
+
+
+def scenario_chat_burst(module, scale: float = 1.0, participants: int = 50, threads: int = 4) -> ScenarioRun:
+    """Participants of one meeting post concurrently."""
+    server = _fresh_server(module)
+    host = server.login_user("admin", "password123")
+    meeting = server.create_meeting(host, **_create_kwargs(module, enable_ai=True, incremental_summary=True))
+    users = [server.login_user("user1", "pass") for _ in range(participants)]
+    for user in users:
+        meeting.add_participant(user)
+    per_thread = max(1, int(5_000 * scale))
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(index):
+        local: List[float] = []
+        for i in range(per_thread):
+            user = users[(index + i * threads) % participants]
+            _timed(lambda: meeting.post_chat_message(user, f"todo: check build {i} @bob"), local)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    _run_threads(worker, threads)
+    return ScenarioRun(latencies, time.perf_counter() - start)
+
+
+def scenario_end_meeting_ai(module, scale: float = 1.0, messages: int = 20) -> ScenarioRun:
+    """
+    Ends many meetings at once. v2 meetings run the (non-incremental) AI summary
+    on the worker pool, so wall time covers every summary being ready.
+    """
+    server = _fresh_server(module)
+    batch = []
+    for _ in range(max(1, int(64 * scale))):
+        host = server.login_user("admin", "password123")
+        meeting = server.create_meeting(host, **_create_kwargs(module, enable_ai=True))
+        for i in range(messages):
+            meeting.post_chat_message(host, f"status {i}: action item for @ops")
+        batch.append((meeting, host))
+    latencies: List[float] = []
+    handles = []
+    start = time.perf_counter()
+    for meeting, host in batch:
+        _timed(lambda: handles.append(meeting.end_meeting(host)), latencies)
+    wait([handle for handle in handles if hasattr(handle, "result")])
+    return ScenarioRun(latencies, time.perf_counter() - start)
+
+
+def scenario_export(module, scale: float = 1.0) -> ScenarioRun:
+    """Streams a large chat log to disk in every export format."""
+    server = _fresh_server(module)
+    host = server.login_user("admin", "password123")
+    meeting = server.create_meeting(host, **_create_kwargs(module, enable_ai=False))
+    for i in range(max(1, int(20_000 * scale))):
+        meeting.post_chat_message(host, f"line {i}: the export should stream this without buffering")
+    latencies: List[float] = []
+    with tempfile.TemporaryDirectory(prefix="nodwins-perf-") as output_dir:
+        start = time.perf_counter()
+        for fmt in ("text", "jsonl"):
+            for compress in (False, True):
+                _timed(lambda: server.export_chat_log(meeting.meeting_id, host, fmt=fmt, compress=compress,
+                                                      output_dir=output_dir), latencies)
+        elapsed = time.perf_counter() - start
+    return ScenarioRun(latencies, elapsed)
+
+
+def scenario_admission(module, scale: float = 1.0) -> ScenarioRun:
+    """
+    Simulated overload: admission control must turn away every new meeting, and
+    do so quickly. Raises if any meeting slips through.
+    """
+    server = _fresh_server(module)
+    server.admission = AdmissionController(sampler=fixed_sampler(cpu=0.99, memory=0.5), sample_ttl=0)
+    host = server.login_user("admin", "password123")
+    latencies: List[float] = []
+    attempts = max(1, int(2_000 * scale))
+    start = time.perf_counter()
+    try:
+        for _ in range(attempts):
+            began = time.perf_counter()
+            try:
+                server.create_meeting(host)
+            except module.ResourcesExhaustedError:
+                pass
+            latencies.append(time.perf_counter() - began)
+    finally:
+        _unthrottled(server)
+    elapsed = time.perf_counter() - start
+    if len(server.meetings):
+        raise AssertionError(f"Admission control admitted {len(server.meetings)} meetings under overload.")
+    return ScenarioRun(latencies, elapsed)
+
+
+SCENARIOS: Dict[str, Callable[..., ScenarioRun]] = {
+    "login_storm": scenario_login_storm,
+    "meeting_creation": scenario_meeting_creation,
+    "chat_burst": scenario_chat_burst,
+    "end_meeting_ai": scenario_end_meeting_ai,
+    "export": scenario_export,
+    "admission": scenario_admission,
+}
+
+
+# --- Measurement ---
+def measure(scenario: Callable[..., ScenarioRun], module, scale: float = 1.0, repeats: int = 5) -> Dict[str, float]:
+    """
+    Runs a scenario `repeats` times and reports the median throughput and
+    latency percentiles over those runs, so one lucky or unlucky run does not
+    move the result. The scenario then runs once more under tracemalloc for the
+    peak Python heap size.
+    """
+    runs: List[Dict[str, float]] = []
+    with _quiet():
+        for _ in range(max(1, repeats)):
+            gc.collect()
+            run = scenario(module, scale)
+            latencies_ms = [latency * 1000 for latency in run.latencies]
+            runs.append({
+                "ops_per_sec": len(run.latencies) / run.elapsed,
+                "p50_ms": _percentile(latencies_ms, 50),
+                "p95_ms": _percentile(latencies_ms, 95),
+                "p99_ms": _percentile(latencies_ms, 99),
+            })
+        tracemalloc.start()
+        try:
+            scenario(module, scale)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        module.NodwinsServer()._reset_state()
+    results = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+    results["peak_mem_mb"] = peak / (1024 * 1024)
+    return results
+
+
+def run_suite(versions: Sequence[str] = tuple(VERSIONS), scenarios: Sequence[str] = tuple(SCENARIOS),
+              scale: float = 1.0, repeats: int = 5, progress: Callable[[str], None] = lambda _: None
+              ) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Returns {version: {scenario: {metric: value}}}, running identical scenarios per version."""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for version in versions:
+        for name in scenarios:
+            progress(f"{version} {name}")
+            results.setdefault(version, {})[name] = measure(SCENARIOS[name], VERSIONS[version], scale, repeats)
+    return results
+
+
+def compare(baseline: Dict[str, Dict[str, Dict[str, float]]], current: Dict[str, Dict[str, Dict[str, float]]],
+            thresholds: Optional[Dict[str, float]] = None) -> List[Regression]:
+    """Lists every metric in `current` that is worse than `baseline` by more than its threshold."""
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    regressions = []
+    for version, scenarios in current.items():
+        for scenario, metrics in scenarios.items():
+            reference = baseline.get(version, {}).get(scenario, {})
+            for metric, value in metrics.items():
+                old = reference.get(metric)
+                limit = thresholds.get(metric)
+                if old is None or limit is None or old <= 0:
+                    continue
+                change = (value - old) / old
+                if metric in HIGHER_IS_BETTER:
+                    regressed = change < -limit
+                else:
+                    regressed = change > limit and value - old > NOISE_FLOORS.get(metric, 0.0)
+                if regressed:
+                    regressions.append(Regression(version, scenario, metric, old, value, change, limit))
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, object]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results, scale: float, thresholds: Dict[str, float], repeats: int):
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "repeats": repeats,
+        "thresholds": thresholds,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _print_results(results):
+    print(f"{'scenario':<18} {'metric':<12} " + " ".join(f"{v:>12}" for v in results) +
+          ("   v2/v1" if {"v1", "v2"} <= set(results) else ""))
+    scenarios = next(iter(results.values()))
+    for scenario, metrics in scenarios.items():
+        for metric in metrics:
+            values = [results[v][scenario][metric] for v in results]
+            line = f"{scenario:<18} {metric:<12} " + " ".join(f"{value:>12,.3f}" for value in values)
+            if {"v1", "v2"} <= set(results) and results["v1"][scenario][metric]:
+                line += f"   {results['v2'][scenario][metric] / results['v1'][scenario][metric]:>5.2f}x"
+            print(line)
+
+
+def _parse_thresholds(items: Sequence[str]) -> Dict[str, float]:
+    thresholds = {}
+    for item in items:
+        metric, _, value = item.partition("=")
+        if metric not in DEFAULT_THRESHOLDS or not value:
+            raise argparse.ArgumentTypeError(f"Expected METRIC=FRACTION with METRIC in {sorted(DEFAULT_THRESHOLDS)}.")
+        thresholds[metric] = float(value)
+    return thresholds
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Nodwins Meets v1/v2 performance regression suite")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update", action="store_true", help="record a new baseline instead of comparing")
+    parser.add_argument("--versions", nargs="+", choices=VERSIONS, default=list(VERSIONS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for every scenario's size")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help=f"runs per scenario whose median is reported (at least {MIN_REPEATS})")
+    parser.add_argument("--threshold", nargs="*", default=[], metavar="METRIC=FRACTION",
+                        help="override an allowed relative change, e.g. ops_per_sec=0.4")
+    args = parser.parse_args(argv)
+    if args.repeats < MIN_REPEATS:
+        parser.error(f"--repeats must be at least {MIN_REPEATS} for the medians to be stable.")
+
+    baseline = None
+    if not args.update and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+        if baseline.get("scale") != args.scale:
+            parser.error(f"Baseline was recorded at --scale {baseline.get('scale')}; rerun with that scale or --update.")
+
+    results = run_suite(args.versions, args.scenarios, args.scale, args.repeats,
+                        progress=lambda name: print(f"running {name}...", file=sys.stderr))
+    _print_results(results)
+
+    if baseline is None:
+        thresholds = {**DEFAULT_THRESHOLDS, **_parse_thresholds(args.threshold)}
+        save_baseline(args.baseline, results, args.scale, thresholds, args.repeats)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    thresholds = {**baseline.get("thresholds", {}), **_parse_thresholds(args.threshold)}
+    regressions = compare(baseline["results"], results, thresholds)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression.describe()}")
+        return 1
+    print(f"\nNo regressions against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,854 @@
+# search_index.py
+# Full-text search over Nodwins Meets chat logs (v1 and v2; a v2 AI transcript
+# shares its meeting's chat store, so it is covered too).
+# post_chat_message adds each message to an in-memory segment. Once that holds
+# `flush_threshold` messages it is frozen and a background worker writes it
+# out as an immutable on-disk segment; runs of `merge_factor` equal-level
+# segments are then merged into one (the same stack discipline as the AI
+# agent's chunk summaries), so a query only touches O(log n) segments.
+# Postings are stored as raw uint32 doc-id and uint8 term-frequency arrays and
+# the term dictionary as sorted arrays, all read in place from the mmapped
+# segment file, so a written segment costs almost no Python memory.
+# drop_meeting() hides a meeting's messages at once; they are left out of the
+# next merge, and a segment that is mostly dropped messages is rewritten early.
+
+import bisect
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import weakref
+from array import array
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from structured_logging import get_logger
+
+logger = get_logger("search")
+
+DEFAULT_FLUSH_THRESHOLD = 50_000  # messages buffered in memory before a segment is written
+DEFAULT_MERGE_FACTOR = 8          # equal-level segments merged into one
+DEFAULT_INVERT_BATCH = 256        # pending messages that trigger a background inversion
+_COMPACT_RATIO = 0.5              # share of dropped messages that gets a segment rewritten
+SEARCH_ORDERS = ("relevance", "recent")
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_MAX_TF = 255
+_MAX_LENGTH = 65_535
+
+_TOKEN = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+# Author and meeting filters are indexed as pseudo-terms; tokens never contain \x01.
+_AUTHOR_FIELD = "\x01a:"
+_MEETING_FIELD = "\x01m:"
+
+# Per-message columns: name, array typecode.
+_COLUMNS = (("meeting", "I"), ("seq", "I"), ("timestamp", "q"), ("author", "I"), ("length", "H"))
+_FOOTER_LENGTH = struct.Struct("<Q")
+_MANIFEST = "manifest.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens; the same tokenizer is used for messages and queries."""
+    return _TOKEN.findall(text.lower())
+
+
+class ParsedQuery(NamedTuple):
+    terms: Tuple[str, ...]                    # every word that must occur (phrase words included)
+    phrases: Tuple[Tuple[str, ...], ...]      # multi-word phrases that must occur in order
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """Splits 'deploy "release notes"' into required terms and quoted phrases."""
+    terms: List[str] = []
+    phrases: List[Tuple[str, ...]] = []
+    for phrase, word in _QUERY_PART.findall(query):
+        tokens = tokenize(phrase or word)
+        if phrase and len(tokens) > 1:
+            phrases.append(tuple(tokens))
+        for token in tokens:
+            if token not in terms:
+                terms.append(token)
+    return ParsedQuery(tuple(terms), tuple(phrases))
+
+
+class SearchHit(NamedTuple):
+    meeting_id: str
+    seq: int
+    timestamp: int
+    username: str
+    message: str
+    score: float
+
+
+def _contains_phrase(tokens: List[str], phrase: Tuple[str, ...]) -> bool:
+    n = len(phrase)
+    first = phrase[0]
+    for i in range(len(tokens) - n + 1):
+        if tokens[i] == first and tuple(tokens[i:i + n]) == phrase:
+            return True
+    return False
+
+
+class _MemorySegment:
+    """
+    The segment new messages are appended to. add() only stores the message
+    (under the index lock); invert() tokenizes the messages added since its
+    last call into the postings, so the posting path never pays for it.
+    """
+    level = 0
+
+    def __init__(self, base: int):
+        self.base = base
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array(typecode))
+        self._text = bytearray()
+        self.text_offsets = array("Q", [0])
+        self._uninverted: Deque[str] = deque()
+        # A term seen once maps to the int (local << 8 | tf) instead of two arrays, which
+        # keeps the many one-off terms (numbers, typos) cheap; a second posting upgrades it.
+        self.postings: Dict[str, Union[int, Tuple[array, array]]] = {}
+        self.inverted = 0            # messages [0, inverted) are in the postings
+        self.total_length = 0        # tokens in the inverted messages
+        self._invert_lock = threading.Lock()
+        self.min_ts: Optional[int] = None
+        self.max_ts: Optional[int] = None
+
+    def __len__(self) -> int:
+        # The text offset is appended last, so readers never see a half-added message.
+        return len(self.text_offsets) - 1
+
+    def add(self, meeting: int, seq: int, timestamp: int, author: int, text: str):
+        self.meeting.append(meeting)
+        self.seq.append(seq)
+        self.timestamp.append(timestamp)
+        self.author.append(author)
+        if self.min_ts is None or timestamp < self.min_ts:
+            self.min_ts = timestamp
+        if self.max_ts is None or timestamp > self.max_ts:
+            self.max_ts = timestamp
+        self._uninverted.append(text)
+        self._text += text.encode("utf-8")
+        self.text_offsets.append(len(self._text))
+
+    def invert(self) -> int:
+        """Adds every pending message to the postings; returns how many are now searchable."""
+        with self._invert_lock:
+            postings, length = self.postings, self.length
+            local = self.inverted
+            while self._uninverted:
+                tokens = tokenize(self._uninverted.popleft())
+                term_counts: Dict[str, int] = {}
+                for token in tokens:
+                    term_counts[token] = term_counts.get(token, 0) + 1
+                # Filters are pseudo-terms keyed by the interned meeting and author numbers.
+                term_counts[_meeting_term(self.meeting[local])] = 1
+                term_counts[f"{_AUTHOR_FIELD}{self.author[local]}"] = 1
+                for term, tf in term_counts.items():
+                    if tf > _MAX_TF:
+                        tf = _MAX_TF
+                    entry = postings.get(term)
+                    if entry is None:
+                        postings[term] = local << 8 | tf
+                        continue
+                    if entry.__class__ is int:
+                        entry = postings[term] = (array("I", [entry >> 8]), array("B", [entry & 0xFF]))
+                    entry[0].append(local)
+                    entry[1].append(tf)
+                length.append(len(tokens) if len(tokens) <= _MAX_LENGTH else _MAX_LENGTH)
+                self.total_length += len(tokens)
+                local += 1
+                self.inverted = local
+            return self.inverted
+
+    @property
+    def pending(self) -> int:
+        return len(self._uninverted)
+
+    @property
+    def fully_inverted(self) -> bool:
+        return self.inverted == len(self)
+
+    def sorted_terms(self) -> Iterable[str]:
+        return sorted(self.postings)
+
+    def doc_freq(self, term: str) -> int:
+        entry = self.postings.get(term)
+        if entry is None:
+            return 0
+        return 1 if entry.__class__ is int else len(entry[0])
+
+    def get_postings(self, term: str) -> Optional[Tuple[array, array]]:
+        entry = self.postings.get(term)
+        if entry.__class__ is int:
+            return array("I", [entry >> 8]), array("B", [entry & 0xFF])
+        return entry
+
+    def text(self, local: int) -> str:
+        return self._text[self.text_offsets[local]:self.text_offsets[local + 1]].decode("utf-8")
+
+    def text_region(self) -> Tuple[array, bytes]:
+        """(offsets, data) of the UTF-8 encoded message texts."""
+        end = self.text_offsets[len(self)]
+        return self.text_offsets[:len(self) + 1], bytes(self._text[:end])
+
+
+class _TermTable:
+    """
+    The sorted term dictionary of a segment file: the UTF-8 term texts, their
+    offsets and, per term, the postings offset and document frequency. Lookups
+    binary-search the mmapped bytes (UTF-8 byte order is code point order).
+    """
+    def __init__(self, mm: mmap.mmap, view: memoryview, footer: dict):
+        self._mm = mm
+        self.count = footer["count"]
+        self._text_start = footer["text"]
+        self._offsets = view[footer["offsets"]:footer["offsets"] + 8 * (self.count + 1)].cast("Q")
+        self.postings = view[footer["postings"]:footer["postings"] + 8 * self.count].cast("Q")
+        self.doc_freqs = view[footer["doc_freqs"]:footer["doc_freqs"] + 4 * self.count].cast("I")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        for view in (self._offsets, self.postings, self.doc_freqs):
+            view.release()
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._mm[self._text_start + self._offsets[i]:self._text_start + self._offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self[i].decode("utf-8")
+
+    def find(self, term: str) -> int:
+        """Index of `term`, or -1."""
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self, key)
+        return i if i < self.count and self[i] == key else -1
+
+
+class _DiskSegment:
+    """
+    An immutable segment file: per-message columns, the text offsets, the
+    postings, the message texts and the term table, followed by a small JSON
+    footer of counts and section offsets. Columns are memoryviews over the
+    mmapped file; only the posting lists a query asks for are copied out.
+    """
+    def __init__(self, path: str, base: int):
+        self.path = path
+        self.base = base
+        # Messages of dropped meetings still in this file (see SearchIndex.drop_meeting).
+        self.dropped = 0
+        self.compacting = False
+        # Searches reading this segment, and whether it has been replaced (guarded by the index lock).
+        self.readers = 0
+        self.retired = False
+        self.remove_on_close = False
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        (footer_len,) = _FOOTER_LENGTH.unpack_from(self._mm, len(self._mm) - _FOOTER_LENGTH.size)
+        footer_start = len(self._mm) - _FOOTER_LENGTH.size - footer_len
+        footer = json.loads(self._mm[footer_start:footer_start + footer_len])
+        self.count = footer["count"]
+        self.level = footer["level"]
+        self.min_ts = footer["min_ts"]
+        self.max_ts = footer["max_ts"]
+        self.total_length = footer["total_length"]
+        for name, typecode in _COLUMNS:
+            setattr(self, name, self._column(view, typecode, footer["columns"][name], self.count))
+        self.text_offsets = self._column(view, "Q", footer["text_offsets"], self.count + 1)
+        self._texts = view[footer["texts"]:footer["texts"] + self.text_offsets[-1]]
+        self._view = view
+        self._terms = _TermTable(self._mm, view, footer["terms"])
+
+    @staticmethod
+    def _column(view: memoryview, typecode: str, offset: int, count: int) -> memoryview:
+        return view[offset:offset + count * array(typecode).itemsize].cast(typecode)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def sorted_terms(self) -> Iterable[str]:
+        return iter(self._terms)
+
+    def doc_freq(self, term: str) -> int:
+        i = self._terms.find(term)
+        return self._terms.doc_freqs[i] if i >= 0 else 0
+
+    def get_postings(self, term: str) -> Optional[Tuple[array, array]]:
+        i = self._terms.find(term)
+        if i < 0:
+            return None
+        offset, df = self._terms.postings[i], self._terms.doc_freqs[i]
+        docs, tfs = array("I"), array("B")
+        docs.frombytes(self._view[offset:offset + 4 * df])
+        tfs.frombytes(self._view[offset + 4 * df:offset + 5 * df])
+        return docs, tfs
+
+    def text(self, local: int) -> str:
+        return bytes(self._texts[self.text_offsets[local]:self.text_offsets[local + 1]]).decode("utf-8")
+
+    def text_region(self) -> Tuple[memoryview, memoryview]:
+        return self.text_offsets, self._texts
+
+    def close(self):
+        """Releases the memoryviews and the mmap; the segment cannot be read afterwards."""
+        self._terms.close()
+        for view in [getattr(self, name) for name, _ in _COLUMNS] + [self.text_offsets, self._texts, self._view]:
+            view.release()
+        self._mm.close()
+
+
+_Segment = Union[_MemorySegment, _DiskSegment]
+
+
+def _meeting_term(meeting: int) -> str:
+    return f"{_MEETING_FIELD}{meeting}"
+
+
+def _kept_messages(segment: _Segment, dropped: Set[int]) -> Optional[List[int]]:
+    """Local ids of the messages not in a dropped meeting (None if that is all of them)."""
+    if not any(segment.doc_freq(_meeting_term(meeting)) for meeting in dropped):
+        return None
+    return [local for local, meeting in enumerate(segment.meeting) if meeting not in dropped]
+
+
+def _write_segment(path: str, segments: List[_Segment], level: int, dropped: Set[int] = frozenset()) -> int:
+    """
+    Writes `segments` (contiguous, oldest first) as one segment file at `path`,
+    leaving out the messages of `dropped` meetings. Returns the messages written.
+    """
+    # Per segment: the kept local ids (None = all) and each old local id's new doc id (-1 = dropped).
+    plans = []
+    total, total_length, min_ts, max_ts = 0, 0, [], []
+    for segment in segments:
+        kept = _kept_messages(segment, dropped)
+        if kept is None:
+            plans.append((None, None, total))
+            total += len(segment)
+            total_length += segment.total_length
+            if len(segment):
+                min_ts.append(segment.min_ts)
+                max_ts.append(segment.max_ts)
+            continue
+        remap = array("i", [-1]) * len(segment)
+        for new, local in enumerate(kept, start=total):
+            remap[local] = new
+        plans.append((kept, remap, total))
+        total += len(kept)
+        total_length += sum(segment.length[local] for local in kept)
+        if kept:
+            min_ts.append(min(segment.timestamp[local] for local in kept))
+            max_ts.append(max(segment.timestamp[local] for local in kept))
+
+    footer = {"count": total, "level": level, "columns": {}, "total_length": total_length,
+              "min_ts": min(min_ts, default=0), "max_ts": max(max_ts, default=0)}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for name, typecode in _COLUMNS:
+            footer["columns"][name] = f.tell()
+            for segment, (kept, _, _) in zip(segments, plans):
+                column = getattr(segment, name)
+                f.write(column.tobytes() if kept is None else array(typecode, (column[i] for i in kept)).tobytes())
+        # Text offsets are shifted by the bytes of text kept from earlier segments.
+        footer["text_offsets"] = f.tell()
+        texts, text_shift = [], 0
+        f.write(array("Q", [0]).tobytes())
+        for segment, (kept, _, _) in zip(segments, plans):
+            offsets, data = segment.text_region()
+            if kept is None:
+                f.write(array("Q", (offset + text_shift for offset in offsets[1:])).tobytes())
+                text_shift += offsets[-1]
+                texts.append(data)
+                continue
+            shifted = array("Q")
+            for local in kept:
+                texts.append(data[offsets[local]:offsets[local + 1]])
+                text_shift += offsets[local + 1] - offsets[local]
+                shifted.append(text_shift)
+            f.write(shifted.tobytes())
+
+        # Terms are merged in sorted order, so the term table is written already sorted.
+        term_text, term_offsets = bytearray(), array("Q", [0])
+        postings_offsets, doc_freqs = array("Q"), array("I")
+        previous = None
+        for term in heapq.merge(*(segment.sorted_terms() for segment in segments)):
+            if term == previous:
+                continue
+            previous = term
+            docs, tfs = array("I"), array("B")
+            for segment, (kept, remap, shift) in zip(segments, plans):
+                postings = segment.get_postings(term)
+                if postings is None:
+                    continue
+                if remap is not None:
+                    for doc, tf in zip(*postings):
+                        if remap[doc] >= 0:
+                            docs.append(remap[doc])
+                            tfs.append(tf)
+                    continue
+                docs.extend(postings[0] if not shift else array("I", (doc + shift for doc in postings[0])))
+                tfs.extend(postings[1])
+            if not docs:
+                continue
+            postings_offsets.append(f.tell())
+            doc_freqs.append(len(docs))
+            f.write(docs.tobytes())
+            f.write(tfs.tobytes())
+            term_text += term.encode("utf-8")
+            term_offsets.append(len(term_text))
+        footer["texts"] = f.tell()
+        for data in texts:
+            f.write(data)
+        terms = {"count": len(doc_freqs)}
+        for name, data in (("text", term_text), ("offsets", term_offsets),
+                           ("postings", postings_offsets), ("doc_freqs", doc_freqs)):
+            terms[name] = f.tell()
+            f.write(data)
+        footer["terms"] = terms
+        data = json.dumps(footer, separators=(",", ":")).encode("utf-8")
+        f.write(data)
+        f.write(_FOOTER_LENGTH.pack(len(data)))
+    os.replace(tmp_path, path)
+    return total
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove search index file %s: %s", path, e)
+
+
+class SearchIndex:
+    """
+    Incremental inverted index over chat messages.
+
+    add() is called for every posted message; search() supports required
+    terms, quoted phrases, author and meeting filters, a [since, until]
+    timestamp range and top-k results ranked by BM25 ("relevance") or newest
+    first ("recent"). Segments and a manifest persist in `index_dir` (a
+    temporary directory, removed with the index, if none is given); messages
+    still in memory are only written by flush() or close().
+
+    drop_meeting() removes a meeting from search results at once and from
+    disk when its segments are next merged or compacted.
+
+    Messages are tokenized on the index's worker thread in batches of
+    `invert_batch`; a search first inverts whatever is still pending, so every
+    message added before it is found.
+    """
+    def __init__(self, index_dir: Optional[str] = None, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+                 merge_factor: int = DEFAULT_MERGE_FACTOR, invert_batch: int = DEFAULT_INVERT_BATCH):
+        if flush_threshold < 1 or merge_factor < 2 or invert_batch < 1:
+            raise ValueError("flush_threshold and invert_batch must be at least 1, merge_factor at least 2.")
+        self.flush_threshold = flush_threshold
+        self.merge_factor = merge_factor
+        self.invert_batch = invert_batch
+        self._index_dir = index_dir
+        self._remove_temp_dir: Optional[weakref.finalize] = None
+        # Guards the segment list, the memory segment, the string tables and the dropped meetings.
+        self._lock = threading.Lock()
+        # A forgotten meeting (see _forget_dropped) leaves a None behind, so numbers stay stable.
+        self._meeting_ids: List[Optional[str]] = []
+        self._meeting_index: Dict[str, int] = {}
+        # Meetings whose messages are hidden and left out of the next segment write.
+        self._dropped: Set[int] = set()
+        self._authors: List[str] = []
+        self._author_index: Dict[str, int] = {}
+        # Disk segments and frozen memory segments awaiting their write, oldest first.
+        self._segments: List[_Segment] = []
+        self._memory = _MemorySegment(0)
+        self._inversion_queued = False
+        self._next_segment = 1
+        # One worker, so segment writes, merges and manifest updates never overlap.
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+        self._pending: List[Future] = []
+        if index_dir is not None:
+            self._open(index_dir)
+
+    def _open(self, index_dir: str):
+        os.makedirs(index_dir, exist_ok=True)
+        manifest_path = os.path.join(index_dir, _MANIFEST)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._meeting_ids = manifest["meetings"]
+        self._meeting_index = {meeting_id: i for i, meeting_id in enumerate(self._meeting_ids) if meeting_id is not None}
+        self._dropped = set(manifest["dropped"])
+        self._authors = manifest["authors"]
+        self._author_index = {author: i for i, author in enumerate(self._authors)}
+        self._next_segment = manifest["next_segment"]
+        base = 0
+        for name in manifest["segments"]:
+            segment = _DiskSegment(os.path.join(index_dir, name), base)
+            self._segments.append(segment)
+            base += len(segment)
+        self._memory = _MemorySegment(base)
+
+    @property
+    def index_dir(self) -> str:
+        """The index directory (a temporary one is created on first use if none was given)."""
+        if self._index_dir is None:
+            self._index_dir = tempfile.mkdtemp(prefix="nodwins-search-")
+            self._remove_temp_dir = weakref.finalize(self, shutil.rmtree, self._index_dir, True)
+        return self._index_dir
+
+    def __len__(self) -> int:
+        """Messages held by the index, including dropped ones not yet compacted away."""
+        with self._lock:
+            return self._memory.base + len(self._memory)
+
+    @property
+    def segment_count(self) -> int:
+        """Number of segments written or waiting to be written (excluding the memory segment)."""
+        with self._lock:
+            return len(self._segments)
+
+    # --- Indexing ---
+    def add(self, meeting_id: str, seq: int, timestamp: int, username: str, message: str):
+        """Indexes one chat message (tokenizing is deferred to the worker thread)."""
+        with self._lock:
+            meeting = self._meeting_index.get(meeting_id)
+            if meeting is None:
+                meeting = self._meeting_index[meeting_id] = len(self._meeting_ids)
+                self._meeting_ids.append(meeting_id)
+            author = self._author_index.get(username)
+            if author is None:
+                author = self._author_index[username] = len(self._authors)
+                self._authors.append(username)
+            self._memory.add(meeting, seq, int(timestamp), author, message)
+            if len(self._memory) >= self.flush_threshold:
+                self._freeze()
+            elif self._memory.pending >= self.invert_batch and not self._inversion_queued:
+                self._inversion_queued = True
+                self._writer.submit(self._invert_memory)
+
+    def drop_meeting(self, meeting_id: str):
+        """
+        Removes a meeting's messages from search results. They are left out
+        when their segments are next written or merged; a segment made up
+        mostly of dropped messages is compacted on the worker thread.
+        """
+        with self._lock:
+            meeting = self._meeting_index.get(meeting_id)
+            if meeting is None or meeting in self._dropped:
+                return
+            self._dropped.add(meeting)
+            term = _meeting_term(meeting)
+            for segment in self._segments:
+                if not isinstance(segment, _DiskSegment) or segment.compacting:
+                    continue
+                segment.dropped += segment.doc_freq(term)
+                if segment.dropped >= len(segment) * _COMPACT_RATIO:
+                    segment.compacting = True
+                    self._submit(self._compact, segment)
+            if self._index_dir is not None and self._remove_temp_dir is None:
+                self._submit(self._save_manifest)
+
+    def _invert_memory(self):
+        with self._lock:
+            self._inversion_queued = False
+            memory = self._memory
+        memory.invert()
+
+    def _freeze(self):
+        """Queues the memory segment for writing (called with the lock held)."""
+        frozen = self._memory
+        self._segments.append(frozen)
+        self._memory = _MemorySegment(frozen.base + len(frozen))
+        self._submit(self._write_frozen, frozen)
+
+    def _submit(self, fn, *args):
+        """Queues work on the writer; flush() waits for it (called with the lock held)."""
+        self._pending = [future for future in self._pending if not future.done()]
+        self._pending.append(self._writer.submit(fn, *args))
+
+    def _new_segment_path(self) -> str:
+        with self._lock:
+            number = self._next_segment
+            self._next_segment += 1
+        return os.path.join(self.index_dir, f"seg-{number:06d}.idx")
+
+    def _write(self, old: List[_Segment], level: int) -> List[str]:
+        """
+        Replaces `old` (contiguous segments) by one segment file without the
+        dropped meetings, or by nothing if no message is left. Returns the
+        replaced disk segments, to be retired once the manifest is saved.
+        """
+        with self._lock:
+            dropped = set(self._dropped)
+        path = self._new_segment_path()
+        new = [_DiskSegment(path, old[0].base)] if _write_segment(path, old, level, dropped) else []
+        if not new:
+            _remove_files([path])
+        with self._lock:
+            start = next(i for i, segment in enumerate(self._segments) if segment is old[0])
+            self._segments[start:start + len(old)] = new
+            # Doc ids stay contiguous once dropped messages are gone.
+            base = 0
+            for segment in self._segments:
+                segment.base = base
+                base += len(segment)
+            self._memory.base = base
+        return [segment for segment in old if isinstance(segment, _DiskSegment)]
+
+    def _retire(self, segments: List[_DiskSegment], remove: bool = True):
+        """Closes (and with `remove` deletes) segments once no search is reading them."""
+        with self._lock:
+            idle = []
+            for segment in segments:
+                segment.retired, segment.remove_on_close = True, remove
+                if not segment.readers:
+                    idle.append(segment)
+        _close_segments(idle)
+
+    def _write_frozen(self, frozen: _MemorySegment):
+        frozen.invert()
+        obsolete = self._write([frozen], level=0)
+        obsolete += self._merge_tail()
+        self._forget_dropped()
+        self._save_manifest()
+        self._retire(obsolete)
+
+    def _compact(self, segment: _DiskSegment):
+        with self._lock:
+            if not any(s is segment for s in self._segments):
+                return  # merged away in the meantime
+        obsolete = self._write([segment], segment.level)
+        self._forget_dropped()
+        self._save_manifest()
+        self._retire(obsolete)
+
+    def _forget_dropped(self):
+        """Forgets dropped meetings once no segment holds any of their messages."""
+        with self._lock:
+            segments = self._segments + [self._memory]
+            # A message still waiting to be inverted is not in its segment's postings yet.
+            if any(isinstance(s, _MemorySegment) and not s.fully_inverted for s in segments):
+                return
+            for meeting in [m for m in self._dropped if not any(s.doc_freq(_meeting_term(m)) for s in segments)]:
+                self._dropped.discard(meeting)
+                self._meeting_index.pop(self._meeting_ids[meeting], None)
+                self._meeting_ids[meeting] = None
+
+    def _merge_tail(self) -> List[_DiskSegment]:
+        """Merges trailing runs of equal-level disk segments; returns the replaced segments."""
+        obsolete = []
+        while True:
+            with self._lock:
+                written = []
+                for segment in self._segments:
+                    if not isinstance(segment, _DiskSegment):
+                        break
+                    written.append(segment)
+                run = written[-self.merge_factor:]
+            if len(run) < self.merge_factor or len({segment.level for segment in run}) != 1:
+                return obsolete
+            obsolete += self._write(run, level=run[0].level + 1)
+
+    def _save_manifest(self):
+        with self._lock:
+            manifest = {
+                "segments": [os.path.basename(s.path) for s in self._segments if isinstance(s, _DiskSegment)],
+                "meetings": list(self._meeting_ids),
+                "dropped": sorted(self._dropped),
+                "authors": list(self._authors),
+                "next_segment": self._next_segment,
+            }
+        path = os.path.join(self.index_dir, _MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    def flush(self):
+        """Writes every message added so far to disk and waits for pending merges."""
+        with self._lock:
+            if len(self._memory):
+                self._freeze()
+            pending = self._pending
+            self._pending = []
+        for future in wait(pending).done:
+            future.result()
+
+    def close(self):
+        """
+        Stops the worker and releases the segments. A persistent index is
+        flushed first; a temporary one is deleted along with its directory.
+        """
+        if self._index_dir is not None and self._remove_temp_dir is None:
+            self.flush()
+        self._writer.shutdown(cancel_futures=True)
+        with self._lock:
+            segments = [segment for segment in self._segments if isinstance(segment, _DiskSegment)]
+            self._segments = []
+            self._memory = _MemorySegment(0)
+            self._pending = []
+        self._retire(segments, remove=False)
+        if self._remove_temp_dir is not None:
+            self._remove_temp_dir()
+
+    # --- Querying ---
+    def search(self, query: str = "", author: Optional[str] = None, meeting_id: Optional[str] = None,
+               since: Optional[int] = None, until: Optional[int] = None, k: int = 10, order: str = "relevance",
+               can_view: Optional[Callable[[str], bool]] = None) -> List[SearchHit]:
+        """
+        Returns up to `k` messages containing every term and "quoted phrase" in
+        `query`, optionally restricted to one author, one meeting and a
+        [since, until] timestamp range (unix seconds, inclusive). `can_view`
+        is asked once per meeting whether its messages may be returned. An
+        empty query matches every message that passes the filters.
+        """
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Unknown order '{order}'. Expected one of {SEARCH_ORDERS}.")
+        parsed = parse_query(query)
+        required = list(parsed.terms)
+        with self._lock:
+            if author is not None:
+                if author not in self._author_index:
+                    return []
+                required.append(f"{_AUTHOR_FIELD}{self._author_index[author]}")
+            if meeting_id is not None:
+                if meeting_id not in self._meeting_index:
+                    return []
+                required.append(_meeting_term(self._meeting_index[meeting_id]))
+            snapshot = self._segments + [self._memory]
+            dropped = frozenset(self._dropped)
+            pinned = [segment for segment in snapshot if isinstance(segment, _DiskSegment)]
+            for segment in pinned:
+                segment.readers += 1
+        try:
+            return self._search(parsed, required, snapshot, dropped, since, until, k, order, can_view)
+        finally:
+            with self._lock:
+                idle = []
+                for segment in pinned:
+                    segment.readers -= 1
+                    if segment.retired and not segment.readers:
+                        idle.append(segment)
+            _close_segments(idle)
+
+    def _search(self, parsed: ParsedQuery, required: List[str], snapshot: List[_Segment], dropped: frozenset,
+                since: Optional[int], until: Optional[int], k: int, order: str,
+                can_view: Optional[Callable[[str], bool]]) -> List[SearchHit]:
+        # Catch up on pending messages; anything added after this point is ignored.
+        segments = [(segment, segment.invert() if isinstance(segment, _MemorySegment) else len(segment))
+                    for segment in snapshot]
+        total_docs = sum(limit for _, limit in segments)
+        if k <= 0 or not total_docs:
+            return []
+
+        idf = []
+        for term in parsed.terms:
+            df = sum(segment.doc_freq(term) for segment, _ in segments)
+            idf.append(math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5)))
+        avg_length = sum(segment.total_length for segment, _ in segments) / total_docs or 1.0
+
+        def matching(candidates):
+            """(segment, limit, postings) for segments that can hold a match; postings load lazily."""
+            for segment, limit in candidates:
+                if not limit or (since is not None and segment.max_ts < since) or \
+                        (until is not None and segment.min_ts > until):
+                    continue
+                if all(segment.doc_freq(term) for term in required):
+                    yield segment, limit, [segment.get_postings(term) for term in required]
+
+        visible: Dict[int, bool] = {}
+
+        def accept(segment: _Segment, local: int) -> bool:
+            ts = segment.timestamp[local]
+            if (since is not None and ts < since) or (until is not None and ts > until):
+                return False
+            meeting = segment.meeting[local]
+            if meeting in dropped:
+                return False
+            if can_view is not None:
+                if meeting not in visible:
+                    visible[meeting] = can_view(self._meeting_ids[meeting])
+                if not visible[meeting]:
+                    return False
+            if parsed.phrases:
+                tokens = tokenize(segment.text(local))
+                return all(_contains_phrase(tokens, phrase) for phrase in parsed.phrases)
+            return True
+
+        def score(segment: _Segment, tfs: List[int], local: int) -> float:
+            norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * segment.length[local] / avg_length)
+            return sum(weight * tf * (_BM25_K1 + 1.0) / (tf + norm) for weight, tf in zip(idf, tfs))
+
+        hits: List[SearchHit] = []
+        if order == "recent" or not parsed.terms:
+            # Doc ids grow with arrival, so walk segments and postings backwards and stop at k.
+            # Without query terms every score is 0 and relevance order is the same.
+            for segment, limit, postings in matching(reversed(segments)):
+                for local, tfs in _intersect(postings, limit, reverse=True):
+                    if accept(segment, local):
+                        hits.append(self._hit(segment, local, score(segment, tfs, local)))
+                        if len(hits) == k:
+                            return hits
+            return hits
+
+        # Rank every match cheaply, then run the costlier checks in score order until k pass.
+        matches = list(matching(segments))
+        ranked = []
+        for position, (segment, limit, postings) in enumerate(matches):
+            for local, tfs in _intersect(postings, limit):
+                ranked.append((-score(segment, tfs, local), -(segment.base + local), position, local))
+        heapq.heapify(ranked)
+        while ranked and len(hits) < k:
+            negative_score, _, position, local = heapq.heappop(ranked)
+            segment = matches[position][0]
+            if accept(segment, local):
+                hits.append(self._hit(segment, local, -negative_score))
+        return hits
+
+    def _hit(self, segment: _Segment, local: int, score: float) -> SearchHit:
+        return SearchHit(self._meeting_ids[segment.meeting[local]], segment.seq[local], segment.timestamp[local],
+                         self._authors[segment.author[local]], segment.text(local), score)
+
+
+def _close_segments(segments: List[_DiskSegment]):
+    for segment in segments:
+        segment.close()
+        if segment.remove_on_close:
+            _remove_files([segment.path])
+
+
+def _intersect(postings: List[Tuple[array, array]], limit: int, reverse: bool = False) -> Iterator[Tuple[int, List[int]]]:
+    """
+    Yields (local doc id, term frequencies) for docs below `limit` present in
+    every posting list, walking the shortest list and binary-searching the rest.
+    """
+    if not postings:
+        docs = range(limit - 1, -1, -1) if reverse else range(limit)
+        for local in docs:
+            yield local, []
+        return
+    order = sorted(range(len(postings)), key=lambda i: len(postings[i][0]))
+    lead_docs, lead_tfs = postings[order[0]]
+    end = bisect.bisect_left(lead_docs, limit)
+    for i in (range(end - 1, -1, -1) if reverse else range(end)):
+        doc = lead_docs[i]
+        tfs = [0] * len(postings)
+        tfs[order[0]] = lead_tfs[i]
+        for j in order[1:]:
+            docs, term_tfs = postings[j]
+            pos = bisect.bisect_left(docs, doc)
+            if pos == len(docs) or docs[pos] != doc:
+                break
+            tfs[j] = term_tfs[pos]
+        else:
+            yield doc, tfs
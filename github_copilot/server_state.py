@@ -0,0 +1,94 @@
+# server_state.py
+# Concurrency-safe state containers shared by Nodwins Meets v1 and v2.
+# StripedMap is a dict split over N shards ("lock striping"): each shard has its
+# own lock, so threads touching different users or meetings rarely contend.
+
+import threading
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+DEFAULT_STRIPES = 16
+
+
+class StripedMap(Generic[K, V]):
+    """
+    Thread-safe mapping with per-shard locks.
+
+    Supports the dict operations the servers use (get/set/del/in/len/pop) plus
+    atomic helpers such as put_if_absent(). Iteration returns a snapshot, so it
+    is safe to iterate while other threads mutate the map.
+    """
+    def __init__(self, stripes: int = DEFAULT_STRIPES):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1.")
+        self._shards: List[Dict[K, V]] = [{} for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _slot(self, key: K) -> Tuple[Dict[K, V], threading.Lock]:
+        index = hash(key) % len(self._shards)
+        return self._shards[index], self._locks[index]
+
+    def __getitem__(self, key: K) -> V:
+        shard, lock = self._slot(key)
+        with lock:
+            return shard[key]
+
+    def __setitem__(self, key: K, value: V):
+        shard, lock = self._slot(key)
+        with lock:
+            shard[key] = value
+
+    def __delitem__(self, key: K):
+        shard, lock = self._slot(key)
+        with lock:
+            del shard[key]
+
+    def __contains__(self, key: K) -> bool:
+        shard, lock = self._slot(key)
+        with lock:
+            return key in shard
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self.keys())
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        shard, lock = self._slot(key)
+        with lock:
+            return shard.get(key, default)
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        shard, lock = self._slot(key)
+        with lock:
+            return shard.pop(key, default)
+
+    def put_if_absent(self, key: K, value: V) -> bool:
+        """Stores value only if key is unused. Returns True if it was stored."""
+        shard, lock = self._slot(key)
+        with lock:
+            if key in shard:
+                return False
+            shard[key] = value
+            return True
+
+    def keys(self) -> List[K]:
+        return [key for key, _ in self.items()]
+
+    def values(self) -> List[V]:
+        return [value for _, value in self.items()]
+
+    def items(self) -> List[Tuple[K, V]]:
+        snapshot: List[Tuple[K, V]] = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                snapshot.extend(shard.items())
+        return snapshot
+
+    def clear(self):
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
@@ -0,0 +1,35 @@
+# server_test_utils.py
+# Shared fixtures for the tests that run against both the v1 and v2 servers.
+
+from typing import Callable, Optional
+
+from admission import AdmissionController, ResourceSnapshot, fixed_sampler
+
+
+def fresh_server(module, sampler: Optional[Callable[[], ResourceSnapshot]] = None):
+    """
+    The module's NodwinsServer singleton with all state dropped. Admission
+    control reads `sampler` instead of host CPU, so by default it never turns
+    meetings away mid-test.
+    """
+    server = module.NodwinsServer()
+    server._reset_state()
+    server.admission = AdmissionController(sampler=sampler or fixed_sampler())
+    return server
+
+
+class ServerTestMixin:
+    """
+    Mix into a unittest.TestCase and set `module` (v1 or v2). Each test gets a
+    fresh self.server, reset again afterwards; create_meeting() passes the
+    class's `meeting_kwargs` (e.g. v2's enable_ai).
+    """
+    module = None
+    meeting_kwargs = {}
+
+    def setUp(self):
+        self.server = fresh_server(self.module)
+        self.addCleanup(self.server._reset_state)
+
+    def create_meeting(self, host):
+        return self.server.create_meeting(host, **self.meeting_kwargs)
@@ -0,0 +1,169 @@
+# structured_logging.py
+# Structured, asynchronous logging for Nodwins Meets v1 and v2.
+# Server modules log through `get_logger(...)` with %-style arguments and
+# keyword fields passed as `extra`, so nothing is formatted unless a handler
+# will emit the record. configure_logging() installs a QueueHandler on the
+# "nodwins" logger: the calling thread only enqueues the record and a
+# QueueListener thread formats and writes it, keeping I/O off the chat path.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional, TextIO, Union
+
+ROOT_LOGGER = "nodwins"
+OFF = logging.CRITICAL + 10       # a level no record reaches; logging is off
+DEFAULT_QUEUE_SIZE = 10_000       # records buffered before new ones are dropped
+FORMATS = ("text", "json")
+
+# Attributes every LogRecord carries; anything else on a record came from `extra`.
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_handler: Optional["DeferredQueueHandler"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_atexit_registered = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """A logger below the shared "nodwins" root, e.g. get_logger("v1") -> "nodwins.v1"."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """The structured fields attached to a record through `extra`."""
+    return {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS}
+
+
+def _logfmt(value: Any) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "=\n'):
+        return json.dumps(text)
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Renders a record as one line of logfmt-style text:
+
+        2024-05-01T12:00:00.123Z INFO nodwins.v1 User joined meeting meeting_id=meet-1a2b user=alice
+
+    or, with fmt="json", as one JSON object per line.
+    """
+    def __init__(self, fmt: str = "text"):
+        super().__init__()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown log format {fmt!r}; expected one of {FORMATS}.")
+        self.fmt = fmt
+
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        fields = record_fields(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if self.fmt == "json":
+            payload = {"ts": self._timestamp(record), "level": record.levelname, "logger": record.name,
+                       "msg": message, **fields}
+            if record.exc_text:
+                payload["exc"] = record.exc_text
+            return json.dumps(payload, default=str)
+        line = f"{self._timestamp(record)} {record.levelname} {record.name} {message}"
+        if fields:
+            line += " " + " ".join(f"{k}={_logfmt(v)}" for k, v in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler merges the arguments into the message before
+    enqueueing; this one only renders tracebacks (which pin stack frames) and
+    enqueues the record as-is. Log arguments must therefore not be mutated
+    after the call. When the queue is full the record is dropped and counted
+    rather than blocking the caller.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_level(level: Union[int, str]) -> int:
+    if isinstance(level, int):
+        return level
+    if level.upper() == "OFF":
+        return OFF
+    value = logging.getLevelName(level.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level {level!r}.")
+    return value
+
+
+def set_level(level: Union[int, str]) -> None:
+    """Changes the level at runtime; "OFF" disables logging entirely."""
+    logging.getLogger(ROOT_LOGGER).setLevel(_parse_level(level))
+
+
+def configure_logging(level: Union[int, str] = "INFO", fmt: str = "text", stream: Optional[TextIO] = None,
+                      queue_size: int = DEFAULT_QUEUE_SIZE, background: bool = True) -> Optional[logging.Handler]:
+    """
+    Routes the "nodwins" loggers to `stream` (stderr by default) and returns the handler.
+
+    With background=True records go through a DeferredQueueHandler and are
+    written by a QueueListener thread; background=False writes synchronously
+    from the logging thread. Calling this again replaces the previous setup.
+    Returns None when level is "OFF".
+    """
+    global _handler, _listener, _atexit_registered
+    shutdown_logging()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+    set_level(level)
+    if root.level >= OFF:
+        return None
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(StructuredFormatter(fmt))
+    if not background:
+        root.addHandler(output)
+        return output
+    _handler = DeferredQueueHandler(queue.Queue(maxsize=queue_size))
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    root.addHandler(_handler)
+    if not _atexit_registered:
+        atexit.register(shutdown_logging)
+        _atexit_registered = True
+    return _handler
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records, stops the listener and detaches the "nodwins" handlers."""
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _handler = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.flush()
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from action_items import ActionItemDetector, KeywordAutomaton, normalize_assignee
+from wins_systems_ai_agents_v2 import AIAgent
+
+
+class TestActionItemDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = ActionItemDetector()
+
+    def test_every_item_in_a_message(self):
+        items = self.detector.detect("Action item: update docs; TODO fix the build, assign to @Bob: review PR", "alice")
+        self.assertEqual([(i.trigger, i.detail, i.assignee, i.task) for i in items], [
+            ("action item", "update docs", None, "update docs"),
+            ("todo", "fix the build", None, "fix the build"),
+            ("assign to", "@Bob: review PR", "bob", "review PR"),
+        ])
+        self.assertTrue(all(item.author == "alice" for item in items))
+        self.assertEqual(items[0].describe(), "'update docs' assigned based on message from alice.")
+
+    def test_triggers_need_word_boundaries_and_a_detail(self):
+        self.assertEqual(self.detector.detect("todos are done, mastodon todo", "a"), [])
+        self.assertEqual(self.detector.detect("nothing to see", "a"), [])
+
+    def test_assignee_normalization(self):
+        self.assertEqual(normalize_assignee("@Bob,"), "bob")
+        self.assertEqual(normalize_assignee("  @Dana.Smith! "), "dana.smith")
+        self.assertIsNone(normalize_assignee("@"))
+        # Named by the word after "task for"/"assign to", otherwise by the first @mention.
+        task_for = self.detector.detect("task for Carol: ship it", "a")[0]
+        self.assertEqual((task_for.assignee, task_for.task), ("carol", "ship it"))
+        mention = self.detector.detect("todo ping @Erin. about the release", "a")[0]
+        self.assertEqual((mention.assignee, mention.task), ("erin", "ping @Erin. about the release"))
+
+    def test_agent_dedupes_on_task_and_assignee(self):
+        agent = AIAgent("meet-1")
+        agent.process_message("TODO: Fix   the build @bob", "alice")
+        agent.process_message("todo fix the build @Bob", "carol")
+        agent.process_message("todo fix the build @dave", "carol")
+        agent.process_message("todo: fix the build @bob, todo: fix the build @bob", "erin")
+        self.assertEqual(len(agent.action_items), 2)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            ActionItemDetector(engine="grep")
+
+
+class TestAutomatonRegexParity(unittest.TestCase):
+    def test_automaton_finds_leftmost_longest_whole_words(self):
+        automaton = KeywordAutomaton(["task", "task for", "for you", "he"])
+        text = "the task for you, then task forward"
+        self.assertEqual([text[s:e] for s, e in automaton.find(text)], ["task for", "task"])
+
+    def test_engines_agree_on_random_messages(self):
+        rng = random.Random(1234)
+        base = ["action item", "todo", "task for", "assign to"]
+        extra = ["task", "for", "item", "action", "to do", "follow up", "follow", "up on", "sign", "assign"]
+        vocabularies = [base, base + extra, base + [f"phrase{i} step" for i in range(80)] + extra]
+        words = ["the", "fix", "@bob", "@Ann,", "build", "docs;", "to", "é", "naïve", "x_y", "-", ":"] + \
+            [word for phrase in vocabularies[2][:20] for word in phrase.split()]
+        for vocabulary in vocabularies:
+            regex = ActionItemDetector(vocabulary, engine="regex")
+            automaton = ActionItemDetector(vocabulary, engine="automaton")
+            for _ in range(1000):
+                parts = [rng.choice(words) if rng.random() < 0.7 else rng.choice(vocabulary) for _ in range(rng.randint(0, 12))]
+                message = rng.choice([" ", "  ", ", ", ""]).join(parts)
+                if rng.random() < 0.3:
+                    message = message.upper()
+                self.assertEqual(regex.detect(message, "a"), automaton.detect(message, "a"), message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from admission import AdmissionController, SystemSampler, fixed_sampler
+from server_test_utils import fresh_server
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_rejects_when_cpu_or_memory_is_short(self):
+        self.assertTrue(AdmissionController(sampler=fixed_sampler(cpu=0.5, memory=0.5)).admit().admitted)
+        busy = AdmissionController(sampler=fixed_sampler(cpu=0.99, memory=0.5)).admit()
+        self.assertFalse(busy.admitted)
+        self.assertIn("CPU", busy.reason)
+        full = AdmissionController(sampler=fixed_sampler(cpu=0.1, memory=0.95)).admit()
+        self.assertFalse(full.admitted)
+        self.assertIn("memory", full.reason)
+
+    def test_ai_meetings_weigh_more(self):
+        controller = AdmissionController(sampler=fixed_sampler(cpu=0.9))
+        self.assertTrue(controller.admit(ai_enabled=False).admitted)
+        rejected = controller.admit(ai_enabled=True)
+        self.assertFalse(rejected.admitted)
+        self.assertIn("86% cutoff for AI meetings", rejected.reason)
+        self.assertEqual((controller.admitted, controller.rejected), (1, 1))
+
+    def test_default_cutoffs(self):
+        controller = AdmissionController(sampler=fixed_sampler(cpu=0.8))
+        self.assertEqual(controller.cpu_cutoff(), 0.95)
+        self.assertAlmostEqual(controller.cpu_cutoff(ai_enabled=True), 0.95 / 1.1)
+        # A moderately loaded host still takes AI meetings.
+        self.assertTrue(controller.admit(ai_enabled=True).admitted)
+
+    def test_thresholds_and_factor_are_configurable(self):
+        controller = AdmissionController(max_cpu=0.6, max_memory=0.5, ai_load_factor=1.5,
+                                         sampler=fixed_sampler(cpu=0.5, memory=0.4))
+        self.assertAlmostEqual(controller.cpu_cutoff(ai_enabled=True), 0.4)
+        self.assertTrue(controller.admit().admitted)
+        self.assertFalse(controller.admit(ai_enabled=True).admitted)
+        for bad in ({"max_cpu": 0}, {"max_cpu": 1.5}, {"max_memory": -0.1}, {"ai_load_factor": 0.5}):
+            with self.assertRaises(ValueError):
+                AdmissionController(sampler=fixed_sampler(), **bad)
+
+    def test_unknown_metrics_are_not_checked(self):
+        self.assertTrue(AdmissionController(sampler=fixed_sampler()).admit(ai_enabled=True).admitted)
+
+    def test_samples_are_cached(self):
+        calls = []
+
+        def sampler():
+            calls.append(1)
+            return fixed_sampler(cpu=0.1)()
+
+        controller = AdmissionController(sampler=sampler, sample_ttl=60)
+        for _ in range(5):
+            controller.admit()
+        self.assertEqual(len(calls), 1)
+
+    def test_system_sampler_reports_fractions(self):
+        snapshot = SystemSampler()()
+        for value in snapshot:
+            if value is not None:
+                self.assertGreaterEqual(value, 0.0)
+                self.assertLessEqual(value, 1.0)
+
+
+class TestServerAdmission(unittest.TestCase):
+    def test_overloaded_server_refuses_new_meetings(self):
+        for module in (wins_systems_v1, wins_systems_ai_agents_v2):
+            server = fresh_server(module, fixed_sampler(cpu=0.99))
+            try:
+                host = server.login_user("admin", "password123")
+                with self.assertRaises(module.ResourcesExhaustedError):
+                    server.create_meeting(host)
+                self.assertEqual(len(server.meetings), 0)
+            finally:
+                fresh_server(module)
+
+    def test_v2_turns_away_ai_meetings_first(self):
+        server = fresh_server(wins_systems_ai_agents_v2, fixed_sampler(cpu=0.9))
+        try:
+            host = server.login_user("admin", "password123")
+            self.assertIsNotNone(server.create_meeting(host, enable_ai=False))
+            with self.assertRaises(wins_systems_ai_agents_v2.ResourcesExhaustedError):
+                server.create_meeting(host, enable_ai=True)
+        finally:
+            fresh_server(wins_systems_ai_agents_v2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from admission import AdmissionController, fixed_sampler
+from async_server import AsyncMeetingServer, NodwinsClient
+from server_test_utils import fresh_server
+
+
+class AsyncServerMixin:
+    module = None
+    create_options = {}
+
+    async def asyncSetUp(self):
+        fresh_server(self.module)
+        self.server = AsyncMeetingServer(self.module, queue_size=4,
+                                         admission=AdmissionController(sampler=fixed_sampler()))
+        self.address = await self.server.start()
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        await self.server.close()
+        self.module.NodwinsServer()._reset_state()
+
+    async def _client(self, username="user1", password="pass"):
+        client = NodwinsClient()
+        await client.connect(*self.address)
+        self.clients.append(client)
+        response = await client.request("login", username=username, password=password)
+        self.assertTrue(response["ok"], response)
+        return client
+
+    async def _meeting(self, guests=2):
+        host = await self._client("admin", "password123")
+        meeting_id = (await host.request("create", **self.create_options))["meeting_id"]
+        others = [await self._client() for _ in range(guests)]
+        for guest in others:
+            self.assertTrue((await guest.request("join", meeting_id=meeting_id))["ok"])
+        return meeting_id, host, others
+
+    async def _wait_for(self, predicate, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            self.assertLess(asyncio.get_running_loop().time(), deadline, "timed out")
+            await asyncio.sleep(0.01)
+
+    async def test_chat_fans_out_to_every_participant(self):
+        meeting_id, host, guests = await self._meeting()
+        for i in range(5):
+            guests[0].send("chat", meeting_id=meeting_id, message=f"hello {i}")
+        everyone = [host] + guests
+        await self._wait_for(lambda: all(len(c.events) >= 5 for c in everyone))
+        for client in everyone:
+            chats = [e for e in client.events if e["event"] == "chat"]
+            self.assertEqual([e["message"] for e in chats], [f"hello {i}" for i in range(5)])
+            self.assertEqual([e["seq"] for e in chats], list(range(5)))
+
+    async def test_errors_are_reported_not_raised(self):
+        client = NodwinsClient()
+        await client.connect(*self.address)
+        self.clients.append(client)
+        self.assertEqual((await client.request("chat", meeting_id="m", message="hi"))["error"], "ProtocolError")
+        bad_login = await client.request("login", username="admin", password="wrong")
+        self.assertEqual(bad_login["error"], "AuthenticationError")
+        await client.request("login", username="user1", password="pass")
+        missing = await client.request("join", meeting_id="meet-missing")
+        self.assertEqual(missing["error"], "MeetingNotFoundException")
+
+    async def test_wrongly_typed_fields_are_reported(self):
+        client = NodwinsClient()
+        await client.connect(*self.address)
+        self.clients.append(client)
+        bad_login = await client.request("login", username=["admin"], password="password123")
+        self.assertEqual((bad_login["ok"], bad_login["error"]), (False, "ProtocolError"))
+        self.assertTrue((await client.request("login", username="user1", password="pass"))["ok"])
+        self.assertEqual((await client.request("join", meeting_id=["m"]))["error"], "ProtocolError")
+        self.assertEqual((await client.request("chat", meeting_id="m", message={"x": 1}))["error"], "ProtocolError")
+
+    async def test_unexpected_errors_keep_the_connection(self):
+        client = await self._client()
+        with patch.object(self.server.backend, "get_meeting", side_effect=RuntimeError("boom")), \
+                self.assertLogs("nodwins.async", "ERROR"):
+            failed = await client.request("join", meeting_id="meet-1")
+        self.assertEqual((failed["ok"], failed["error"], failed["message"]), (False, "InternalError", "boom"))
+        self.assertEqual((await client.request("join", meeting_id="meet-missing"))["error"],
+                         "MeetingNotFoundException")
+
+    async def test_blocking_end_does_not_stall_other_clients(self):
+        meeting_id, host, guests = await self._meeting(guests=1)
+        meeting = self.server.backend.get_meeting(meeting_id)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        end_meeting = meeting.end_meeting
+        meeting.end_meeting = lambda user: release.wait(5) and end_meeting(user)
+        ending = asyncio.create_task(host.request("end", meeting_id=meeting_id))
+        await asyncio.sleep(0.05)
+        self.assertTrue((await guests[0].request("chat", meeting_id=meeting_id, message="still live"))["ok"])
+        self.assertFalse(ending.done())
+        release.set()
+        self.assertTrue((await ending)["ok"])
+
+    async def test_end_notifies_participants(self):
+        meeting_id, host, guests = await self._meeting(guests=1)
+        await host.request("end", meeting_id=meeting_id)
+        await self._wait_for(lambda: any(e["event"] == "ended" for e in guests[0].events))
+        late = await guests[0].request("chat", meeting_id=meeting_id, message="too late")
+        self.assertFalse(late["ok"])
+
+    async def test_slow_consumer_is_dropped_without_stalling_the_meeting(self):
+        meeting_id, host, guests = await self._meeting(guests=2)
+        slow, fast = guests
+        slow._reader._transport.pause_reading()
+        # Keep chatting until the socket buffers in front of `slow` fill up.
+        sent = 0
+        while not self.server.dropped_consumers and sent < 5_000:
+            self.assertTrue((await host.request("chat", meeting_id=meeting_id, message="x" * 50_000))["ok"])
+            sent += 1
+        self.assertEqual(self.server.dropped_consumers, 1)
+        await self._wait_for(lambda: len(fast.events) == sent)
+        self.assertEqual(len(self.server.backend.get_meeting(meeting_id).participants), 2)
+
+
+class TestV1AsyncServer(AsyncServerMixin, unittest.IsolatedAsyncioTestCase):
+    module = wins_systems_v1
+
+
+class TestV2AsyncServer(AsyncServerMixin, unittest.IsolatedAsyncioTestCase):
+    module = wins_systems_ai_agents_v2
+    create_options = {"enable_ai": True, "incremental_summary": True}
+
+    async def test_summary_is_pushed_after_end(self):
+        meeting_id, host, guests = await self._meeting(guests=1)
+        await guests[0].request("chat", meeting_id=meeting_id, message="todo: file the bug")
+        await host.request("end", meeting_id=meeting_id)
+        await self._wait_for(lambda: any(e["event"] == "summary" for e in guests[0].events))
+        summary = next(e for e in guests[0].events if e["event"] == "summary")
+        self.assertIn("1 action items", summary["summary"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from chat_export import export_file_name, select_records, write_records
+from chat_store import ChatLogStore
+from server_test_utils import ServerTestMixin
+
+
+def _store(count=6, ring_size=2):
+    store = ChatLogStore(ring_size=ring_size)
+    for i in range(count):
+        store.append("u1", "alice", f"msg{i}", timestamp=1_000 + 10 * i)
+    return store
+
+
+class TestChatExport(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_file_names(self):
+        self.assertEqual(export_file_name("meet-1"), "meet-1_chat_log.txt")
+        self.assertEqual(export_file_name("meet-1", "jsonl", compress=True, suffix="_v2"),
+                         "meet-1_chat_log_v2.jsonl.gz")
+        with self.assertRaises(ValueError):
+            export_file_name("meet-1", "csv")
+
+    def test_since_until_select_an_inclusive_range(self):
+        store = _store()
+        self.assertEqual([r.seq for r in select_records(store, since=1_010, until=1_030)], [1, 2, 3])
+        self.assertEqual([r.seq for r in select_records(store, since=1_041)], [5])
+        self.assertEqual(list(select_records(store, until=999)), [])
+
+    def test_after_cursor_returns_messages_appended_since_the_cursor(self):
+        store = _store(count=3)
+        cursor = store.cursor
+        store.append("u2", "bob", "new0", timestamp=2_000)
+        store.append("u2", "bob", "new1", timestamp=2_001)
+        self.assertEqual([r.message for r in select_records(store, after_cursor=cursor)], ["new0", "new1"])
+        self.assertEqual(list(select_records(store, after_cursor=store.cursor)), [])
+
+    def test_text_and_jsonl_output(self):
+        store = _store(count=3)
+        written = write_records(store.records(), self.path("log.txt"), header="--- header ---\n", chunk_size=2)
+        self.assertEqual(written, 3)
+        with open(self.path("log.txt"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "--- header ---")
+        self.assertEqual(lines[1:], [ChatLogStore.render_log_line(r) for r in store.records()])
+
+        write_records(store.records(), self.path("log.jsonl"), fmt="jsonl")
+        with open(self.path("log.jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[2], {"seq": 2, "timestamp": 1_020, "user_id": "u1", "username": "alice",
+                                   "message": "msg2"})
+        with self.assertRaises(ValueError):
+            write_records(store.records(), self.path("log.csv"), fmt="csv")
+
+    def test_gzip_output_matches_plain_output(self):
+        store = _store()
+        write_records(store.records(), self.path("log.jsonl"), fmt="jsonl")
+        write_records(store.records(), self.path("log.jsonl.gz"), fmt="jsonl", compress=True)
+        with open(self.path("log.jsonl"), encoding="utf-8") as plain, \
+                gzip.open(self.path("log.jsonl.gz"), "rt", encoding="utf-8") as packed:
+            self.assertEqual(plain.read(), packed.read())
+
+
+class ServerExportMixin(ServerTestMixin):
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.host = self.server.login_user("admin", "password123")
+
+    def test_export_after_cursor(self):
+        meeting = self.create_meeting(self.host)
+        meeting.post_chat_message(self.host, "old")
+        cursor = meeting.chat_store.cursor
+        meeting.post_chat_message(self.host, "new0")
+        meeting.post_chat_message(self.host, "new1")
+        path = self.server.export_chat_log(meeting.meeting_id, self.host, fmt="jsonl", output_dir=self.dir.name,
+                                           after_cursor=cursor)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line)["message"] for line in f], ["new0", "new1"])
+
+    def test_export_chat_logs_in_parallel(self):
+        meetings = [self.create_meeting(self.host) for _ in range(3)]
+        for meeting in meetings:
+            meeting.post_chat_message(self.host, f"hello {meeting.meeting_id}")
+        paths = self.server.export_chat_logs([m.meeting_id for m in meetings], self.host, max_workers=2,
+                                             compress=True, output_dir=self.dir.name)
+        self.assertEqual(set(paths), {m.meeting_id for m in meetings})
+        for meeting_id, path in paths.items():
+            self.assertTrue(path.endswith(".txt.gz"))
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines[0], f"--- Chat Log for Meeting {meeting_id} ---")
+            self.assertTrue(lines[1].endswith(f"admin: hello {meeting_id}"))
+
+    def test_non_participant_cannot_export(self):
+        meeting = self.create_meeting(self.host)
+        outsider = self.server.login_user("user1", "pass")
+        with self.assertRaises(self.module.UserNotAuthorizedError):
+            self.server.export_chat_log(meeting.meeting_id, outsider, output_dir=self.dir.name)
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+
+class TestV1ServerExport(ServerExportMixin, unittest.TestCase):
+    module = wins_systems_v1
+
+
+class TestV2ServerExport(ServerExportMixin, unittest.TestCase):
+    module = wins_systems_ai_agents_v2
+    meeting_kwargs = {"enable_ai": True}
+
+
+if __name__ == '__main__':
+    unittest.main()
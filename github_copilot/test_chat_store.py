@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from chat_store import ChatLogStore, ChatRecord
+
+
+def _fill(store, count, start=0):
+    for i in range(start, start + count):
+        store.append(f"u{i % 2}", f"user{i % 2}", f"msg{i}", timestamp=1_000 + i)
+
+
+class _CloseOnRelease:
+    """Lock wrapper that closes the store the first time the lock is released (a concurrent close())."""
+    def __init__(self, store, lock):
+        self.store = store
+        self.lock = lock
+        self.armed = True
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        if self.armed:
+            self.armed = False
+            self.store.close()
+
+
+class TestChatLogStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_ring_keeps_newest_records_in_memory(self):
+        store = ChatLogStore(ring_size=4, spill_dir=self.dir.name)
+        _fill(store, 3)
+        self.assertEqual((len(store), store.spilled_count, store.segment_path), (3, 0, None))
+        self.assertEqual(store.last(), ChatRecord(2, 1_002, "u0", "user0", "msg2"))
+        self.assertEqual(store.first().message, "msg0")
+        with self.assertRaises(ValueError):
+            ChatLogStore(ring_size=0)
+
+    def test_overflow_spills_to_segment_and_reads_back_in_order(self):
+        store = ChatLogStore(ring_size=3, spill_dir=self.dir.name)
+        _fill(store, 8)
+        self.assertEqual(store.spilled_count, 5)
+        self.assertTrue(os.path.exists(store.segment_path))
+        records = list(store.records())
+        self.assertEqual([r.seq for r in records], list(range(8)))
+        self.assertEqual([r.message for r in records], [f"msg{i}" for i in range(8)])
+        self.assertEqual(records[3], ChatRecord(3, 1_003, "u1", "user1", "msg3"))
+        # Starting inside the segment, at the boundary and inside the ring.
+        self.assertEqual([r.seq for r in store.records(4)], [4, 5, 6, 7])
+        self.assertEqual([r.seq for r in store.records(5)], [5, 6, 7])
+        self.assertEqual([r.seq for r in store.records(7)], [7])
+        self.assertEqual(list(store.records(8)), [])
+        self.assertEqual(list(store.transcript_lines(6)), ["user0: msg6", "user1: msg7"])
+
+    def test_cursor_is_the_next_sequence_number(self):
+        store = ChatLogStore(ring_size=2, spill_dir=self.dir.name)
+        self.assertEqual(store.cursor, 0)
+        _fill(store, 3)
+        cursor = store.cursor
+        self.assertEqual(cursor, 3)
+        self.assertEqual(store.append("u9", "late", "after"), cursor)
+        self.assertEqual([r.message for r in store.records(cursor)], ["after"])
+
+    def test_close_removes_segment_and_keeps_ring(self):
+        store = ChatLogStore(ring_size=2, spill_dir=self.dir.name)
+        _fill(store, 5)
+        path = store.segment_path
+        store.close()
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(store.segment_path)
+        self.assertEqual([r.seq for r in store.records()], [3, 4])
+        _fill(store, 1, start=5)
+        self.assertEqual(len(store), 6)
+        self.assertEqual([r.seq for r in store.records()], [4, 5])
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_close_right_after_snapshot_does_not_break_reader(self):
+        store = ChatLogStore(ring_size=2, spill_dir=self.dir.name)
+        _fill(store, 6)
+        store._lock = _CloseOnRelease(store, store._lock)
+        self.assertEqual([r.seq for r in store.records()], list(range(6)))
+        self.assertIsNone(store.segment_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from wins_systems_ai_agents_v2 import TOP_KEYWORDS_PER_CHUNK, AIAgent, AIServiceError, ChunkSummary
+
+SPEAKERS = ("alice", "bob", "carol", "dave")
+WORDS = ("deploy", "rollback", "latency", "budget", "roadmap", "hiring", "outage", "review")
+
+
+def _messages(count):
+    for i in range(count):
+        words = " ".join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 5)[: 1 + i % 3])
+        if i % 7 == 0:
+            words += f" todo: follow up on item {i} @{SPEAKERS[(i + 1) % len(SPEAKERS)]}"
+        yield f"message {i}: {words}", SPEAKERS[(i * i) % len(SPEAKERS)]
+
+
+def _state(chunk):
+    return (chunk.message_count, chunk.action_item_count, chunk.first_speaker, chunk.last_speaker,
+            dict(chunk.speaker_counts), dict(chunk.keyword_counts))
+
+
+class TestChunkSummary(unittest.TestCase):
+    def test_merge_combines_adjacent_chunks(self):
+        first, second = ChunkSummary(), ChunkSummary()
+        first.add_message("deploy the budget", "alice", new_action_items=1)
+        first.add_message("budget review", "bob")
+        second.add_message("deploy tonight", "carol", new_action_items=2)
+        merged = first.merge(second)
+        self.assertEqual(merged.level, 1)
+        self.assertEqual(_state(merged), (3, 3, "alice", "carol", {"alice": 1, "bob": 1, "carol": 1},
+                                          {"deploy": 2, "budget": 2, "review": 1, "tonight": 1}))
+        # Stopwords are not topics.
+        self.assertNotIn("the", merged.keyword_counts)
+        # Merging with an empty chunk keeps the speakers of the non-empty side.
+        self.assertEqual(_state(ChunkSummary().merge(second))[2:4], ("carol", "carol"))
+        self.assertEqual(_state(second.merge(ChunkSummary()))[2:4], ("carol", "carol"))
+
+    def test_seal_keeps_only_top_keywords(self):
+        chunk = ChunkSummary()
+        for i in range(TOP_KEYWORDS_PER_CHUNK + 10):
+            chunk.add_message(" ".join([f"word{i:02d}x"] * (i + 1)), "alice")
+        chunk.seal()
+        self.assertEqual(len(chunk.keyword_counts), TOP_KEYWORDS_PER_CHUNK)
+        self.assertEqual(min(chunk.keyword_counts.values()), 11)
+
+
+class TestIncrementalSummary(unittest.TestCase):
+    def agents(self, chunk_size):
+        """An incremental agent and a reference that keeps everything in one never-merged chunk."""
+        incremental = AIAgent("meet-1", incremental=True, chunk_size=chunk_size)
+        reference = AIAgent("meet-ref", incremental=True, chunk_size=10 ** 9)
+        return incremental, reference
+
+    def test_matches_single_pass_at_and_between_chunk_boundaries(self):
+        chunk_size = 4
+        incremental, reference = self.agents(chunk_size)
+        for n, (message, author) in enumerate(_messages(61), start=1):
+            incremental.process_message(message, author)
+            reference.process_message(message, author)
+            # Covers exact boundaries, odd numbers of sealed chunks and partial chunks.
+            self.assertEqual(_state(incremental._rolled_up_summary()), _state(reference._rolled_up_summary()),
+                             f"after {n} messages")
+        self.assertEqual(incremental.action_items, reference.action_items)
+        self.assertEqual(len(reference.action_items), 9)
+
+    def test_chunk_stack_is_a_binary_counter(self):
+        chunk_size = 3
+        incremental, _ = self.agents(chunk_size)
+        messages = _messages(chunk_size * 13 + 2)
+        for chunks in range(1, 14):
+            for _ in range(chunk_size):
+                incremental.process_message(*next(messages))
+            levels = [chunk.level for chunk in incremental._chunk_stack]
+            expected = [bit for bit in reversed(range(chunks.bit_length())) if chunks >> bit & 1]
+            self.assertEqual(levels, expected, f"after {chunks} chunks")
+            self.assertEqual([chunk.message_count for chunk in incremental._chunk_stack],
+                             [chunk_size << level for level in levels])
+        self.assertEqual(incremental._current_chunk.message_count, 0)
+        for message, author in messages:
+            incremental.process_message(message, author)
+        self.assertEqual(incremental._current_chunk.message_count, 2)
+
+    def test_summary_so_far_and_final_summary(self):
+        incremental, _ = self.agents(chunk_size=5)
+        self.assertEqual(incremental.summary_so_far(), "No content to summarize.")
+        for message, author in _messages(23):
+            incremental.process_message(message, author)
+        live = incremental.summary_so_far()
+        self.assertIn("- A total of 23 messages were exchanged.", live)
+        self.assertIn("- The meeting started with a message from alice.", live)
+        self.assertIn(f"- {len(incremental.action_items)} action items were identified.", live)
+        self.assertEqual(incremental.generate_summary(), live)
+        self.assertEqual(incremental.summary, live)
+
+    def test_live_summary_requires_incremental_mode(self):
+        with self.assertRaises(AIServiceError):
+            AIAgent("meet-1").summary_so_far()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from lifecycle import ArchivedMeeting, LifecycleManager, MeetingArchive
+from server_test_utils import ServerTestMixin
+
+
+class LifecycleMixin(ServerTestMixin):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        self.server.lifecycle = LifecycleManager(
+            self.server, archive=MeetingArchive(self.archive_dir.name), grace_period=60, session_ttl=600)
+
+    def _ended_meeting(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.post_chat_message(host, "todo: send the release notes")
+        handle = meeting.end_meeting(host)
+        if hasattr(handle, "result"):
+            handle.result()
+        return host, meeting
+
+    def test_ended_meeting_is_archived_after_grace_period(self):
+        host, meeting = self._ended_meeting()
+        self.assertEqual(self.server.lifecycle.sweep(now=meeting.ended_at + 30), (0, 0))
+        self.assertIn(meeting.meeting_id, self.server.meetings)
+
+        archived, _ = self.server.lifecycle.sweep(now=meeting.ended_at + 60)
+        self.assertEqual(archived, 1)
+        self.assertNotIn(meeting.meeting_id, self.server.meetings)
+        self.assertTrue(self.server.lifecycle.is_meeting_id_taken(meeting.meeting_id))
+
+        record = self.server.get_archived_meeting(meeting.meeting_id, host)
+        self.assertEqual(record.message_count, 1)
+        self.assertEqual(record.participant_ids, (host.user_id,))
+
+    def test_archived_meeting_requires_participant(self):
+        _, meeting = self._ended_meeting()
+        self.server.lifecycle.sweep(now=meeting.ended_at + 60)
+        outsider = self.server.login_user("user1", "pass")
+        with self.assertRaises(self.module.UserNotAuthorizedError):
+            self.server.get_archived_meeting(meeting.meeting_id, outsider)
+        with self.assertRaises(self.module.MeetingNotFoundException):
+            self.server.get_archived_meeting("meet-missing", outsider)
+
+    def test_archive_index_survives_reopen(self):
+        _, meeting = self._ended_meeting()
+        self.server.lifecycle.sweep(now=meeting.ended_at + 60)
+        reopened = MeetingArchive(self.archive_dir.name)
+        self.assertIn(meeting.meeting_id, reopened)
+        self.assertEqual(reopened.load(meeting.meeting_id).meeting_id, meeting.meeting_id)
+
+    def test_idle_sessions_expire(self):
+        idle = self.server.login_user("user1", "pass")
+        active = self.server.login_user("admin", "password123")
+        active.last_active = idle.last_active + 300
+        expired = self.server.lifecycle.expire_idle_sessions(now=idle.last_active + 600)
+        self.assertEqual(expired, 1)
+        self.assertFalse(idle.is_logged_in)
+        self.assertIn(active.user_id, self.server.users)
+
+    def test_expired_users_leave_their_meetings(self):
+        host = self.server.login_user("admin", "password123")
+        idle = self.server.login_user("user1", "pass")
+        meeting = self.create_meeting(host)
+        meeting.add_participant(idle)
+        host.last_active = idle.last_active + 300
+        self.assertEqual(self.server.lifecycle.expire_idle_sessions(now=idle.last_active + 600), 1)
+        self.assertFalse(meeting.is_participant(idle))
+        self.assertEqual(meeting.participants, [host])
+
+    def test_server_runs_the_sweeper_until_reset(self):
+        server = object.__new__(self.module.NodwinsServer)
+        server._initialized = False
+        server.__init__()
+        self.assertTrue(server.lifecycle.is_running)
+        server._reset_state()
+        self.assertFalse(server.lifecycle.is_running)
+        if hasattr(server, "summary_pool"):
+            server.summary_pool.shutdown()
+
+
+class TestV1Lifecycle(LifecycleMixin, unittest.TestCase):
+    module = wins_systems_v1
+
+
+class TestV2Lifecycle(LifecycleMixin, unittest.TestCase):
+    module = wins_systems_ai_agents_v2
+    meeting_kwargs = {"enable_ai": True, "incremental_summary": True}
+
+    def test_summary_and_action_items_reload_from_archive(self):
+        host, meeting = self._ended_meeting()
+        summary = self.server.get_meeting_summary(meeting.meeting_id, host)
+        items = self.server.get_action_items(meeting.meeting_id, host)
+        self.server.lifecycle.sweep(now=meeting.ended_at + 60)
+        self.assertNotIn(meeting.meeting_id, self.server.meetings)
+        self.assertEqual(self.server.get_meeting_summary(meeting.meeting_id, host), summary)
+        self.assertEqual(self.server.get_action_items(meeting.meeting_id, host), sorted(items))
+
+    def test_pending_summary_delays_archival(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.ended_at, meeting.is_active = 0.0, False
+        meeting.summary_handle = wins_systems_ai_agents_v2.Future()
+        self.assertEqual(self.server.lifecycle.archive_ended_meetings(now=600.0), 0)
+        meeting.summary_handle.set_result("done")
+        self.assertEqual(self.server.lifecycle.archive_ended_meetings(now=600.0), 1)
+
+    def test_failed_summary_is_archived_as_failed(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.ai_agent.generate_summary = lambda: 1 / 0
+        self.assertIsInstance(meeting.end_meeting(host).exception(5), ZeroDivisionError)
+        self.server.lifecycle.sweep(now=meeting.ended_at + 60)
+        self.assertNotIn(meeting.meeting_id, self.server.meetings)
+        self.assertEqual(self.server.get_archived_meeting(meeting.meeting_id, host).summary_error, "division by zero")
+        with self.assertRaisesRegex(wins_systems_ai_agents_v2.AIServiceError, "Summary generation failed"):
+            self.server.get_meeting_summary(meeting.meeting_id, host)
+
+
+class TestMeetingArchiveCleanup(unittest.TestCase):
+    def _record(self, meeting_id):
+        return ArchivedMeeting(meeting_id, "u1", "admin", 0.0, 0, ("u1",), None, ())
+
+    def test_temporary_archive_dir_is_removed(self):
+        archive = MeetingArchive()
+        archive.add(self._record("meet-1"))
+        temp_dir = archive.archive_dir
+        self.assertTrue(os.path.isdir(temp_dir))
+        archive.close()
+        self.assertFalse(os.path.exists(temp_dir))
+        self.assertNotIn("meet-1", archive)
+
+    def test_reset_state_does_not_leak_archive_dirs(self):
+        server = wins_systems_v1.NodwinsServer()
+        server._reset_state()
+        server.lifecycle.archive.add(self._record("meet-1"))
+        temp_dir = server.lifecycle.archive.archive_dir
+        server._reset_state()
+        self.assertFalse(os.path.exists(temp_dir))
+
+    def test_explicit_archive_dir_is_kept(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            archive = MeetingArchive(archive_dir)
+            archive.add(self._record("meet-1"))
+            archive.close()
+            self.assertIn("meet-1", MeetingArchive(archive_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+
+import perf_regression
+from perf_regression import compare, run_suite
+
+
+def _results(ops=1000.0, p99=2.0, mem=10.0):
+    return {"v1": {"chat_burst": {"ops_per_sec": ops, "p99_ms": p99, "peak_mem_mb": mem}}}
+
+
+class TestCompare(unittest.TestCase):
+    def test_throughput_drop_beyond_threshold_is_a_regression(self):
+        regressions = compare(_results(ops=1000), _results(ops=600), {"ops_per_sec": 0.25})
+        self.assertEqual([(r.scenario, r.metric) for r in regressions], [("chat_burst", "ops_per_sec")])
+        self.assertAlmostEqual(regressions[0].change, -0.4)
+
+    def test_changes_within_threshold_pass(self):
+        self.assertEqual(compare(_results(), _results(ops=900, p99=3.0, mem=11.0)), [])
+
+    def test_improvements_never_fail(self):
+        self.assertEqual(compare(_results(), _results(ops=5000, p99=0.1, mem=1.0)), [])
+
+    def test_latency_growth_below_noise_floor_is_ignored(self):
+        baseline = _results(p99=0.01)
+        self.assertEqual(compare(baseline, _results(p99=0.05)), [])
+        self.assertEqual(len(compare(baseline, _results(p99=5.0))), 1)
+
+    def test_metrics_missing_from_baseline_are_skipped(self):
+        current = {"v2": {"export": {"ops_per_sec": 1.0}}}
+        self.assertEqual(compare(_results(), current), [])
+
+
+class TestSuite(unittest.TestCase):
+    def test_identical_scenarios_run_for_both_versions(self):
+        results = run_suite(scale=0.01, repeats=1, scenarios=["login_storm", "chat_burst", "admission"])
+        self.assertEqual(set(results), {"v1", "v2"})
+        for scenarios in results.values():
+            self.assertEqual(set(scenarios), {"login_storm", "chat_burst", "admission"})
+            for metrics in scenarios.values():
+                self.assertEqual(set(metrics), set(perf_regression.DEFAULT_THRESHOLDS))
+                self.assertGreater(metrics["ops_per_sec"], 0)
+
+    def test_update_then_compare_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            args = ["--baseline", path, "--scale", "0.01", "--repeats", "3", "--versions", "v1",
+                    "--scenarios", "login_storm"]
+            self.assertEqual(perf_regression.main(args + ["--update"]), 0)
+            with open(path) as f:
+                self.assertIn("login_storm", json.load(f)["results"]["v1"])
+            # A generous threshold keeps timer noise on tiny runs from failing the comparison.
+            self.assertEqual(perf_regression.main(
+                args + ["--threshold", "ops_per_sec=0.99", "p50_ms=100", "p95_ms=100", "p99_ms=100",
+                        "peak_mem_mb=100"]), 0)
+
+    def test_single_runs_are_refused(self):
+        with self.assertRaises(SystemExit):
+            perf_regression.main(["--repeats", "1", "--scenarios", "login_storm"])
+
+    def test_metrics_are_the_median_of_the_runs(self):
+        elapsed = iter([1.0, 4.0, 2.0, 1.0])  # the last run is the tracemalloc one
+
+        def scenario(module, scale):
+            return perf_regression.ScenarioRun([0.001] * 100, next(elapsed))
+
+        metrics = perf_regression.measure(scenario, perf_regression.VERSIONS["v1"], repeats=3)
+        self.assertAlmostEqual(metrics["ops_per_sec"], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import os
+import tempfile
+import unittest
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from lifecycle import DEFAULT_SEARCH_RETENTION, LifecycleManager, MeetingArchive
+from search_index import SearchIndex, _remove_files, parse_query
+from server_test_utils import ServerTestMixin
+
+MESSAGES = [
+    ("meet-a", "alice", "please send the release notes"),
+    ("meet-a", "bob", "the release is on friday"),
+    ("meet-b", "carol", "notes from the release planning"),
+    ("meet-b", "alice", "release notes look good"),
+    ("meet-a", "bob", "todo: send notes to QA"),
+    ("meet-c", "dave", "nothing to see here"),
+    ("meet-c", "alice", "the release notes are out"),
+]
+
+
+def _build(index):
+    for seq, (meeting_id, author, text) in enumerate(MESSAGES):
+        index.add(meeting_id, seq, 1_000 + seq, author, text)
+    return index
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_parse_query_splits_terms_and_phrases(self):
+        self.assertEqual(parse_query('Deploy "release notes" deploy'),
+                         (("deploy", "release", "notes"), (("release", "notes"),)))
+
+    def test_terms_phrases_and_filters(self):
+        index = _build(SearchIndex())
+        self.assertEqual(len(index.search("release notes")), 4)
+        phrase = index.search('"release notes"')
+        self.assertEqual({hit.seq for hit in phrase}, {0, 3, 6})
+        self.assertEqual([hit.seq for hit in index.search("notes", author="bob")], [4])
+        self.assertEqual([hit.seq for hit in index.search("release", meeting_id="meet-b")], [3, 2])
+        self.assertEqual([hit.seq for hit in index.search(since=1_003, until=1_004)], [4, 3])
+        self.assertEqual(index.search("missing"), [])
+
+    def test_top_k_by_relevance_and_recency(self):
+        index = _build(SearchIndex())
+        best = index.search("release notes", k=1)[0]
+        self.assertEqual(best.message, "release notes look good")  # shortest matching message
+        self.assertEqual([hit.seq for hit in index.search("notes", k=2, order="recent")], [6, 4])
+
+    def test_can_view_hides_meetings(self):
+        index = _build(SearchIndex())
+        hits = index.search("release", can_view=lambda meeting_id: meeting_id == "meet-c")
+        self.assertEqual([hit.meeting_id for hit in hits], ["meet-c"])
+
+    def test_segments_merge_and_survive_reopen(self):
+        index = _build(SearchIndex(self.dir.name, flush_threshold=2, merge_factor=2))
+        index.flush()
+        # Segments of 2 + 2 + 2 + 1 messages merge pairwise into a single level-2 segment.
+        self.assertEqual(index.segment_count, 1)
+        self.assertEqual(len([f for f in os.listdir(self.dir.name) if f.endswith(".idx")]), 1)
+        recent = index.search('"release notes"', order="recent")
+        index.close()
+        reopened = SearchIndex(self.dir.name)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened), len(MESSAGES))
+        self.assertEqual(reopened.search('"release notes"', order="recent"), recent)
+        self.assertEqual(reopened.search("release notes"), _build(SearchIndex()).search("release notes"))
+
+    def test_disk_segments_are_read_in_place(self):
+        index = _build(SearchIndex(self.dir.name))
+        self.addCleanup(index.close)
+        index.flush()
+        segment = index._segments[0]
+        self.assertIsInstance(segment.timestamp, memoryview)
+        self.assertIsInstance(segment.text_region()[1], memoryview)
+        self.assertNotIsInstance(segment._terms, dict)
+        self.assertEqual(list(segment.sorted_terms()), sorted(segment.sorted_terms()))
+        self.assertEqual(segment.doc_freq("release"), 5)
+        self.assertEqual(segment.doc_freq("missing"), 0)
+        self.assertEqual(index.search("notes", k=2, order="recent"), _build(SearchIndex()).search("notes", k=2, order="recent"))
+
+    def test_replaced_segments_are_closed_and_removed(self):
+        index = SearchIndex(self.dir.name, flush_threshold=2, merge_factor=2)
+        self.addCleanup(index.close)
+        _build(index).flush()
+        first = index._segments[0]
+        first.readers += 1  # as if a search were still reading it
+        index.drop_meeting("meet-c")
+        for seq in range(8):
+            index.add("meet-d", seq, 2_000 + seq, "erin", "merge me")
+        index.flush()
+        # Merged away, but left open and on disk until the search is done with it.
+        self.assertNotIn(first, index._segments)
+        self.assertTrue(first.retired)
+        self.assertFalse(first._mm.closed)
+        self.assertTrue(os.path.exists(first.path))
+        with index._lock:
+            first.readers -= 1
+        index._retire([first])
+        self.assertTrue(first._mm.closed)
+        self.assertFalse(os.path.exists(first.path))
+        files = {f for f in os.listdir(self.dir.name) if f.endswith(".idx")}
+        self.assertEqual(files, {os.path.basename(s.path) for s in index._segments})
+
+    def test_failed_removals_are_logged(self):
+        with self.assertLogs("nodwins.search", "WARNING") as logs:
+            _remove_files([self.dir.name, os.path.join(self.dir.name, "missing.idx")])
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(self.dir.name, logs.output[0])
+
+    def test_dropped_meetings_are_hidden_then_compacted(self):
+        index = _build(SearchIndex(self.dir.name, flush_threshold=3, merge_factor=2))
+        self.addCleanup(index.close)
+        index.drop_meeting("meet-a")  # partly still in memory
+        self.assertNotIn("meet-a", {hit.meeting_id for hit in index.search()})
+        index.flush()
+        self.assertEqual(len(index), 4)
+        index.drop_meeting("meet-b")
+        index.drop_meeting("unknown")
+        index.flush()
+        self.assertEqual([hit.meeting_id for hit in index.search(k=10)], ["meet-c", "meet-c"])
+        # Compaction rewrote the segments without the dropped messages and forgot both meetings.
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index._dropped, set())
+        self.assertEqual(index.search(meeting_id="meet-a"), [])
+        reopened = SearchIndex(self.dir.name)
+        self.addCleanup(reopened.close)
+        self.assertEqual([hit.seq for hit in reopened.search("release notes")], [6])
+        # A fresh meeting with a dropped meeting's id is indexed from scratch.
+        index.add("meet-a", 0, 2_000, "erin", "release party")
+        self.assertEqual([hit.message for hit in index.search("release", meeting_id="meet-a")], ["release party"])
+
+    def test_close_removes_a_temporary_index(self):
+        index = _build(SearchIndex(flush_threshold=2))
+        index.flush()
+        index_dir = index.index_dir
+        self.assertTrue(os.listdir(index_dir))
+        index.close()
+        self.assertFalse(os.path.exists(index_dir))
+        self.assertEqual(index.search("release"), [])
+
+
+class ServerSearchMixin(ServerTestMixin):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        self.server.lifecycle = LifecycleManager(self.server, archive=MeetingArchive(self.archive_dir.name),
+                                                 grace_period=0)
+        self.index = self.server.enable_search()
+
+    def test_search_is_opt_in(self):
+        self.server._reset_state()
+        self.assertIsNone(self.server.search_index)
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.post_chat_message(host, "not indexed")
+        self.assertIsNone(meeting.search_index)
+        with self.assertRaises(RuntimeError):
+            self.server.search_messages(host, "indexed")
+        index = self.server.enable_search(flush_threshold=10)
+        self.assertIs(self.server.enable_search(), index)
+        self.assertEqual(index.flush_threshold, 10)
+
+    def test_posted_messages_are_searchable_by_participants(self):
+        host = self.server.login_user("admin", "password123")
+        guest = self.server.login_user("user1", "pass")
+        shared = self.create_meeting(host)
+        private = self.create_meeting(host)
+        shared.add_participant(guest)
+        shared.post_chat_message(guest, "the deploy is blocked on review")
+        private.post_chat_message(host, "deploy the hotfix tonight")
+
+        self.assertEqual(len(self.server.search_messages(host, "deploy")), 2)
+        hits = self.server.search_messages(guest, "deploy")
+        self.assertEqual([(hit.meeting_id, hit.username) for hit in hits], [(shared.meeting_id, "user1")])
+
+    def test_archived_meetings_stay_searchable(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.post_chat_message(host, "retro notes are in the wiki")
+        handle = meeting.end_meeting(host)
+        if hasattr(handle, "result"):
+            handle.result()
+        self.server.lifecycle.sweep(now=meeting.ended_at + 1)
+        self.assertNotIn(meeting.meeting_id, self.server.meetings)
+        hits = self.server.search_messages(host, '"retro notes"')
+        self.assertEqual([hit.meeting_id for hit in hits], [meeting.meeting_id])
+
+    def test_archived_meetings_leave_the_index_after_retention(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        meeting.post_chat_message(host, "retro notes are in the wiki")
+        handle = meeting.end_meeting(host)
+        if hasattr(handle, "result"):
+            handle.result()
+        archived_at = meeting.ended_at + 1
+        self.server.lifecycle.sweep(now=archived_at)
+        self.server.lifecycle.sweep(now=archived_at + DEFAULT_SEARCH_RETENTION - 1)
+        self.assertEqual(len(self.server.search_messages(host, "retro")), 1)
+        self.server.lifecycle.sweep(now=archived_at + DEFAULT_SEARCH_RETENTION)
+        self.assertEqual(self.server.search_messages(host, "retro"), [])
+        self.index.flush()
+        self.assertEqual(len(self.index), 0)
+
+    def test_reset_closes_the_index(self):
+        host = self.server.login_user("admin", "password123")
+        self.create_meeting(host).post_chat_message(host, "hello")
+        self.index.flush()
+        index_dir = self.index.index_dir
+        self.server._reset_state()
+        self.assertFalse(os.path.exists(index_dir))
+        self.assertIsNone(self.server.search_index)
+
+
+class TestV1ServerSearch(ServerSearchMixin, unittest.TestCase):
+    module = wins_systems_v1
+
+
+class TestV2ServerSearch(ServerSearchMixin, unittest.TestCase):
+    module = wins_systems_ai_agents_v2
+    meeting_kwargs = {"enable_ai": True}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+import wins_systems_v1
+import wins_systems_ai_agents_v2
+from server_test_utils import ServerTestMixin
+
+THREADS = 16
+MESSAGES_PER_THREAD = 200
+
+
+def run_threads(target, count=THREADS):
+    """Starts `count` threads on target(index) behind a barrier; re-raises the first error."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e:  # pragma: no cover - surfaced via the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+class ServerConcurrencyMixin(ServerTestMixin):
+    def test_concurrent_logins_and_meeting_creation(self):
+        created = []
+
+        def work(_):
+            user = self.server.login_user("admin", "password123")
+            meeting = self.create_meeting(user)
+            created.append(meeting.meeting_id)
+            self.assertIs(self.server.get_meeting(meeting.meeting_id), meeting)
+            self.assertTrue(self.server.logout_user(user.user_id))
+
+        run_threads(work)
+        self.assertEqual(len(set(created)), THREADS)
+        self.assertEqual(len(self.server.meetings), THREADS)
+        self.assertEqual(len(self.server.users), 0)
+
+    def test_concurrent_chat_is_atomic(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        users = [self.server.login_user("user1", "pass") for _ in range(THREADS)]
+
+        def work(index):
+            user = users[index]
+            meeting.add_participant(user)
+            for i in range(MESSAGES_PER_THREAD):
+                meeting.post_chat_message(user, f"message {i} from {index}")
+
+        run_threads(work)
+        records = list(meeting.chat_store.records())
+        self.assertEqual(len(records), THREADS * MESSAGES_PER_THREAD)
+        self.assertEqual([r.seq for r in records], list(range(len(records))))
+        # Each author's messages keep their own order.
+        for user in users:
+            own = [r.message for r in records if r.user_id == user.user_id]
+            self.assertEqual(own, [f"message {i} from {users.index(user)}" for i in range(MESSAGES_PER_THREAD)])
+
+    def test_no_messages_after_leaving(self):
+        host = self.server.login_user("admin", "password123")
+        meeting = self.create_meeting(host)
+        users = [self.server.login_user("user1", "pass") for _ in range(THREADS)]
+        for user in users:
+            meeting.add_participant(user)
+        accepted = [0] * THREADS
+
+        def work(index):
+            user = users[index]
+            if index % 2:
+                meeting.remove_participant(user)
+            for _ in range(50):
+                try:
+                    meeting.post_chat_message(user, "hello")
+                    accepted[index] += 1
+                except self.module.UserNotAuthorizedError:
+                    pass
+
+        run_threads(work)
+        self.assertEqual(len(meeting.chat_store), sum(accepted))
+        self.assertTrue(all(accepted[i] == 0 for i in range(1, THREADS, 2)))
+
+    def test_uninstall_resets_state(self):
+        user = self.server.login_user("admin", "password123")
+        self.create_meeting(user)
+        with patch.object(self.module.time, "sleep"):
+            self.server.uninstall()
+        self.assertIs(self.module.NodwinsServer(), self.server)
+        self.assertEqual(len(self.server.users), 0)
+        self.assertEqual(len(self.server.meetings), 0)
+
+
+class TestV1ServerConcurrency(ServerConcurrencyMixin, unittest.TestCase):
+    module = wins_systems_v1
+
+
+class TestV2ServerConcurrency(ServerConcurrencyMixin, unittest.TestCase):
+    module = wins_systems_ai_agents_v2
+    meeting_kwargs = {"enable_ai": True}
+
+
+if __name__ == '__main__':
+    unittest.main()
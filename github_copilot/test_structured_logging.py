@@ -0,0 +1,62 @@
+import io
+import json
+import logging
+import queue
+import unittest
+
+import wins_systems_v1
+from server_test_utils import fresh_server
+from structured_logging import (DeferredQueueHandler, StructuredFormatter, configure_logging, get_logger,
+                                set_level, shutdown_logging)
+
+
+class _Exploding:
+    """A log argument that fails the test if it is ever formatted."""
+    def __str__(self):
+        raise AssertionError("log argument formatted while logging was off")
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def tearDown(self):
+        shutdown_logging()
+        set_level(logging.NOTSET)
+
+    def test_arguments_are_not_formatted_when_disabled(self):
+        configure_logging("OFF")
+        get_logger("test").info("value: %s", _Exploding())
+        configure_logging("WARNING", stream=io.StringIO())
+        get_logger("test").info("value: %s", _Exploding())
+
+    def test_text_and_json_output_carry_fields(self):
+        record = logging.LogRecord("nodwins.v1", logging.INFO, __file__, 1, "'%s' joined", ("alice",), None)
+        record.meeting_id = "meet-1"
+        record.note = "two words"
+        line = StructuredFormatter("text").format(record)
+        self.assertIn("INFO nodwins.v1 'alice' joined meeting_id=meet-1 note=\"two words\"", line)
+        payload = json.loads(StructuredFormatter("json").format(record))
+        self.assertEqual((payload["msg"], payload["meeting_id"]), ("'alice' joined", "meet-1"))
+
+    def test_queue_handler_delivers_records_from_the_server(self):
+        stream = io.StringIO()
+        handler = configure_logging("DEBUG", stream=stream)
+        self.assertIsInstance(handler, DeferredQueueHandler)
+        server = fresh_server(wins_systems_v1)
+        host = server.login_user("admin", "password123")
+        meeting = server.create_meeting(host)
+        meeting.post_chat_message(host, "hello there")
+        shutdown_logging()
+        server._reset_state()
+        output = stream.getvalue()
+        self.assertIn("nodwins.v1 admin: hello there meeting_id=%s seq=" % meeting.meeting_id, output)
+        self.assertIn("User 'admin' created", output)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("nodwins.test", logging.INFO, __file__, 1, "msg", (), None)
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import itertools
+import threading
+import unittest
+
+from wins_systems_ai_agents_v2 import AIServiceError, Meeting, MeetingNotFoundException, SummaryWorkerPool, User
+
+
+class _BlockingSummary:
+    """Stands in for AIAgent.generate_summary; blocks until released, then returns "done"."""
+    def __init__(self, error=None):
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return "done"
+
+
+class TestSummaryWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.host = User("u-host", "host")
+        self.ids = itertools.count()
+        self.pool = SummaryWorkerPool(max_workers=1, max_in_flight=1, submit_timeout=0.05)
+        self.addCleanup(self.pool.shutdown)
+
+    def meeting(self, summary_pool=None, error=None):
+        meeting = Meeting(f"meet-{next(self.ids)}", self.host, summary_pool=summary_pool)
+        meeting.post_chat_message(self.host, "hello")
+        blocker = _BlockingSummary(error)
+        meeting.ai_agent.generate_summary = blocker
+        self.addCleanup(blocker.release.set)
+        return meeting, blocker
+
+    def test_pending_then_done(self):
+        meeting, blocker = self.meeting(self.pool)
+        with self.assertRaises(AIServiceError):
+            meeting.get_meeting_summary(self.host)  # still active
+        handle = meeting.end_meeting(self.host)
+        blocker.started.wait(5)
+        self.assertFalse(handle.done())
+        self.assertEqual(meeting.get_meeting_summary(self.host), "Summary generation is in progress.")
+        self.assertIs(meeting.end_meeting(self.host), handle)
+        blocker.release.set()
+        self.assertEqual(handle.result(5), "done")
+        self.assertEqual(meeting.get_meeting_summary(self.host), "done")
+
+    def test_failure_is_reported(self):
+        meeting, blocker = self.meeting(self.pool, error=RuntimeError("model unavailable"))
+        blocker.release.set()
+        handle = meeting.end_meeting(self.host)
+        self.assertIsInstance(handle.exception(5), RuntimeError)
+        with self.assertRaisesRegex(AIServiceError, "model unavailable"):
+            meeting.get_meeting_summary(self.host)
+
+    def test_full_pool_fails_the_summary_instead_of_blocking(self):
+        busy, blocker = self.meeting(self.pool)
+        busy.end_meeting(self.host)
+        blocker.started.wait(5)
+        meeting, _ = self.meeting(self.pool)
+        handle = meeting.end_meeting(self.host)
+        self.assertFalse(meeting.is_active)
+        self.assertIsInstance(handle.exception(0), AIServiceError)
+        with self.assertRaisesRegex(AIServiceError, "Too many AI summaries"):
+            meeting.get_meeting_summary(self.host)
+        blocker.release.set()
+
+    def test_inline_summary_does_not_hold_the_meeting_lock(self):
+        meeting, blocker = self.meeting()
+        guest = User("u-guest", "guest")
+        ender = threading.Thread(target=meeting.end_meeting, args=(self.host,))
+        ender.start()
+        self.assertTrue(blocker.started.wait(5))
+        # Joins, leaves and lock-taking reads get through while the summary is being generated.
+        visitor = threading.Thread(target=lambda: (meeting.add_participant(guest), meeting.get_action_items(guest),
+                                                   meeting.remove_participant(guest)))
+        visitor.start()
+        visitor.join(2)
+        self.assertFalse(visitor.is_alive())
+        self.assertFalse(meeting.is_participant(guest))
+        self.assertEqual(meeting.get_meeting_summary(self.host), "Summary generation is in progress.")
+        blocker.release.set()
+        ender.join(5)
+        self.assertEqual(meeting.get_meeting_summary(self.host), "done")
+
+    def test_no_chat_after_the_meeting_ends(self):
+        meeting, blocker = self.meeting(self.pool)
+        meeting.end_meeting(self.host)
+        with self.assertRaises(MeetingNotFoundException):
+            meeting.post_chat_message(self.host, "too late")
+        self.assertEqual(len(meeting.chat_store), 1)
+        blocker.release.set()
+
+    def test_summary_is_made_from_a_snapshot(self):
+        meeting = Meeting("meet-snap", self.host, incremental_summary=True)
+        for i in range(3):
+            meeting.post_chat_message(self.host, f"todo: task {i}")
+        snapshot = meeting.ai_agent.snapshot()
+        meeting.ai_agent.process_message("todo: later task", "host")
+        self.assertEqual(len(snapshot.action_items), 3)
+        self.assertEqual(snapshot._current_chunk.message_count, 3)
+        self.assertIn("A total of 3 messages", snapshot.generate_summary())
+        self.assertIsNone(meeting.ai_agent.summary)
+        meeting.end_meeting(self.host)
+        self.assertIn("A total of 4 messages", meeting.get_meeting_summary(self.host))
+
+
+if __name__ == '__main__':
+    unittest.main()
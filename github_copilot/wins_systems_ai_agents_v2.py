@@ -2,11 +2,29 @@
 # This enhanced version introduces an AI Agent for productivity features.
 # It builds directly on v1, adding new functionality while retaining existing features.
 
+import copy
+import logging
+import os
 import time
 import uuid
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import Counter
 from typing import Dict, List, Optional, Set
 
+from action_items import DEFAULT_DETECTOR, ActionItem, ActionItemDetector
+from admission import AdmissionController
+from chat_export import export_file_name, export_in_parallel, select_records, write_records
+from chat_store import DEFAULT_RING_SIZE, ChatLogStore
+from lifecycle import ArchivedMeeting, LifecycleManager, MeetingArchive
+from search_index import SearchHit, SearchIndex
+from server_state import StripedMap
+from structured_logging import get_logger
+
+logger = get_logger("v2")
+ai_logger = get_logger("v2.ai")
+
 # --- Exceptions from v1 (for Regression Testing) ---
 class AuthenticationError(Exception):
     """Custom exception for login failures."""
@@ -20,6 +38,10 @@ class UserNotAuthorizedError(Exception):
     """Custom exception for actions a user is not permitted to perform."""
     pass
 
+class ResourcesExhaustedError(Exception):
+    """Raised when admission control turns away a new meeting."""
+    pass
+
 # --- AI-Specific Exception ---
 class AIServiceError(Exception):
     """Custom exception for when the AI agent fails."""
@@ -28,176 +50,534 @@ class AIServiceError(Exception):
 # --- Data Models (Mostly unchanged from v1) ---
 class User:
     """Represents a user in the system."""
+    __slots__ = ("username", "user_id", "is_logged_in", "last_active")
+
     def __init__(self, username: str, user_id: str):
         self.username = username
         self.user_id = user_id
         self.is_logged_in = True
-        # print(f"INFO: User '{self.username}' created with ID: {self.user_id}") # Less verbose in v2
+        self.last_active = time.time()
+        # Less verbose in v2: user creation is a DEBUG event.
+        logger.debug("User '%s' created", username, extra={"user_id": user_id})
+
+    def touch(self):
+        """Records activity; idle sessions are expired by the LifecycleManager."""
+        self.last_active = time.time()
 
     def __repr__(self):
         return f"User(username='{self.username}')"
 
+# --- Incremental summarization ---
+_KEYWORD_PATTERN = re.compile(r"[a-z][a-z0-9'-]{2,}")
+_STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has him his how its "
+    "may new now old see two way who did get let put say she too use that this with have "
+    "from they will would there their what about which when make like time just know take "
+    "into your some could them than then look only come over think also back after work "
+    "well even want because these give most yes yeah okay thanks thank please todo item".split()
+)
+DEFAULT_SUMMARY_CHUNK_SIZE = 50
+TOP_KEYWORDS_PER_CHUNK = 20
+
+
+class ChunkSummary:
+    """
+    Mergeable aggregates for a contiguous run of transcript messages.
+    Two adjacent chunks combine into one in O(speakers + keywords), so a
+    meeting's summary never needs another pass over the transcript.
+    """
+    __slots__ = ("level", "message_count", "action_item_count", "first_speaker", "last_speaker",
+                 "speaker_counts", "keyword_counts")
+
+    def __init__(self, level: int = 0):
+        self.level = level
+        self.message_count = 0
+        self.action_item_count = 0
+        self.first_speaker: Optional[str] = None
+        self.last_speaker: Optional[str] = None
+        self.speaker_counts: Counter = Counter()
+        self.keyword_counts: Counter = Counter()
+
+    def add_message(self, message: str, author: str, new_action_items: int = 0):
+        if self.first_speaker is None:
+            self.first_speaker = author
+        self.last_speaker = author
+        self.message_count += 1
+        self.action_item_count += new_action_items
+        self.speaker_counts[author] += 1
+        self.keyword_counts.update(
+            word for word in _KEYWORD_PATTERN.findall(message.lower()) if word not in _STOPWORDS
+        )
+
+    def seal(self):
+        """Trims keyword counts to the chunk's top terms so merged state stays bounded."""
+        if len(self.keyword_counts) > TOP_KEYWORDS_PER_CHUNK:
+            self.keyword_counts = Counter(dict(self.keyword_counts.most_common(TOP_KEYWORDS_PER_CHUNK)))
+
+    def copy(self) -> "ChunkSummary":
+        clone = ChunkSummary(level=self.level)
+        clone.message_count = self.message_count
+        clone.action_item_count = self.action_item_count
+        clone.first_speaker = self.first_speaker
+        clone.last_speaker = self.last_speaker
+        clone.speaker_counts = Counter(self.speaker_counts)
+        clone.keyword_counts = Counter(self.keyword_counts)
+        return clone
+
+    def merge(self, later: "ChunkSummary") -> "ChunkSummary":
+        """Combines this chunk with the chunk that immediately follows it."""
+        merged = ChunkSummary(level=max(self.level, later.level) + 1)
+        merged.message_count = self.message_count + later.message_count
+        merged.action_item_count = self.action_item_count + later.action_item_count
+        merged.first_speaker = self.first_speaker if self.first_speaker is not None else later.first_speaker
+        merged.last_speaker = later.last_speaker if later.last_speaker is not None else self.last_speaker
+        merged.speaker_counts = self.speaker_counts + later.speaker_counts
+        merged.keyword_counts = self.keyword_counts + later.keyword_counts
+        merged.seal()
+        return merged
+
+    def render(self, top_n: int = 5) -> str:
+        speakers = ", ".join(f"{name} ({count})" for name, count in self.speaker_counts.most_common(top_n))
+        topics = ", ".join(word for word, _ in self.keyword_counts.most_common(top_n))
+        return (
+            f"Meeting Summary:\n"
+            f"- The meeting started with a message from {self.first_speaker}.\n"
+            f"- A total of {self.message_count} messages were exchanged.\n"
+            f"- The meeting concluded with a message from {self.last_speaker}.\n"
+            f"- {self.action_item_count} action items were identified.\n"
+            f"- Most active speakers: {speakers or 'none'}.\n"
+            f"- Key topics: {topics or 'none'}."
+        )
+
+
 # --- NEW: AI Agent Class ---
 class AIAgent:
     """
     A new class to handle AI-powered productivity features like
     transcription, summarization, and action item detection.
+
+    In incremental mode every processed message updates running aggregates.
+    Every `chunk_size` messages the current chunk is sealed and merged
+    hierarchically (like a binary counter), so the final summary only combines
+    O(log chunks) partial summaries instead of re-reading the transcript.
     """
-    def __init__(self, meeting_id: str):
+    def __init__(self, meeting_id: str, transcript: Optional[ChatLogStore] = None,
+                 incremental: bool = False, chunk_size: int = DEFAULT_SUMMARY_CHUNK_SIZE,
+                 detector: Optional[ActionItemDetector] = None):
         self.meeting_id = meeting_id
-        self.full_transcript: List[str] = []
+        # When a Meeting passes in its chat store, the transcript shares that
+        # buffer instead of keeping a second copy of every message.
+        self._owns_transcript = transcript is None
+        self.transcript_store = ChatLogStore() if transcript is None else transcript
         self.action_items: Set[str] = set()
+        # De-duplicates on normalised detail + assignee rather than the display string.
+        self._action_item_keys: Set[tuple] = set()
+        self.detector = detector or DEFAULT_DETECTOR
         self.summary: Optional[str] = None
-        print(f"AI_AGENT [{meeting_id}]: Initialized and ready.")
+        self.incremental = incremental
+        self.chunk_size = chunk_size
+        self._chunk_stack: List[ChunkSummary] = []
+        self._current_chunk = ChunkSummary()
+        ai_logger.debug("Initialized and ready.", extra={"meeting_id": meeting_id})
+
+    @property
+    def full_transcript(self) -> List[str]:
+        """The transcript rendered as 'author: message' lines."""
+        return list(self.transcript_store.transcript_lines())
 
     def process_message(self, message: str, author: str):
         """Processes a single message for transcription and action item detection."""
         try:
-            # 1. Add to transcript
-            transcript_line = f"{author}: {message}"
-            self.full_transcript.append(transcript_line)
-
-            # 2. Detect action items (simple keyword-based logic for simulation)
-            action_pattern = r'\b(action item|todo|task for|assign to)\b[:\s]*(.*)'
-            match = re.search(action_pattern, message, re.IGNORECASE)
-            if match:
-                action_detail = match.group(2).strip()
-                detected_item = f"'{action_detail}' assigned based on message from {author}."
-                self.action_items.add(detected_item)
-                print(f"AI_AGENT [{self.meeting_id}]: Detected action item: {detected_item}")
+            # 1. Add to transcript (a shared store is already appended to by the Meeting)
+            if self._owns_transcript:
+                self.transcript_store.append(author, author, message)
+
+            # 2. Detect action items (every trigger phrase in the message, one scan)
+            new_items = self._record_action_items(self.detector.detect(message, author))
+
+            # 3. Update rolling summary aggregates
+            if self.incremental:
+                self._update_rolling_summary(message, author, new_items)
         except Exception as e:
             raise AIServiceError(f"Failed to process message: {e}")
 
+    def process_messages(self, messages: List[tuple]):
+        """Batch variant of process_message for (message, author) pairs, e.g. transcript replays."""
+        try:
+            if self._owns_transcript:
+                for message, author in messages:
+                    self.transcript_store.append(author, author, message)
+            detected = self.detector.detect_batch(messages)
+            for (message, author), items in zip(messages, detected):
+                new_items = self._record_action_items(items)
+                if self.incremental:
+                    self._update_rolling_summary(message, author, new_items)
+        except Exception as e:
+            raise AIServiceError(f"Failed to process messages: {e}")
+
+    def _record_action_items(self, items: List[ActionItem]) -> int:
+        """Adds unseen action items and returns how many were new."""
+        added = 0
+        for item in items:
+            if item.key in self._action_item_keys:
+                continue
+            self._action_item_keys.add(item.key)
+            detected_item = item.describe()
+            self.action_items.add(detected_item)
+            added += 1
+            ai_logger.info("Detected action item: %s", detected_item, extra={"meeting_id": self.meeting_id})
+        return added
+
+    def _update_rolling_summary(self, message: str, author: str, new_items: int):
+        self._current_chunk.add_message(message, author, new_items)
+        if self._current_chunk.message_count >= self.chunk_size:
+            self._push_chunk(self._current_chunk)
+            self._current_chunk = ChunkSummary()
+
+    def _push_chunk(self, chunk: ChunkSummary):
+        chunk.seal()
+        # Merge equal-level neighbours so the stack holds O(log chunks) summaries.
+        while self._chunk_stack and self._chunk_stack[-1].level == chunk.level:
+            chunk = self._chunk_stack.pop().merge(chunk)
+        self._chunk_stack.append(chunk)
+
+    def _rolled_up_summary(self) -> ChunkSummary:
+        rolled = ChunkSummary()
+        for chunk in self._chunk_stack:
+            rolled = rolled.merge(chunk)
+        if self._current_chunk.message_count:
+            rolled = rolled.merge(self._current_chunk)
+        return rolled
+
+    def summary_so_far(self) -> str:
+        """Live summary of everything processed so far (incremental mode only)."""
+        if not self.incremental:
+            raise AIServiceError("Live summaries require incremental summarization to be enabled.")
+        rolled = self._rolled_up_summary()
+        if not rolled.message_count:
+            return "No content to summarize."
+        return rolled.render()
+
+    def snapshot(self) -> "AIAgent":
+        """
+        A copy of the agent to summarize from on another thread (take it under
+        the meeting lock). Sealed chunks are never mutated and an ended
+        meeting's transcript no longer grows, so both are shared.
+        """
+        clone = copy.copy(self)
+        clone.action_items = set(self.action_items)
+        clone._action_item_keys = set(self._action_item_keys)
+        clone._chunk_stack = list(self._chunk_stack)
+        clone._current_chunk = self._current_chunk.copy()
+        return clone
+
     def generate_summary(self) -> str:
         """Generates a summary of the meeting transcript."""
-        if not self.full_transcript:
+        if self.incremental:
+            self.summary = self.summary_so_far()
+            ai_logger.info("Summary generated from rolling aggregates.", extra={"meeting_id": self.meeting_id})
+            return self.summary
+
+        line_count = len(self.transcript_store)
+        if not line_count:
             self.summary = "No content to summarize."
             return self.summary
 
         # Simulate a complex summarization algorithm
-        print(f"AI_AGENT [{self.meeting_id}]: Analyzing {len(self.full_transcript)} lines of transcript...")
+        ai_logger.info("Analyzing %d lines of transcript...", line_count, extra={"meeting_id": self.meeting_id})
         time.sleep(0.5) # Simulate processing time for performance tests
 
         # A simple summary for demonstration
-        first_line = self.full_transcript[0]
-        last_line = self.full_transcript[-1]
+        first_record = self.transcript_store.first()
+        last_record = self.transcript_store.last()
         self.summary = (
             f"Meeting Summary:\n"
-            f"- The meeting started with a message from {first_line.split(':')[0]}.\n"
-            f"- A total of {len(self.full_transcript)} messages were exchanged.\n"
-            f"- The meeting concluded with a message from {last_line.split(':')[0]}.\n"
+            f"- The meeting started with a message from {first_record.username}.\n"
+            f"- A total of {line_count} messages were exchanged.\n"
+            f"- The meeting concluded with a message from {last_record.username}.\n"
             f"- {len(self.action_items)} action items were identified."
         )
-        print(f"AI_AGENT [{self.meeting_id}]: Summary generated.")
+        ai_logger.info("Summary generated.", extra={"meeting_id": self.meeting_id})
         return self.summary
 
+# --- Background summary generation ---
+# Seconds the server's end_meeting waits for a free summary slot before giving up.
+SUMMARY_SUBMIT_TIMEOUT = 2.0
+
+
+class SummaryWorkerPool:
+    """
+    Generates AI summaries on background worker threads so ending a meeting
+    does not block on summarization.
+
+    At most `max_in_flight` summaries may be queued or running at once. When the
+    cap is reached, submit() waits up to `submit_timeout` seconds for a slot
+    (None waits indefinitely) and raises AIServiceError if none frees up.
+    """
+    def __init__(self, max_workers: int = 32, max_in_flight: int = 1024, submit_timeout: Optional[float] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-summary")
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self.submit_timeout = submit_timeout
+
+    def submit(self, agent: "AIAgent") -> Future:
+        """Queues agent.generate_summary() and returns a Future for the summary text."""
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            raise AIServiceError("Too many AI summaries in flight. Please try again shortly.")
+        try:
+            future = self._executor.submit(agent.generate_summary)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
 # --- Modified Meeting Class to Integrate AI Agent ---
 class Meeting:
     """Represents a single meeting session, now with an integrated AI Agent."""
-    def __init__(self, meeting_id: str, host: User, enable_ai: bool = True):
+    def __init__(self, meeting_id: str, host: User, enable_ai: bool = True,
+                 chat_ring_size: int = DEFAULT_RING_SIZE, summary_pool: Optional[SummaryWorkerPool] = None,
+                 incremental_summary: bool = False, search_index: Optional[SearchIndex] = None):
         self.meeting_id = meeting_id
         self.host = host
-        self.participants: List[User] = [host]
-        self.chat_log: List[str] = []
+        # Every posted message is also added here when given (see NodwinsServer.search_messages).
+        self.search_index = search_index
+        # Participants are indexed by user_id; dicts keep insertion (join) order.
+        self._participants: Dict[str, User] = {host.user_id: host}
+        # One compact store backs both the chat log and the AI transcript.
+        self.chat_store = ChatLogStore(ring_size=chat_ring_size)
         self.is_active = True
-        self.ai_agent: Optional[AIAgent] = AIAgent(meeting_id) if enable_ai else None
-        print(f"INFO: Meeting '{self.meeting_id}' created by host '{host.username}'. AI Agent is {'ENABLED' if enable_ai else 'DISABLED'}.")
+        # Set by end_meeting; the LifecycleManager archives the meeting after a grace period.
+        self.ended_at: Optional[float] = None
+        self.ai_agent: Optional[AIAgent] = (
+            AIAgent(meeting_id, transcript=self.chat_store, incremental=incremental_summary) if enable_ai else None
+        )
+        # Without a pool, summaries are generated inline when the meeting ends.
+        self.summary_pool = summary_pool
+        self.summary_handle: Optional[Future] = None
+        # Guards participants, the chat log, the AI agent's state and is_active.
+        self._lock = threading.RLock()
+        logger.info("Meeting created by host '%s'. AI Agent is %s.", host.username,
+                    "ENABLED" if enable_ai else "DISABLED", extra={"meeting_id": meeting_id})
+
+    @property
+    def chat_log(self) -> List[str]:
+        """The chat log rendered as text lines (rendered on every read)."""
+        return list(self.chat_store.log_lines())
+
+    @property
+    def participants(self) -> List[User]:
+        """Participants in join order (a snapshot; mutate via add/remove)."""
+        with self._lock:
+            return list(self._participants.values())
+
+    def is_participant(self, user: User) -> bool:
+        """O(1) membership check by user_id."""
+        return user.user_id in self._participants
 
     def add_participant(self, user: User):
-        if user not in self.participants:
-            self.participants.append(user)
-            print(f"INFO: '{user.username}' has joined meeting '{self.meeting_id}'.")
+        with self._lock:
+            if user.user_id in self._participants:
+                return
+            self._participants[user.user_id] = user
+        user.touch()
+        logger.info("'%s' has joined the meeting", user.username, extra={"meeting_id": self.meeting_id})
 
     def remove_participant(self, user: User):
-        if user in self.participants:
-            self.participants.remove(user)
-            print(f"INFO: '{user.username}' has left meeting '{self.meeting_id}'.")
-
-    def post_chat_message(self, user: User, message: str):
-        if user not in self.participants:
-            raise UserNotAuthorizedError("User must be in the meeting to chat.")
-
-        if "<script>" in message:
-            print("SECURITY_ALERT: Potential XSS attempt detected and blocked.")
-            return
-
-        log_entry = f"[{time.ctime()}] {user.username}: {message}"
-        self.chat_log.append(log_entry)
-        # print(f"CHAT [{self.meeting_id}]: {log_entry}") # Less verbose in v2
-
-        # --- NEW: Integration with AI Agent ---
-        if self.ai_agent:
-            self.ai_agent.process_message(message, user.username)
-
-    def end_meeting(self, user: User):
+        with self._lock:
+            removed = self._participants.pop(user.user_id, None)
+        if removed is not None:
+            logger.info("'%s' has left the meeting", user.username, extra={"meeting_id": self.meeting_id})
+
+    def post_chat_message(self, user: User, message: str) -> Optional[int]:
+        """Adds a chat message. Returns its sequence number (None if blocked)."""
+        # One lock covers the membership check, the append and the AI update, so
+        # the transcript order always matches the chat log order.
+        with self._lock:
+            if not self.is_participant(user):
+                raise UserNotAuthorizedError("User must be in the meeting to chat.")
+            # The summary is taken from the state at the end; nothing may be added after it.
+            if not self.is_active:
+                raise MeetingNotFoundException(f"Meeting with ID '{self.meeting_id}' has ended.")
+
+            if "<script>" in message:
+                logger.warning("Potential XSS attempt detected and blocked from '%s'", user.username,
+                               extra={"meeting_id": self.meeting_id})
+                return
+
+            timestamp = int(time.time())
+            seq = self.chat_store.append(user.user_id, user.username, message, timestamp=timestamp)
+            user.touch()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s: %s", user.username, message, extra={"meeting_id": self.meeting_id, "seq": seq})
+
+            # --- NEW: Integration with AI Agent ---
+            if self.ai_agent:
+                self.ai_agent.process_message(message, user.username)
+        # Indexed outside the meeting lock, so search never slows down other posters.
+        if self.search_index is not None:
+            self.search_index.add(self.meeting_id, seq, timestamp, user.username, message)
+        return seq
+
+    def end_meeting(self, user: User) -> Optional[Future]:
+        """
+        Ends the meeting. Only the host can do this.
+
+        Returns a Future for the AI summary (None if the AI agent is disabled).
+        With a summary pool the Future is still pending when this returns; if
+        the pool is full it fails with AIServiceError. Ending an ended meeting
+        returns the existing Future.
+        """
         if user.user_id != self.host.user_id:
             raise UserNotAuthorizedError("Only the host can end the meeting.")
 
-        # --- NEW: Trigger final AI processing ---
-        if self.ai_agent:
-            print(f"AI_AGENT [{self.meeting_id}]: Finalizing analysis as meeting ends...")
-            self.ai_agent.generate_summary()
+        # Only the state flip and a snapshot of the agent happen under the meeting
+        # lock; summarizing (or waiting for a pool slot) must not stall joins and leaves.
+        with self._lock:
+            if not self.is_active:
+                return self.summary_handle
+            snapshot = None
+            if self.ai_agent:
+                # Pending until the summary is ready, so get_meeting_summary and
+                # the LifecycleManager see "in progress" rather than "no summary".
+                self.summary_handle = Future()
+                snapshot = self.ai_agent.snapshot()
+            self.is_active = False
+            self.ended_at = time.time()
+        logger.info("Meeting has been ended by the host", extra={"meeting_id": self.meeting_id})
+
+        handle = self.summary_handle
+        if snapshot is not None:
+            ai_logger.info("Finalizing analysis as meeting ends...", extra={"meeting_id": self.meeting_id})
+            if self.summary_pool is not None:
+                try:
+                    self.summary_pool.submit(snapshot).add_done_callback(self._summary_done)
+                except AIServiceError as e:
+                    ai_logger.warning("Summary not generated: %s", e, extra={"meeting_id": self.meeting_id})
+                    handle.set_exception(e)
+            else:
+                try:
+                    summary = snapshot.generate_summary()
+                except Exception as e:
+                    handle.set_exception(e)
+                    raise
+                self._publish_summary(summary)
+        return handle
+
+    def _summary_done(self, done: Future):
+        if done.exception() is not None:
+            self.summary_handle.set_exception(done.exception())
+        else:
+            self._publish_summary(done.result())
 
-        self.is_active = False
-        print(f"INFO: Meeting '{self.meeting_id}' has been ended by the host.")
-        return "Meeting ended successfully. AI summary is available."
+    def _publish_summary(self, summary: str):
+        """Copies a summary made from the agent snapshot back to the agent, then completes the handle."""
+        with self._lock:
+            self.ai_agent.summary = summary
+        self.summary_handle.set_result(summary)
 
     # --- NEW: Methods to access AI features ---
     def get_meeting_summary(self, user: User) -> str:
-        if user not in self.participants:
+        if not self.is_participant(user):
             raise UserNotAuthorizedError("Must be a participant to view summary.")
         if not self.ai_agent or self.is_active:
             raise AIServiceError("Summary is only available after the meeting has ended.")
+        if self.summary_handle is not None:
+            if not self.summary_handle.done():
+                return "Summary generation is in progress."
+            if self.summary_handle.exception() is not None:
+                raise AIServiceError(f"Summary generation failed: {self.summary_handle.exception()}")
         return self.ai_agent.summary or "Summary has not been generated yet."
 
+    def get_summary_so_far(self, user: User) -> str:
+        """Live rolling summary while the meeting is in progress (incremental AI mode)."""
+        if not self.is_participant(user):
+            raise UserNotAuthorizedError("Must be a participant to view summary.")
+        if not self.ai_agent:
+            raise AIServiceError("AI Agent was not enabled for this meeting.")
+        with self._lock:
+            return self.ai_agent.summary_so_far()
+
     def get_action_items(self, user: User) -> List[str]:
-        if user not in self.participants:
+        if not self.is_participant(user):
             raise UserNotAuthorizedError("Must be a participant to view action items.")
         if not self.ai_agent:
             return ["AI Agent was not enabled for this meeting."]
-        return list(self.ai_agent.action_items)
+        with self._lock:
+            return list(self.ai_agent.action_items)
 
 
 # --- Main Application Server (with minor changes for v2) ---
 class NodwinsServer:
     """Simulates the main server, now with ability to create AI-enabled meetings."""
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(NodwinsServer, cls).__new__(cls)
-            cls._instance._initialized = False
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(NodwinsServer, cls).__new__(cls)
+                cls._instance._initialized = False
         return cls._instance
 
     def __init__(self):
-        if self._initialized:
-            return
-        self.users: Dict[str, User] = {}
-        self.meetings: Dict[str, Meeting] = {}
-        self._user_credentials = {"admin": "password123", "user1": "pass", "qa_tester": "qa_pass"}
-        self._initialized = True
-        print("INFO: Nodwins Meets v2 Server Initialized.")
+        with self._instance_lock:
+            if self._initialized:
+                return
+            # Users and meetings are sharded maps with per-shard locks.
+            self.users: StripedMap[str, User] = StripedMap()
+            self.meetings: StripedMap[str, Meeting] = StripedMap()
+            # Archives ended meetings and expires idle sessions on a background thread.
+            self.lifecycle = LifecycleManager(self)
+            self.lifecycle.start()
+            # Full-text index over meeting chat; off until enable_search() is called.
+            self.search_index: Optional[SearchIndex] = None
+            # Turns away new meetings when CPU or memory is short.
+            self.admission = AdmissionController()
+            self._user_credentials = {"admin": "password123", "user1": "pass", "qa_tester": "qa_pass"}
+            # Shared by all meetings so summaries never run on the caller's thread.
+            # A full pool fails the summary after SUMMARY_SUBMIT_TIMEOUT instead of
+            # blocking end_meeting indefinitely.
+            self.summary_pool = SummaryWorkerPool(submit_timeout=SUMMARY_SUBMIT_TIMEOUT)
+            self._initialized = True
+        logger.info("Nodwins Meets v2 Server Initialized.")
+
+    def _reset_state(self):
+        """Drops all users and meetings (used by uninstall for clean testing)."""
+        self.lifecycle.stop()
+        self.users.clear()
+        self.meetings.clear()
+        self.lifecycle.archive.close()
+        self.lifecycle.archive = MeetingArchive()
+        if self.search_index is not None:
+            self.search_index.close()
+            self.search_index = None
 
     # All other methods from v1 (install, uninstall, login, logout, etc.) are assumed to be here
     # and unchanged unless specified. This is key for regression testing.
 
     def _check_system_resources(self, ai_enabled: bool = False):
-        """Placeholder for performance testing, now considers AI load."""
-        load_factor = 1.5 if ai_enabled else 1.0
-        print(f"DEBUG: Checking system resources (AI load factor: {load_factor}x)... OK.")
-        return True
+        """Admission control: True if CPU and memory allow another meeting (AI meetings weigh more)."""
+        decision = self.admission.admit(ai_enabled=ai_enabled)
+        logger.debug("Checking system resources (CPU cutoff: %.0f%%)... %s.",
+                     self.admission.cpu_cutoff(ai_enabled) * 100, decision.reason)
+        return decision.admitted
 
     def install(self):
-        print("SIMULATING: Running installation scripts for v2...")
+        logger.info("SIMULATING: Running installation scripts for v2...")
         time.sleep(1)
-        print("SUCCESS: Nodwins Meets v2 installed successfully.")
+        logger.info("Nodwins Meets v2 installed successfully.")
+        self.lifecycle.start()
         return True
 
     def uninstall(self):
-        print("SIMULATING: Removing all application files for v2...")
+        logger.info("SIMULATING: Removing all application files for v2...")
         time.sleep(1)
-        self.__init__()
-        print("SUCCESS: Nodwins Meets v2 uninstalled successfully.")
+        self._reset_state()
+        logger.info("Nodwins Meets v2 uninstalled successfully.")
         return True
 
     def login_user(self, username: str, password: str) -> User:
@@ -210,39 +590,116 @@ class NodwinsServer:
             raise AuthenticationError("Invalid username or password.")
 
     def logout_user(self, user_id: str):
-        if user_id in self.users:
-            user = self.users[user_id]
+        user = self.users.pop(user_id, None)
+        if user is not None:
             user.is_logged_in = False
-            del self.users[user_id]
-            print(f"INFO: User '{user.username}' has been logged out.")
+            logger.info("User '%s' has been logged out", user.username, extra={"user_id": user_id})
             return True
         return False
 
     # --- MODIFIED: create_meeting now accepts an AI flag ---
-    def create_meeting(self, host: User, enable_ai: bool = True) -> Meeting:
+    def create_meeting(self, host: User, enable_ai: bool = True, incremental_summary: bool = False) -> Meeting:
         """Creates a new meeting, with an option to enable/disable the AI Agent."""
         if not self._check_system_resources(ai_enabled=enable_ai):
-            raise Exception("System resources are too low to create a new meeting.")
-
-        meeting_id = f"meet-{uuid.uuid4().hex[:8]}"
-        meeting = Meeting(meeting_id, host, enable_ai=enable_ai)
-        self.meetings[meeting_id] = meeting
-        return meeting
+            raise ResourcesExhaustedError("System resources are too low to create a new meeting.")
+
+        while True:
+            meeting_id = f"meet-{uuid.uuid4().hex[:8]}"
+            # Ids of archived meetings stay reserved so lazy reloads never collide.
+            if self.lifecycle.is_meeting_id_taken(meeting_id):
+                continue
+            meeting = Meeting(meeting_id, host, enable_ai=enable_ai, summary_pool=self.summary_pool,
+                              incremental_summary=incremental_summary, search_index=self.search_index)
+            if self.meetings.put_if_absent(meeting_id, meeting):
+                host.touch()
+                return meeting
 
     def get_meeting(self, meeting_id: str) -> Optional[Meeting]:
-        if meeting_id not in self.meetings or not self.meetings[meeting_id].is_active:
+        meeting = self.meetings.get(meeting_id)
+        if meeting is None or not meeting.is_active:
             raise MeetingNotFoundException(f"Meeting with ID '{meeting_id}' not found or has ended.")
-        return self.meetings[meeting_id]
+        return meeting
 
-    def export_chat_log(self, meeting_id: str, user: User) -> str:
+    def get_archived_meeting(self, meeting_id: str, user: User) -> ArchivedMeeting:
+        """Loads the archived record of an ended meeting (lazily, from disk)."""
+        record = self.lifecycle.archive.load(meeting_id)
+        if record is None:
+            raise MeetingNotFoundException(f"No archived meeting with ID '{meeting_id}'.")
+        if user.user_id not in record.participant_ids:
+            raise UserNotAuthorizedError("Must be a participant to view an archived meeting.")
+        return record
+
+    def get_meeting_summary(self, meeting_id: str, user: User) -> str:
+        """The AI summary of an ended meeting, whether it is still in memory or archived."""
+        meeting = self.meetings.get(meeting_id)
+        if meeting is not None:
+            return meeting.get_meeting_summary(user)
+        record = self.get_archived_meeting(meeting_id, user)
+        if record.summary_error is not None:
+            raise AIServiceError(f"Summary generation failed: {record.summary_error}")
+        if record.summary is None:
+            raise AIServiceError("AI Agent was not enabled for this meeting.")
+        return record.summary
+
+    def get_action_items(self, meeting_id: str, user: User) -> List[str]:
+        """Action items of a meeting, whether it is still in memory or archived."""
+        meeting = self.meetings.get(meeting_id)
+        if meeting is not None:
+            return meeting.get_action_items(user)
+        return list(self.get_archived_meeting(meeting_id, user).action_items)
+
+    def _can_view(self, user: User, meeting_id: str) -> bool:
+        meeting = self.meetings.get(meeting_id)
+        if meeting is not None:
+            return meeting.is_participant(user)
+        record = self.lifecycle.archive.load(meeting_id)
+        return record is not None and user.user_id in record.participant_ids
+
+    def enable_search(self, index_dir: Optional[str] = None, **options) -> SearchIndex:
+        """
+        Turns on full-text search (see search_messages) and returns the index.
+
+        Only meetings created from now on are indexed. `index_dir` and the
+        other options are passed to SearchIndex. Archived meetings leave the
+        index after LifecycleManager.search_retention.
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex(index_dir, **options)
+        return self.search_index
+
+    def search_messages(self, user: User, query: str = "", meeting_id: Optional[str] = None,
+                        author: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None,
+                        k: int = 10, order: str = "relevance") -> List[SearchHit]:
+        """
+        Full-text search over the chat of every meeting `user` can see: live ones and those
+        archived within LifecycleManager.search_retention (a week by default).
+
+        `query` holds required words and "quoted phrases"; author, meeting_id and
+        since/until (unix seconds) narrow the results, and k caps them. order is
+        'relevance' (BM25) or 'recent'.
+        """
+        if self.search_index is None:
+            raise RuntimeError("Search is not enabled on this server; call enable_search() first.")
+        return self.search_index.search(query, author=author, meeting_id=meeting_id, since=since, until=until,
+                                        k=k, order=order, can_view=lambda mid: self._can_view(user, mid))
+
+    def export_chat_log(self, meeting_id: str, user: User, fmt: str = "text", compress: bool = False,
+                        output_dir: str = ".", since: Optional[int] = None, until: Optional[int] = None,
+                        after_cursor: Optional[int] = None) -> str:
+        """Streams a meeting's chat log to disk (text or jsonl, optionally gzipped) and returns the path."""
         meeting = self.meetings[meeting_id] # Assume meeting exists for simplicity
-        if user not in meeting.participants:
+        if not meeting.is_participant(user):
             raise UserNotAuthorizedError("You must be a participant to export the chat log.")
 
-        file_path = f"./{meeting_id}_chat_log_v2.txt"
-        report_content = "\n".join(meeting.chat_log)
-        with open(file_path, "w") as f:
-            f.write(f"--- Chat Log for Meeting {meeting_id} ---\n")
-            f.write(report_content)
-        print(f"INFO: Chat log exported to {file_path}")
-        return file_path
\ No newline at end of file
+        file_path = os.path.join(output_dir, export_file_name(meeting_id, fmt, compress, suffix="_v2"))
+        header = f"--- Chat Log for Meeting {meeting_id} ---\n" if fmt == "text" else None
+        records = select_records(meeting.chat_store, since=since, until=until, after_cursor=after_cursor)
+        write_records(records, file_path, fmt=fmt, compress=compress, header=header)
+        logger.info("Chat log exported to %s", file_path, extra={"meeting_id": meeting_id})
+        return file_path
+
+    def export_chat_logs(self, meeting_ids: List[str], user: User, max_workers: int = 4, **export_options) -> Dict[str, str]:
+        """Exports several meetings in parallel on a thread pool; returns {meeting_id: file_path}."""
+        return export_in_parallel(
+            lambda meeting_id: self.export_chat_log(meeting_id, user, **export_options),
+            meeting_ids, max_workers=max_workers)
\ No newline at end of file
@@ -2,10 +2,23 @@
 # A synthetic codebase for a basic Python-based conferencing tool.
 # This version focuses on core functionalities and is designed to be testable.
 
+import logging
+import os
+import threading
 import time
 import uuid
 from typing import Dict, List, Optional
 
+from admission import AdmissionController
+from chat_export import export_file_name, export_in_parallel, select_records, write_records
+from chat_store import DEFAULT_RING_SIZE, ChatLogStore
+from lifecycle import ArchivedMeeting, LifecycleManager, MeetingArchive
+from search_index import SearchHit, SearchIndex
+from server_state import StripedMap
+from structured_logging import get_logger
+
+logger = get_logger("v1")
+
 # --- Custom Exceptions for Error Handling Tests ---
 class AuthenticationError(Exception):
     """Custom exception for login failures."""
@@ -19,104 +32,178 @@ class UserNotAuthorizedError(Exception):
     """Custom exception for actions a user is not permitted to perform."""
     pass
 
+class ResourcesExhaustedError(Exception):
+    """Raised when admission control turns away a new meeting."""
+    pass
+
 # --- Data Models ---
 class User:
     """Represents a user in the system."""
+    __slots__ = ("username", "user_id", "is_logged_in", "last_active")
+
     def __init__(self, username: str, user_id: str):
         self.username = username
         self.user_id = user_id
         self.is_logged_in = True
-        print(f"INFO: User '{self.username}' created with ID: {self.user_id}")
+        self.last_active = time.time()
+        logger.info("User '%s' created", username, extra={"user_id": user_id})
+
+    def touch(self):
+        """Records activity; idle sessions are expired by the LifecycleManager."""
+        self.last_active = time.time()
 
     def __repr__(self):
         return f"User(username='{self.username}')"
 
 class Meeting:
     """Represents a single meeting session."""
-    def __init__(self, meeting_id: str, host: User):
+    def __init__(self, meeting_id: str, host: User, chat_ring_size: int = DEFAULT_RING_SIZE,
+                 search_index: Optional[SearchIndex] = None):
         self.meeting_id = meeting_id
         self.host = host
-        self.participants: List[User] = [host]
-        self.chat_log: List[str] = []
+        # Every posted message is also added here when given (see NodwinsServer.search_messages).
+        self.search_index = search_index
+        # Participants are indexed by user_id; dicts keep insertion (join) order.
+        self._participants: Dict[str, User] = {host.user_id: host}
+        # Compact records; older messages spill to disk past chat_ring_size.
+        self.chat_store = ChatLogStore(ring_size=chat_ring_size)
         self.is_active = True
-        print(f"INFO: Meeting '{self.meeting_id}' created by host '{host.username}'.")
+        # Set by end_meeting; the LifecycleManager archives the meeting after a grace period.
+        self.ended_at: Optional[float] = None
+        # Guards participants, the chat log and is_active against concurrent callers.
+        self._lock = threading.RLock()
+        logger.info("Meeting created by host '%s'", host.username, extra={"meeting_id": meeting_id})
+
+    @property
+    def chat_log(self) -> List[str]:
+        """The chat log rendered as text lines (rendered on every read)."""
+        return list(self.chat_store.log_lines())
+
+    @property
+    def participants(self) -> List[User]:
+        """Participants in join order (a snapshot; mutate via add/remove)."""
+        with self._lock:
+            return list(self._participants.values())
+
+    def is_participant(self, user: User) -> bool:
+        """O(1) membership check by user_id."""
+        return user.user_id in self._participants
 
     def add_participant(self, user: User):
         """Adds a user to the meeting."""
-        if user not in self.participants:
-            self.participants.append(user)
-            print(f"INFO: '{user.username}' has joined meeting '{self.meeting_id}'.")
+        with self._lock:
+            if user.user_id in self._participants:
+                return
+            self._participants[user.user_id] = user
+        user.touch()
+        logger.info("'%s' has joined the meeting", user.username, extra={"meeting_id": self.meeting_id})
 
     def remove_participant(self, user: User):
         """Removes a user from the meeting."""
-        if user in self.participants:
-            self.participants.remove(user)
-            print(f"INFO: '{user.username}' has left meeting '{self.meeting_id}'.")
+        with self._lock:
+            removed = self._participants.pop(user.user_id, None)
+        if removed is not None:
+            logger.info("'%s' has left the meeting", user.username, extra={"meeting_id": self.meeting_id})
 
-    def post_chat_message(self, user: User, message: str):
-        """Adds a chat message to the log."""
-        if user not in self.participants:
-            raise UserNotAuthorizedError("User must be in the meeting to chat.")
+    def post_chat_message(self, user: User, message: str) -> Optional[int]:
+        """Adds a chat message to the log. Returns its sequence number (None if blocked)."""
+        # The membership check and the append happen under one lock, so a
+        # message can never land after its author has left.
+        with self._lock:
+            if not self.is_participant(user):
+                raise UserNotAuthorizedError("User must be in the meeting to chat.")
 
-        # Input Validation for Security Test Cases
-        if "<script>" in message:
-            print("SECURITY_ALERT: Potential XSS attempt detected and blocked.")
-            return
+            # Input Validation for Security Test Cases
+            if "<script>" in message:
+                logger.warning("Potential XSS attempt detected and blocked from '%s'", user.username,
+                               extra={"meeting_id": self.meeting_id})
+                return
 
-        log_entry = f"[{time.ctime()}] {user.username}: {message}"
-        self.chat_log.append(log_entry)
-        print(f"CHAT [{self.meeting_id}]: {log_entry}")
+            timestamp = int(time.time())
+            seq = self.chat_store.append(user.user_id, user.username, message, timestamp=timestamp)
+            user.touch()
+        # Indexed outside the meeting lock, so search never slows down other posters.
+        if self.search_index is not None:
+            self.search_index.add(self.meeting_id, seq, timestamp, user.username, message)
+        # The hottest log line: skip building the record entirely unless DEBUG is on.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s: %s", user.username, message, extra={"meeting_id": self.meeting_id, "seq": seq})
+        return seq
 
     def end_meeting(self, user: User):
         """Ends the meeting. Only the host can do this."""
         if user.user_id != self.host.user_id:
             raise UserNotAuthorizedError("Only the host can end the meeting.")
-        self.is_active = False
-        print(f"INFO: Meeting '{self.meeting_id}' has been ended by the host.")
+        with self._lock:
+            self.is_active = False
+            self.ended_at = time.time()
+        logger.info("Meeting has been ended by the host", extra={"meeting_id": self.meeting_id})
         return "Meeting ended successfully."
 
 # --- Main Application Server (Singleton Simulation) ---
 class NodwinsServer:
     """Simulates the main server handling users and meetings."""
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(NodwinsServer, cls).__new__(cls)
-            cls._instance._initialized = False
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(NodwinsServer, cls).__new__(cls)
+                cls._instance._initialized = False
         return cls._instance
 
     def __init__(self):
-        if self._initialized:
-            return
-        self.users: Dict[str, User] = {}
-        self.meetings: Dict[str, Meeting] = {}
-        # Dummy database for authentication tests
-        self._user_credentials = {"admin": "password123", "user1": "pass"}
-        self._initialized = True
-        print("INFO: Nodwins Meets v1 Server Initialized.")
+        with self._instance_lock:
+            if self._initialized:
+                return
+            # Users and meetings are sharded maps with per-shard locks.
+            self.users: StripedMap[str, User] = StripedMap()
+            self.meetings: StripedMap[str, Meeting] = StripedMap()
+            # Archives ended meetings and expires idle sessions on a background thread.
+            self.lifecycle = LifecycleManager(self)
+            self.lifecycle.start()
+            # Full-text index over meeting chat; off until enable_search() is called.
+            self.search_index: Optional[SearchIndex] = None
+            # Turns away new meetings when CPU or memory is short.
+            self.admission = AdmissionController()
+            # Dummy database for authentication tests
+            self._user_credentials = {"admin": "password123", "user1": "pass"}
+            self._initialized = True
+        logger.info("Nodwins Meets v1 Server Initialized.")
+
+    def _reset_state(self):
+        """Drops all users and meetings (used by uninstall for clean testing)."""
+        self.lifecycle.stop()
+        self.users.clear()
+        self.meetings.clear()
+        self.lifecycle.archive.close()
+        self.lifecycle.archive = MeetingArchive()
+        if self.search_index is not None:
+            self.search_index.close()
+            self.search_index = None
 
     def _check_system_resources(self):
-        """Placeholder for performance testing hooks."""
-        # In a real app, this would check CPU/memory.
-        # For testing, we can simulate high load.
-        print("DEBUG: Checking system resources... OK.")
-        return True
+        """Admission control: True if CPU and memory allow another meeting."""
+        decision = self.admission.admit()
+        logger.debug("Checking system resources... %s.", decision.reason)
+        return decision.admitted
 
     def install(self):
         """Simulates installation process for testing."""
-        print("SIMULATING: Running installation scripts...")
+        logger.info("SIMULATING: Running installation scripts...")
         time.sleep(1)
-        print("SUCCESS: Nodwins Meets v1 installed successfully.")
+        logger.info("Nodwins Meets v1 installed successfully.")
+        self.lifecycle.start()
         return True
 
     def uninstall(self):
         """Simulates uninstallation process for testing."""
-        print("SIMULATING: Removing all application files and registry entries...")
+        logger.info("SIMULATING: Removing all application files and registry entries...")
         time.sleep(1)
         # Resetting state for clean testing
-        self.__init__()
-        print("SUCCESS: Nodwins Meets v1 uninstalled successfully.")
+        self._reset_state()
+        logger.info("Nodwins Meets v1 uninstalled successfully.")
         return True
 
     def login_user(self, username: str, password: str) -> User:
@@ -131,40 +218,102 @@ class NodwinsServer:
 
     def logout_user(self, user_id: str):
         """Logs a user out of the system."""
-        if user_id in self.users:
-            user = self.users[user_id]
+        user = self.users.pop(user_id, None)
+        if user is not None:
             user.is_logged_in = False
-            del self.users[user_id]
-            print(f"INFO: User '{user.username}' has been logged out.")
+            logger.info("User '%s' has been logged out", user.username, extra={"user_id": user_id})
             return True
         return False
 
     def create_meeting(self, host: User) -> Meeting:
         """Creates a new meeting session."""
         if not self._check_system_resources():
-            raise Exception("System resources are too low to create a new meeting.")
+            raise ResourcesExhaustedError("System resources are too low to create a new meeting.")
 
-        meeting_id = f"meet-{uuid.uuid4().hex[:8]}"
-        meeting = Meeting(meeting_id, host)
-        self.meetings[meeting_id] = meeting
-        return meeting
+        while True:
+            meeting_id = f"meet-{uuid.uuid4().hex[:8]}"
+            # Ids of archived meetings stay reserved so lazy reloads never collide.
+            if self.lifecycle.is_meeting_id_taken(meeting_id):
+                continue
+            meeting = Meeting(meeting_id, host, search_index=self.search_index)
+            if self.meetings.put_if_absent(meeting_id, meeting):
+                host.touch()
+                return meeting
 
     def get_meeting(self, meeting_id: str) -> Optional[Meeting]:
         """Retrieves an active meeting."""
-        if meeting_id not in self.meetings or not self.meetings[meeting_id].is_active:
+        meeting = self.meetings.get(meeting_id)
+        if meeting is None or not meeting.is_active:
             raise MeetingNotFoundException(f"Meeting with ID '{meeting_id}' not found or has ended.")
-        return self.meetings[meeting_id]
+        return meeting
+
+    def get_archived_meeting(self, meeting_id: str, user: User) -> ArchivedMeeting:
+        """Loads the archived record of an ended meeting (lazily, from disk)."""
+        record = self.lifecycle.archive.load(meeting_id)
+        if record is None:
+            raise MeetingNotFoundException(f"No archived meeting with ID '{meeting_id}'.")
+        if user.user_id not in record.participant_ids:
+            raise UserNotAuthorizedError("Must be a participant to view an archived meeting.")
+        return record
+
+    def _can_view(self, user: User, meeting_id: str) -> bool:
+        meeting = self.meetings.get(meeting_id)
+        if meeting is not None:
+            return meeting.is_participant(user)
+        record = self.lifecycle.archive.load(meeting_id)
+        return record is not None and user.user_id in record.participant_ids
+
+    def enable_search(self, index_dir: Optional[str] = None, **options) -> SearchIndex:
+        """
+        Turns on full-text search (see search_messages) and returns the index.
 
-    def export_chat_log(self, meeting_id: str, user: User) -> str:
-        """Exports the chat log for a meeting."""
+        Only meetings created from now on are indexed. `index_dir` and the
+        other options are passed to SearchIndex. Archived meetings leave the
+        index after LifecycleManager.search_retention.
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex(index_dir, **options)
+        return self.search_index
+
+    def search_messages(self, user: User, query: str = "", meeting_id: Optional[str] = None,
+                        author: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None,
+                        k: int = 10, order: str = "relevance") -> List[SearchHit]:
+        """
+        Full-text search over the chat of every meeting `user` can see: live ones and those
+        archived within LifecycleManager.search_retention (a week by default).
+
+        `query` holds required words and "quoted phrases"; author, meeting_id and
+        since/until (unix seconds) narrow the results, and k caps them. order is
+        'relevance' (BM25) or 'recent'.
+        """
+        if self.search_index is None:
+            raise RuntimeError("Search is not enabled on this server; call enable_search() first.")
+        return self.search_index.search(query, author=author, meeting_id=meeting_id, since=since, until=until,
+                                        k=k, order=order, can_view=lambda mid: self._can_view(user, mid))
+
+    def export_chat_log(self, meeting_id: str, user: User, fmt: str = "text", compress: bool = False,
+                        output_dir: str = ".", since: Optional[int] = None, until: Optional[int] = None,
+                        after_cursor: Optional[int] = None) -> str:
+        """
+        Streams the chat log for a meeting to a file and returns its path.
+
+        fmt is 'text' or 'jsonl'; compress gzips the output. since/until (unix
+        seconds) select a time range. after_cursor is a previously read
+        ChatLogStore.cursor; only messages appended since then are exported.
+        """
         meeting = self.get_meeting(meeting_id)
-        if user not in meeting.participants:
+        if not meeting.is_participant(user):
             raise UserNotAuthorizedError("You must be a participant to export the chat log.")
 
-        file_path = f"./{meeting_id}_chat_log.txt"
-        report_content = "\n".join(meeting.chat_log)
-        with open(file_path, "w") as f:
-            f.write(f"--- Chat Log for Meeting {meeting_id} ---\n")
-            f.write(report_content)
-        print(f"INFO: Chat log exported to {file_path}")
-        return file_path
\ No newline at end of file
+        file_path = os.path.join(output_dir, export_file_name(meeting_id, fmt, compress))
+        header = f"--- Chat Log for Meeting {meeting_id} ---\n" if fmt == "text" else None
+        records = select_records(meeting.chat_store, since=since, until=until, after_cursor=after_cursor)
+        write_records(records, file_path, fmt=fmt, compress=compress, header=header)
+        logger.info("Chat log exported to %s", file_path, extra={"meeting_id": meeting_id})
+        return file_path
+
+    def export_chat_logs(self, meeting_ids: List[str], user: User, max_workers: int = 4, **export_options) -> Dict[str, str]:
+        """Exports several meetings in parallel on a thread pool; returns {meeting_id: file_path}."""
+        return export_in_parallel(
+            lambda meeting_id: self.export_chat_log(meeting_id, user, **export_options),
+            meeting_ids, max_workers=max_workers)
\ No newline at end of file
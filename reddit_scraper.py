@@ -1,15 +1,25 @@
+import logging
 import os
+import sys
+import threading
+import time
 import praw
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pandas as pd
 import openai
 import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
 from openai import AzureOpenAI
 from tqdm import tqdm
 tqdm.pandas()
 
+logger = logging.getLogger(__name__)
+
 
 # --- HARDCODED CREDENTIALS (for demo only; do not share these) ---
 CLIENT_ID = 'CLIENT_ID' 
@@ -37,19 +47,50 @@ client_cc = AzureOpenAI(
 if not all([CLIENT_ID, CLIENT_SECRET, USERNAME, PASSWORD]):
     raise Exception("Please set CLIENT_ID in the script (see comment above). Do not share your credentials.")
 
-def scrape_and_sort(subreddit_name, limit=5):
-    reddit = praw.Reddit(
+def make_reddit_client():
+    """Builds one authenticated praw.Reddit client (reuse it across scrapes on the same thread)."""
+    return praw.Reddit(
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
         username=USERNAME,
         password=PASSWORD,
         user_agent=USER_AGENT
     )
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by concurrent subreddit scrapes, so they
+    stay inside one Reddit API budget even though each uses its own client.
+    """
+    def __init__(self, requests_per_minute=90, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1, requests_per_minute // 6)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def scrape_and_sort(subreddit_name, limit=5, reddit=None, days=7, rate_limiter=None):
+    if reddit is None:
+        reddit = make_reddit_client()
+    throttle = rate_limiter.acquire if rate_limiter is not None else (lambda: None)
     subreddit = reddit.subreddit(subreddit_name)
-    posts = list(subreddit.new(limit=limit*3))  # Fetch more to ensure enough from last week
-    # Filter posts from the last 7 days
-    one_week_ago = datetime.utcnow().timestamp() - 7*24*60*60
-    recent_posts = [post for post in posts if post.created_utc >= one_week_ago]
+    throttle()
+    posts = list(subreddit.new(limit=limit*3))  # Fetch more to ensure enough from the time window
+    # Filter posts from the last `days` days
+    cutoff = datetime.utcnow().timestamp() - days*24*60*60
+    recent_posts = [post for post in posts if post.created_utc >= cutoff]
     # Sort by created_utc (descending)
     recent_posts.sort(key=lambda post: post.created_utc, reverse=True)
 
@@ -60,6 +101,7 @@ def scrape_and_sort(subreddit_name, limit=5):
         selftext = post.selftext
         upvotes = post.score
         # Fetch top-level comments (limit to 10 for demo)
+        throttle()
         post.comments.replace_more(limit=0)
         comments = [comment.body for comment in post.comments.list()[:10]]
         created = datetime.utcfromtimestamp(post.created_utc).strftime('%Y-%m-%d %H:%M:%S')
@@ -75,6 +117,56 @@ def scrape_and_sort(subreddit_name, limit=5):
     df = pd.DataFrame(data)
     return df
 
+def scrape_subreddits(subreddits, limit=5, days=7, max_workers=4, client_factory=make_reddit_client,
+                      requests_per_minute=90):
+    """
+    Scrape several subreddits concurrently under one shared rate-limit budget.
+
+    PRAW clients are not thread safe, so every worker thread builds its own
+    client (once, on first use) with `client_factory`.
+
+    Parameters:
+        subreddits (list): Subreddit names, or dicts like {'name': 'Windows11', 'limit': 20, 'days': 3}
+            to override the default limit/time window per subreddit.
+        limit (int): Default number of posts per subreddit.
+        days (int): Default time window in days.
+        max_workers (int): Number of subreddits scraped at the same time.
+        client_factory (callable): Returns a new praw.Reddit client; called once per worker thread.
+        requests_per_minute (int): Shared API budget across all workers.
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): Combined posts with a 'subreddit' column (cross-posts
+        de-duplicated by id), and per-subreddit stats (posts, seconds, posts_per_sec).
+    """
+    specs = [{'name': s} if isinstance(s, str) else dict(s) for s in subreddits]
+    limiter = RateLimiter(requests_per_minute)
+    local = threading.local()
+
+    def scrape_one(spec):
+        if not hasattr(local, 'reddit'):
+            local.reddit = client_factory()
+        start = time.perf_counter()
+        df = scrape_and_sort(spec['name'], limit=spec.get('limit', limit), reddit=local.reddit,
+                             days=spec.get('days', days), rate_limiter=limiter)
+        df.insert(0, 'subreddit', spec['name'])
+        return df, time.perf_counter() - start
+
+    frames, stats = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for spec, (df, elapsed) in zip(specs, pool.map(scrape_one, specs)):
+            frames.append(df)
+            stats.append({
+                'subreddit': spec['name'],
+                'posts': len(df),
+                'seconds': round(elapsed, 3),
+                'posts_per_sec': round(len(df) / elapsed, 3) if elapsed > 0 else float('nan')
+            })
+
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if 'id' in combined.columns:
+        combined = combined.drop_duplicates(subset='id', keep='first').reset_index(drop=True)
+    return combined, pd.DataFrame(stats)
+
 def generate_topic_clusters(df, 
                             text_cols=['title', 'selftext'], 
                             embed_engine='text-embedding-ada-002', 
@@ -112,11 +204,11 @@ def generate_topic_clusters(df,
         return client.embeddings.create(input = [text], model="text-embedding-ada-002").data[0].embedding
 
     # Generate embeddings
-    print("Generating embeddings...")
+    logger.info("Generating embeddings for %d rows...", len(df))
     df['embedding'] = df['combined'].progress_map(get_embedding)
 
     # Cluster embeddings using KMeans
-    print("Clustering embeddings...")
+    logger.info("Clustering embeddings into %d topics...", cluster_k)
     embedding_matrix = np.vstack(df['embedding'].values)
     kmeans = KMeans(n_clusters=cluster_k, random_state=42)
     df['topic_cluster'] = kmeans.fit_predict(embedding_matrix)
@@ -146,7 +238,7 @@ def extract_feedback(text):
         model="gpt-4o",
         messages=chat_prompt,
     )
-    print(completion.choices[0].message.content)
+    logger.debug("gpt-4o feedback completion: %s", completion.choices[0].message.content)
     return completion.choices[0].message.content
 
 
@@ -210,6 +302,13 @@ import json
 import re
 import ast
 
+def _log_parse_error(label, s, error):
+    """DEBUG dump of a failed json.loads: the error, the text around it and its code points."""
+    logger.debug("%s: %s", label, error)
+    if hasattr(error, 'pos'):
+        logger.debug("Error at position %d, surrounding text: %r", error.pos, s[max(0, error.pos-20):error.pos+20])
+    logger.debug("Unicode code points: %s", [ord(c) for c in s])
+
 def parse_feedback_dict(feedback_str):
     # Return empty if not a string
     if not isinstance(feedback_str, str):
@@ -241,34 +340,30 @@ def parse_feedback_dict(feedback_str):
     # Remove trailing commas before closing brace
     s = re.sub(r',\s*}', '}', s)
     # Try to load as JSON
-    print("[DEBUG] Attempting to parse:", repr(s))
+    # The dumps below run per row; only build them when DEBUG is enabled.
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("Attempting to parse: %r", s)
     try:
         data = json.loads(s)
     except Exception as e:
-        print("[DEBUG] Exception:", e)
-        if hasattr(e, 'pos'):
-            print("[DEBUG] Error at position:", e.pos)
-            print("[DEBUG] Surrounding text:", repr(s[max(0, e.pos-20):e.pos+20]))
-        print("[DEBUG] Unicode code points:", [ord(c) for c in s])
+        if debug:
+            _log_parse_error("Exception", s, e)
         # Try to fix single quotes to double quotes
         s_fixed = s.replace("'", '"')
         try:
             data = json.loads(s_fixed)
         except Exception as e2:
-            print("[DEBUG] Exception after fixing quotes:", e2)
-            if hasattr(e2, 'pos'):
-                print("[DEBUG] Error at position:", e2.pos)
-                print("[DEBUG] Surrounding text:", repr(s_fixed[max(0, e2.pos-20):e2.pos+20]))
-            print("[DEBUG] Unicode code points (fixed):", [ord(c) for c in s_fixed])
+            if debug:
+                _log_parse_error("Exception after fixing quotes", s_fixed, e2)
             # Try ast.literal_eval as a last resort
             try:
                 data = ast.literal_eval(s)
             except Exception as e3:
-                print("[DEBUG] Failed to parse feedback string:")
-                print(feedback_str)
-                print("[DEBUG] Cleaned string before json.loads:")
-                print(s)
-                print(f"[DEBUG] Exception: {e3}")
+                logger.warning("Failed to parse feedback string (%s); saved to bad_feedback.txt", e3)
+                if debug:
+                    logger.debug("Raw feedback string: %s", feedback_str)
+                    logger.debug("Cleaned string before json.loads: %s", s)
                 # Optionally, save the string to a file for later inspection
                 with open("bad_feedback.txt", "a", encoding="utf-8") as f:
                     f.write(feedback_str + "\n---\n")
@@ -301,12 +396,205 @@ def parse_feedback_dict(feedback_str):
         'resolution_text': data.get('resolve_text', '')
     })
 
+# --- Local triage: answer confident, low-stakes posts without calling gpt-4o ---
+TRIAGE_LABELS = ['post_type', 'sentiment', 'severity']
+# LLM-labelled posts accumulated across runs; the triage is trained on this, not on reddit_posts.csv,
+# which every run overwrites.
+TRIAGE_LABEL_STORE = 'triage_labels.csv'
+
+class FeedbackTriage:
+    """
+    CPU-only pre-classifier trained on previously LLM-labelled posts.
+
+    A TF-IDF vectorizer feeds one logistic-regression model per label column
+    (post_type, sentiment, severity). Posts where every model is at least
+    `confidence` sure, and whose predicted severity is not in `escalate_severity`,
+    are labelled locally; everything else still goes to extract_feedback.
+    """
+    def __init__(self, confidence=0.8, escalate_severity=('high',), C=1.0):
+        self.confidence = confidence
+        self.C = C
+        self.escalate_severity = set(escalate_severity)
+        self.vectorizer = None
+        self.models = {}
+
+    @classmethod
+    def from_csv(cls, csv_path='reddit_posts.csv', text_col='combined', **kwargs):
+        return cls(**kwargs).fit(pd.read_csv(csv_path), text_col=text_col)
+
+    def fit(self, df, text_col='combined'):
+        # Never learn from labels this triage produced itself
+        if 'feedback_source' in df.columns:
+            df = df[df['feedback_source'] != 'local']
+        texts = df[text_col].fillna('').astype(str)
+        # Unigrams seen in at least two posts: on a few hundred posts, rarer features only memorise them
+        self.vectorizer = TfidfVectorizer(sublinear_tf=True, min_df=2, max_features=20000)
+        X = self.vectorizer.fit_transform(texts)
+        self.models = {}
+        for label in TRIAGE_LABELS:
+            y = df[label].fillna('').astype(str).str.strip().str.lower()
+            known = (y != '').to_numpy()
+            classes = y[known].unique()
+            if len(classes) == 0:
+                continue
+            if len(classes) == 1:
+                # A single observed class: predict it, but never confidently enough to skip the LLM
+                self.models[label] = classes[0]
+                continue
+            self.models[label] = LogisticRegression(max_iter=1000, C=self.C).fit(X[known], y[known])
+        return self
+
+    def predict(self, texts):
+        """Returns a DataFrame with a predicted label and confidence per label column, plus 'local'."""
+        if self.vectorizer is None:
+            raise ValueError("FeedbackTriage must be fitted before predicting.")
+        texts = pd.Series(texts).fillna('').astype(str)
+        X = self.vectorizer.transform(texts)
+        out = pd.DataFrame(index=texts.index)
+        confident = np.ones(len(texts), dtype=bool)
+        for label in TRIAGE_LABELS:
+            model = self.models.get(label)
+            if model is None or isinstance(model, str):
+                out[label] = model or ''
+                out[f'{label}_confidence'] = 0.0
+                confident[:] = False
+                continue
+            proba = model.predict_proba(X)
+            best = proba.argmax(axis=1)
+            out[label] = model.classes_[best]
+            out[f'{label}_confidence'] = proba[np.arange(len(best)), best]
+            confident &= out[f'{label}_confidence'].to_numpy() >= self.confidence
+        confident &= ~out['severity'].isin(self.escalate_severity).to_numpy()
+        out['local'] = confident
+        return out
+
+def _local_feedback(text, labels):
+    """Formats local labels like an extract_feedback response so parse_feedback_dict can read it."""
+    title = text.split('\n------\n')[0]
+    if title.startswith('title: '):
+        title = title[len('title: '):]
+    return json.dumps({
+        'content': title,
+        'type': labels['post_type'],
+        'build': '',
+        'version': '',
+        'sentiment': labels['sentiment'],
+        'severity': labels['severity'],
+        'resolved': '',
+        'resolve_text': ''
+    })
+
+def triage_and_extract(texts, triage=None):
+    """
+    Labels confident posts locally and sends the rest to extract_feedback.
+
+    Returns:
+        (pd.Series, pd.Series, dict): feedback strings, their source ('local' or 'llm'),
+        and stats with the number of LLM calls made and skipped.
+    """
+    texts = pd.Series(texts)
+    feedback = pd.Series('', index=texts.index, dtype=object)
+    source = pd.Series('llm', index=texts.index, dtype=object)
+    if triage is not None and len(texts):
+        predictions = triage.predict(texts)
+        local = predictions['local']
+        for idx in predictions.index[local]:
+            feedback[idx] = _local_feedback(texts[idx], predictions.loc[idx])
+        source[local] = 'local'
+    to_llm = source == 'llm'
+    feedback[to_llm] = texts[to_llm].map(extract_feedback)
+    stats = {'total': len(texts), 'llm_calls': int(to_llm.sum()), 'skipped': int((~to_llm).sum())}
+    return feedback, source, stats
+
+def evaluate_triage(labeled_df, text_col='combined', test_size=0.25, random_state=42, repeats=1, **triage_kwargs):
+    """
+    Fits a FeedbackTriage on part of an LLM-labelled DataFrame and scores it on the held-out rest.
+
+    With repeats > 1 the split is redrawn with seeds random_state, random_state + 1, ...
+    and the held-out predictions are pooled, which keeps the estimate from hinging
+    on one lucky (or unlucky) split of a small label set.
+
+    Returns a dict with the share of held-out posts that would skip the LLM and,
+    for those posts, how often each local label agreed with the LLM label.
+    """
+    if 'feedback_source' in labeled_df.columns:
+        labeled_df = labeled_df[labeled_df['feedback_source'] != 'local']
+    held_out, local_count = 0, 0
+    agreed = {label: 0 for label in TRIAGE_LABELS}
+    for seed in range(random_state, random_state + repeats):
+        train, test = train_test_split(labeled_df, test_size=test_size, random_state=seed)
+        triage = FeedbackTriage(**triage_kwargs).fit(train, text_col=text_col)
+        predictions = triage.predict(test[text_col])
+        local = predictions['local']
+        held_out += len(test)
+        local_count += int(local.sum())
+        for label in TRIAGE_LABELS:
+            truth = test[label].fillna('').astype(str).str.strip().str.lower()
+            agreed[label] += int((predictions.loc[local, label] == truth[local]).sum())
+    report = {'held_out': held_out, 'skipped': local_count,
+              'skip_rate': local_count / held_out if held_out else 0.0}
+    for label in TRIAGE_LABELS:
+        report[f'{label}_agreement'] = agreed[label] / local_count if local_count else float('nan')
+    return report
+
+def train_triage(labeled_df, text_col='combined', min_agreement=0.9, min_skipped=20, repeats=5, **triage_kwargs):
+    """
+    Trains a FeedbackTriage only if held-out evaluation shows it can be trusted.
+
+    Parameters:
+        labeled_df (pd.DataFrame): LLM-labelled posts (see update_label_store).
+        min_agreement (float): Every label must agree with the LLM at least this often
+            on the held-out posts the triage would have labelled locally.
+        min_skipped (int): Minimum number of such held-out posts (over all repeats) for
+            the agreement figures to count as evidence.
+        repeats (int): Number of random train/test splits pooled by evaluate_triage.
+
+    Returns:
+        (FeedbackTriage or None, dict): The triage fitted on all rows, or None when it
+        did not meet the bar (every post then goes to the LLM), and the evaluation report
+        with an added 'accepted' flag.
+    """
+    report = {'held_out': 0, 'skipped': 0, 'skip_rate': 0.0, 'accepted': False}
+    if len(labeled_df) >= 8:
+        report = evaluate_triage(labeled_df, text_col=text_col, repeats=repeats, **triage_kwargs)
+        report['accepted'] = report['skipped'] >= min_skipped and all(
+            report[f'{label}_agreement'] >= min_agreement for label in TRIAGE_LABELS)
+    if not report['accepted']:
+        return None, report
+    return FeedbackTriage(**triage_kwargs).fit(labeled_df, text_col=text_col), report
+
+def update_label_store(df, store_path=TRIAGE_LABEL_STORE, text_col='combined'):
+    """
+    Appends the LLM-labelled rows of `df` to the persistent triage label store.
+
+    Rows labelled locally or missing any label are ignored; a post seen again
+    replaces its earlier labels. Returns the updated store.
+    """
+    columns = ['id', text_col] + TRIAGE_LABELS
+    new = df
+    if 'feedback_source' in new.columns:
+        new = new[new['feedback_source'] != 'local']
+    new = new[[c for c in columns if c in new.columns]]
+    labels = new[TRIAGE_LABELS].fillna('').astype(str).apply(lambda col: col.str.strip().str.lower())
+    new = new.assign(**labels)[(labels != '').all(axis=1)]
+    store = pd.read_csv(store_path) if os.path.exists(store_path) else pd.DataFrame(columns=columns)
+    store = pd.concat([store, new], ignore_index=True)
+    if 'id' in store.columns:
+        store = store.drop_duplicates(subset='id', keep='last')
+    store.to_csv(store_path, index=False)
+    return store
+
 if __name__ == "__main__":
+    # LOG_LEVEL=DEBUG shows every gpt-4o completion and feedback parse attempt
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'),
+                        format='%(asctime)s %(levelname)s %(name)s %(message)s')
     pd.set_option('display.max_rows', None)
     pd.set_option('display.max_columns', None)
     pd.set_option('display.max_colwidth', None)
-    # Hardcoded subreddit as requested
-    df = scrape_and_sort(subreddit_name = 'Windows11', limit=70)
+    # Subreddits can be passed on the command line; defaults to r/Windows11
+    subreddits = sys.argv[1:] or ['Windows11']
+    df, scrape_stats = scrape_subreddits(subreddits, limit=70)
+    print(scrape_stats.to_string(index=False))
     # Save partial results before feedback parsing
     df.to_csv('reddit_posts_partial.csv', index=False)
     # Create 'combined' column in the requested format
@@ -324,9 +612,24 @@ if __name__ == "__main__":
         return f"title: {title}\n------\npost: {selftext}\n------\ncomments: {comments_str}"
 
     df['combined'] = df.apply(make_combined, axis=1)
-    df['feedback'] = df['combined'].map(extract_feedback)
+    # Train the local triage on every LLM label collected so far. The first run seeds the
+    # store from an existing reddit_posts.csv.
+    if not os.path.exists(TRIAGE_LABEL_STORE) and os.path.exists('reddit_posts.csv'):
+        update_label_store(pd.read_csv('reddit_posts.csv'))
+    triage = None
+    if os.path.exists(TRIAGE_LABEL_STORE):
+        triage, triage_report = train_triage(pd.read_csv(TRIAGE_LABEL_STORE))
+        print(f"Triage evaluation: {triage_report}")
+        if triage is None:
+            print("Triage not accurate enough yet; sending every post to gpt-4o.")
+    df['feedback'], feedback_source, triage_stats = triage_and_extract(df['combined'], triage)
+    print(f"Triage: {triage_stats['skipped']} of {triage_stats['total']} gpt-4o calls skipped.")
 
     # --- Parse feedback string into separate columns ---
     feedback_df = df['feedback'].apply(parse_feedback_dict)
     df = pd.concat([df, feedback_df], axis=1)
-    df.to_csv('reddit_posts.csv', index=False)
\ No newline at end of file
+    # Appended last so the CSV column ordinals used by toRTI.py stay stable
+    df['subreddit'] = df.pop('subreddit')
+    df['feedback_source'] = feedback_source
+    df.to_csv('reddit_posts.csv', index=False)
+    update_label_store(df)
\ No newline at end of file
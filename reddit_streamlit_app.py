@@ -1,23 +1,29 @@
 import streamlit as st
 import pandas as pd
-from reddit_scraper import scrape_and_sort, generate_topic_clusters, extract_feedback, visualize_feedback_graph
+from reddit_scraper import scrape_subreddits, generate_topic_clusters, extract_feedback, visualize_feedback_graph
+from feedback_query import FeedbackTable
 import matplotlib.pyplot as plt
 import networkx as nx
 import io
+import os
 
 st.set_page_config(page_title="Reddit Feedback Analyzer", layout="wide")
 st.title("Reddit Feedback Analyzer")
 
 with st.form("input_form"):
-    subreddit = st.text_input("Subreddit Name", value="Windows11")
-    limit = st.number_input("Number of Posts", min_value=1, max_value=50, value=5)
+    subreddits = st.text_input("Subreddit Names (comma-separated)", value="Windows11")
+    limit = st.number_input("Number of Posts per Subreddit", min_value=1, max_value=50, value=5)
+    days = st.number_input("Time Window (days)", min_value=1, max_value=30, value=7)
     submitted = st.form_submit_button("Process")
 
 if submitted:
     with st.spinner("Scraping and analyzing posts..."):
-        df = scrape_and_sort(subreddit_name=subreddit, limit=int(limit))
+        names = [name.strip() for name in subreddits.split(",") if name.strip()]
+        df, scrape_stats = scrape_subreddits(names, limit=int(limit), days=int(days))
         df = generate_topic_clusters(df)
         df['feedback'] = df['combined'].map(extract_feedback)
+    st.subheader("Scrape Throughput")
+    st.dataframe(scrape_stats)
     st.subheader("Extracted Feedbacks")
     for idx, fb in enumerate(df['feedback']):
         st.markdown(f"**Post {idx+1}:** {fb}")
@@ -35,3 +41,51 @@ if submitted:
     st.pyplot(fig)
     st.subheader("Raw DataFrame")
     st.dataframe(df)
+
+
+@st.cache_resource
+def load_feedback_table(csv_path, mtime):
+    # mtime is part of the cache key so a re-run of the pipeline reloads the table.
+    return FeedbackTable.from_csv(csv_path)
+
+
+st.header("Explore Extracted Feedback")
+csv_path = st.text_input("Feedback CSV", value="reddit_posts.csv")
+if not os.path.exists(csv_path):
+    st.info(f"{csv_path} not found - run reddit_scraper.py to extract feedback first.")
+else:
+    table = load_feedback_table(csv_path, os.path.getmtime(csv_path))
+    filter_columns = [column for column in ['post_type', 'severity', 'sentiment', 'version', 'release', 'build',
+                                            'topic_cluster'] if column in table.columns]
+    filters = {}
+    filter_cells = st.columns(len(filter_columns))
+    for cell, column in zip(filter_cells, filter_columns):
+        chosen = cell.multiselect(column, table.labels(column))
+        if chosen:
+            filters[column] = chosen
+    resolved = st.radio("Resolved", ["Any", "Unresolved", "Resolved"], horizontal=True)
+    if resolved != "Any":
+        filters['resolved'] = resolved == "Resolved"
+    keywords = st.text_input("Keywords in post content / resolution")
+    dates = table.created[~pd.isna(table.created)]
+    if len(dates):
+        first, last = pd.Timestamp(dates.min()).date(), pd.Timestamp(dates.max()).date()
+        date_range = st.date_input("Posted between", value=(first, last), min_value=first, max_value=last)
+        if len(date_range) == 2:
+            filters['since'] = pd.Timestamp(date_range[0])
+            filters['until'] = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+    group_by = st.multiselect("Group by", sorted(table.columns), default=['build'])
+
+    mask = table.where(keywords=keywords, **filters)
+    st.caption(f"{int(mask.sum())} of {len(table)} posts match")
+    if group_by:
+        grouped = table.group_by(group_by, mask)
+        st.subheader("Posts per " + ", ".join(group_by))
+        st.dataframe(grouped)
+        st.bar_chart(grouped.assign(group=grouped[group_by].astype(str).agg(" / ".join, axis=1)),
+                     x='group', y='posts')
+    st.subheader("Matching Posts")
+    shown = [column for column in ['created_utc', 'title', 'post_type', 'severity', 'sentiment', 'version', 'build',
+                                   'resolved', 'post_content', 'resolution_text', 'upvotes']
+             if column in table.frame.columns]
+    st.dataframe(table.rows(mask)[shown])
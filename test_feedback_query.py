@@ -0,0 +1,77 @@
+import unittest
+import pandas as pd
+import numpy as np
+from feedback_query import FeedbackTable, normalize_builds
+
+ROWS = pd.DataFrame({
+    'title': ['Start menu crash', 'BSOD after update', 'Love the new taskbar', 'Printer gone', 'Crash on wake'],
+    'upvotes': [10, 50, 3, 7, 20],
+    'created_utc': ['7/21/2025 21:53', '2025-07-18 09:00:00', '7/20/2025 8:15', '7/10/2025 12:00', '2025-07-21 06:30:00'],
+    'post_content': ['Start menu crashes on open', 'Blue screen after the July update',
+                     'Taskbar looks great', 'Printer driver removed by update', 'Explorer crashes on wake from sleep'],
+    'post_type': ['Complaint', 'complaint', 'opinion', 'complaint ', 'complaint'],
+    'build': ['26100.4652', 'Build 22631.3880 (23H2)', None, 'optional build number if applicable', '26100'],
+    'version': ['Windows 11 Pro', None, 'Windows 11', 'Windows 10 Home', 'Win11'],
+    'sentiment': ['negative', 'negative', 'positive', 'negative', 'negative'],
+    'severity': ['High', 'high', 'low', 'medium', 'high'],
+    'resolved': [False, True, False, 'false', False],
+    'resolution_text': [None, 'Rolled back the driver', None, None, 'disable fast startup'],
+    'topic_cluster': [0, 1, 2, 1, 0],
+})
+
+
+class TestFeedbackQuery(unittest.TestCase):
+    def setUp(self):
+        self.table = FeedbackTable(ROWS)
+
+    def test_normalize_builds(self):
+        normalized = normalize_builds(ROWS['build'], ROWS['version'])
+        self.assertEqual(list(normalized['build']), ['26100.4652', '22631.3880', '', '', '26100'])
+        self.assertEqual(list(normalized['build_major']), ['26100', '22631', '', '', '26100'])
+        self.assertEqual(list(normalized['release']), ['', '23H2', '', '', ''])
+        # Missing versions are inferred from the build number.
+        self.assertEqual(list(normalized['version']), ['Windows 11'] * 3 + ['Windows 10', 'Windows 11'])
+        self.assertEqual(list(normalized['edition']), ['Pro', '', '', 'Home', ''])
+
+    def test_categoricals_are_dictionary_encoded(self):
+        severity = self.table.columns['severity']
+        self.assertEqual(list(severity.labels), ['high', 'low', 'medium'])
+        self.assertEqual(severity.codes.dtype, np.int32)
+        self.assertEqual(self.table.labels('post_type'), ['complaint', 'opinion'])
+        self.assertEqual(self.table.labels('topic_cluster'), ['0', '1', '2'])
+        with self.assertRaises(ValueError):
+            self.table.where(subreddit='Windows11')
+
+    def test_filters(self):
+        mask = self.table.where(severity='high', resolved=False, post_type='complaint')
+        self.assertEqual(list(self.table.rows(mask)['title']), ['Start menu crash', 'Crash on wake'])
+        mask = self.table.where(severity=['high', 'medium'], since='2025-07-18', until='2025-07-21 12:00')
+        self.assertEqual(list(self.table.rows(mask)['title']), ['BSOD after update', 'Crash on wake'])
+        self.assertFalse(self.table.where(severity='critical').any())
+
+    def test_group_by(self):
+        grouped = self.table.query(group_by=['build_major'], severity='high', resolved=False,
+                                   since=pd.Timestamp('2025-07-21') - pd.Timedelta(days=7))
+        self.assertEqual(grouped.to_dict('records'), [{'build_major': '26100', 'posts': 2, 'upvotes': 30.0}])
+        grouped = self.table.group_by(['version', 'severity'])
+        self.assertEqual(grouped.iloc[0].to_dict(),
+                         {'version': 'Windows 11', 'severity': 'high', 'posts': 3, 'upvotes': 80.0})
+        self.assertEqual(grouped['posts'].sum(), len(ROWS))
+
+    def test_keyword_index(self):
+        self.assertEqual(list(self.table.query(keywords='crashes')['title']), ['Start menu crash', 'Crash on wake'])
+        # Terms can match in either indexed column; all of them must match by default.
+        self.assertEqual(list(self.table.query(keywords='driver update')['title']), ['BSOD after update', 'Printer gone'])
+        self.assertEqual(list(self.table.query(keywords='driver', keyword_columns=['resolution_text'])['title']),
+                         ['BSOD after update'])
+        self.assertEqual(self.table.where(keywords='taskbar startup', match='any').sum(), 2)
+
+    def test_from_csv(self):
+        table = FeedbackTable.from_csv('reddit_posts.csv')
+        self.assertEqual(len(table), len(pd.read_csv('reddit_posts.csv')))
+        self.assertNotIn('optional', ' '.join(table.labels('build')))
+        self.assertEqual(table.group_by('severity')['posts'].sum(), len(table))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import os
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
@@ -28,6 +31,43 @@ class TestRedditScraper(unittest.TestCase):
         self.assertEqual(df.iloc[0]['title'], 'Test Title')
         self.assertEqual(df.iloc[0]['comments'][0], 'Test comment')
 
+    @patch('reddit_scraper.praw.Reddit')
+    def test_scrape_subreddits(self, mock_reddit):
+        now = reddit_scraper.datetime.utcnow().timestamp()
+        def make_post(post_id):
+            post = MagicMock()
+            post.id = post_id
+            post.title = f'Title {post_id}'
+            post.selftext = ''
+            post.score = 1
+            post.created_utc = now
+            post.comments.list.return_value = []
+            return post
+        posts_by_sub = {
+            'Windows11': [make_post('a1'), make_post('shared')],
+            'Windows10': [make_post('b1'), make_post('shared')],
+        }
+        client_threads = {}
+        def make_client(**kwargs):
+            client = MagicMock()
+            def subreddit(name):
+                client_threads.setdefault(id(client), set()).add(threading.get_ident())
+                sub = MagicMock()
+                sub.new.return_value = posts_by_sub[name]
+                return sub
+            client.subreddit.side_effect = subreddit
+            return client
+        mock_reddit.side_effect = make_client
+        df, stats = reddit_scraper.scrape_subreddits(['Windows11', {'name': 'Windows10', 'limit': 2}], limit=5)
+        # PRAW is not thread safe: at most one client per worker, each used by a single thread
+        self.assertLessEqual(mock_reddit.call_count, 2)
+        self.assertTrue(all(len(threads) == 1 for threads in client_threads.values()))
+        self.assertIn('subreddit', df.columns)
+        self.assertEqual(sorted(df['id']), ['a1', 'b1', 'shared'])
+        self.assertEqual(list(stats['subreddit']), ['Windows11', 'Windows10'])
+        self.assertEqual(list(stats['posts']), [2, 2])
+        self.assertEqual(df.loc[df['id'] == 'shared', 'subreddit'].tolist(), ['Windows11'])
+
     @patch('reddit_scraper.client')
     @patch('reddit_scraper.openai')
     def test_generate_topic_clusters(self, mock_openai, mock_client):
@@ -53,6 +93,67 @@ class TestRedditScraper(unittest.TestCase):
         result = reddit_scraper.extract_feedback('Some text')
         self.assertIn('Feedback 1', result)
 
+    @patch('reddit_scraper.extract_feedback')
+    def test_triage_and_extract(self, mock_extract):
+        mock_extract.return_value = '{"type": "complaint"}'
+        train = pd.DataFrame({
+            'combined': ['what is this app on my taskbar'] * 6 + ['blue screen crash after update, data lost'] * 6,
+            'post_type': ['opinion'] * 6 + ['complaint'] * 6,
+            'sentiment': ['neutral'] * 6 + ['negative'] * 6,
+            'severity': ['low'] * 6 + ['high'] * 6,
+        })
+        triage = reddit_scraper.FeedbackTriage(confidence=0.6).fit(train)
+        texts = pd.Series(['what is this app on my taskbar', 'blue screen crash after update, data lost'])
+        feedback, source, stats = reddit_scraper.triage_and_extract(texts, triage)
+        # The trivial post is labelled locally; high severity always goes to the LLM
+        self.assertEqual(list(source), ['local', 'llm'])
+        self.assertEqual(stats, {'total': 2, 'llm_calls': 1, 'skipped': 1})
+        self.assertEqual(mock_extract.call_count, 1)
+        parsed = reddit_scraper.parse_feedback_dict(feedback[0])
+        self.assertEqual((parsed['post_type'], parsed['sentiment'], parsed['severity']), ('opinion', 'neutral', 'low'))
+
+    def test_train_triage_requires_held_out_agreement(self):
+        # The shipped 63-post CSV is too small to trust: everything stays with the LLM
+        triage, report = reddit_scraper.train_triage(pd.read_csv('reddit_posts.csv'))
+        self.assertIsNone(triage)
+        self.assertFalse(report['accepted'])
+        # Cleanly separable labels pass the bar and the triage is fitted on all rows
+        train = pd.DataFrame({
+            'combined': [f'what is this app on my taskbar {i}' for i in range(20)] +
+                        [f'love the new start menu layout {i}' for i in range(20)],
+            'post_type': ['inquiry'] * 20 + ['opinion'] * 20,
+            'sentiment': ['neutral'] * 20 + ['positive'] * 20,
+            'severity': ['low'] * 20 + ['medium'] * 20,
+        })
+        triage, report = reddit_scraper.train_triage(train, min_skipped=10)
+        self.assertTrue(report['accepted'])
+        self.assertEqual(report['post_type_agreement'], 1.0)
+        self.assertIsNotNone(triage)
+        # A bar the evaluation cannot meet rejects it
+        triage, report = reddit_scraper.train_triage(train, min_skipped=10_000)
+        self.assertIsNone(triage)
+
+    def test_update_label_store_grows_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = os.path.join(tmp, 'labels.csv')
+            run1 = pd.DataFrame({
+                'id': ['a', 'b', 'c'], 'combined': ['t1', 't2', 't3'],
+                'post_type': ['Complaint', 'opinion', None], 'sentiment': ['negative', 'positive', 'neutral'],
+                'severity': ['high', 'low', 'low'], 'feedback_source': ['llm', 'llm', 'llm'],
+            })
+            reddit_scraper.update_label_store(run1, store_path)
+            run2 = pd.DataFrame({
+                'id': ['b', 'd', 'e'], 'combined': ['t2 edited', 't4', 't5'],
+                'post_type': ['inquiry', 'opinion', 'opinion'], 'sentiment': ['neutral', 'positive', 'positive'],
+                'severity': ['low', 'low', 'low'], 'feedback_source': ['llm', 'llm', 'local'],
+            })
+            store = reddit_scraper.update_label_store(run2, store_path)
+            # Unlabelled and locally labelled rows are skipped; a re-seen post keeps its newest labels
+            self.assertEqual(sorted(store['id']), ['a', 'b', 'd'])
+            self.assertEqual(store.set_index('id').loc['b', 'post_type'], 'inquiry')
+            self.assertEqual(store.set_index('id').loc['a', 'post_type'], 'complaint')
+            self.assertEqual(len(pd.read_csv(store_path)), 3)
+
     def test_parse_feedback(self):
         text = '- Feedback 1\n- Feedback 2\n\n- Feedback 3'
         items = reddit_scraper.parse_feedback(text)
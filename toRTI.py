@@ -41,7 +41,9 @@ create_table = f"""
     sentiment: string,
     severity: string,
     resolved: bool,
-    resolution_text: string
+    resolution_text: string,
+    subreddit: string,
+    feedback_source: string
 )
 """
 mgmt_client.execute_mgmt(DATABASE, create_table)
@@ -61,7 +63,9 @@ csv_mapping_definition = [
     {"column": "sentiment", "DataType": "string", "Ordinal": 12},
     {"column": "severity", "DataType": "string", "Ordinal": 13},
     {"column": "resolved", "DataType": "bool", "Ordinal": 14},
-    {"column": "resolution_text", "DataType": "string", "Ordinal": 15}
+    {"column": "resolution_text", "DataType": "string", "Ordinal": 15},
+    {"column": "subreddit", "DataType": "string", "Ordinal": 16},
+    {"column": "feedback_source", "DataType": "string", "Ordinal": 17}
 ]
  
 # Convert the Python list to a JSON string